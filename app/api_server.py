@@ -1,18 +1,29 @@
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import codecs
 from typing import List, Dict, Optional, Any
-import sqlite3
 import json
 import os
 
-from app.storage import _connect, get_project_details, get_user_performance, add_user, create_project, create_milestone, log_task_history
+from app import async_storage as db
+from app.storage import change_version, get_dashboard as get_scoped_dashboard, get_project_details
+from app.async_storage import run_read, run_write
 from app.schemas import Project, User, Milestone, TaskHistory
-from app.config import DB_PATH
-from app.tools.workflow import recommend_task_assignee
+from app.utils import utc_now_iso
+from app.config import DB_PATH, BULK_CHUNK_SIZE, LIVE_HEARTBEAT_S, METRICS_ENABLED
+from app import instrument
+from app.tools.workflow import recommend_task_assignees
+from app.tools.events import aggregate_events
+from app.tools.decisions import search_decisions
+from app.tools.bulk import log_events_bulk, log_work_bulk, merge_bulk_results, parse_ndjson
+from app.live import LiveHub, sse_message
 
 app = FastAPI()
+live_hub = LiveHub(DB_PATH)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,55 +31,218 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+if METRICS_ENABLED:
+    # Outermost, so the timing includes CORS handling and error responses.
+    app.add_middleware(instrument.MetricsMiddleware)
+
+def _dashboard_etag() -> str:
+    # Any tracked write bumps the change version. The date is part of the
+    # tag because overdue counts change at midnight without any write.
+    from datetime import datetime, timezone
+    today = datetime.now(timezone.utc).date().isoformat()
+    return f'W/"{change_version(DB_PATH)}-{today}"'
+
+def _dashboard_body(if_none_match, scoped, **kwargs):
+    # Runs on a DB reader thread: the tag check and the query share one hop.
+    # Read the version before the data: if a write lands in between, the tag
+    # is older than the body and the client simply refetches next time.
+    etag = _dashboard_etag()
+    if if_none_match == etag:
+        return etag, None
+    if not scoped:
+        return etag, get_project_details(DB_PATH)
+    return etag, get_scoped_dashboard(DB_PATH, **kwargs)
 
 @app.get("/dashboard")
-def get_dashboard():
-    return get_project_details(DB_PATH)
+async def get_dashboard(
+    request: Request,
+    project_id: Optional[str] = None,
+    fields: Optional[str] = None,
+    milestone_fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    include_users: bool = True,
+):
+    # Bare /dashboard keeps the original full dump; any scoping parameter
+    # switches to the paginated view with per-project summaries.
+    scoped = not (project_id is None and fields is None and milestone_fields is None and limit is None and not offset)
+    kwargs = {}
+    if scoped:
+        kwargs = dict(
+            project_id=project_id,
+            fields=fields.split(",") if fields else None,
+            milestone_fields=milestone_fields.split(",") if milestone_fields else None,
+            limit=min(limit or 20, 200),
+            offset=offset,
+            include_users=include_users,
+        )
+    try:
+        etag, body = await run_read(_dashboard_body, request.headers.get("if-none-match"), scoped, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if body is None:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(body, headers=headers)
+
+@app.get("/metrics")
+async def get_metrics():
+    # Prometheus text format; only wise_metrics_enabled 0 unless METRICS_ENABLED
+    return Response(instrument.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/changes")
+async def list_changes(since: int = 0, limit: int = Query(1000, ge=1, le=5000)):
+    return await db.get_changes(DB_PATH, since, limit=limit)
+
+@app.get("/stream")
+async def stream_changes(request: Request):
+    """Server-Sent Events: "hello" with the current version, then a "changes"
+    message (same shape as /changes) per batch of writes, or "reset" when
+    the client should refetch the dashboard."""
+    queue = await live_hub.subscribe()
+
+    async def events():
+        try:
+            yield sse_message("hello", {"version": live_hub.version})
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), LIVE_HEARTBEAT_S)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            live_hub.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.on_event("shutdown")
+async def stop_live_hub():
+    await live_hub.stop()
 
 @app.post("/users")
-def create_user(user: User):
-    add_user(DB_PATH, user)
+async def create_user(user: User):
+    await db.add_user(DB_PATH, user)
     return {"status": "success"}
 
 @app.post("/projects")
-def new_project(project: Project):
-    create_project(DB_PATH, project)
+async def new_project(project: Project):
+    await db.create_project(DB_PATH, project)
     return {"status": "success"}
 
 @app.post("/milestones")
-def add_milestone_endpoint(milestone: Milestone):
-    create_milestone(DB_PATH, milestone)
+async def add_milestone_endpoint(milestone: Milestone):
+    await db.create_milestone(DB_PATH, milestone)
     return {"status": "success"}
 
 @app.post("/milestones/{id}/complete")
-def complete_milestone_endpoint(id: str):
-    from datetime import datetime
-    from app.storage import update_milestone_status
-    import datetime as dt
-    update_milestone_status(DB_PATH, id, "completed", completed_at=dt.datetime.utcnow().isoformat())
+async def complete_milestone_endpoint(id: str):
+    await db.update_milestone_status(DB_PATH, id, "completed", completed_at=utc_now_iso())
     return {"status": "success"}
 
 @app.post("/history")
-def add_history(history: TaskHistory):
-    log_task_history(DB_PATH, history)
+async def add_history(history: TaskHistory):
+    await db.log_task_history(DB_PATH, history)
     return {"status": "success"}
 
+async def _bulk_ingest(request: Request, ingest):
+    """Feed a JSON array or an NDJSON stream (Content-Type: application/x-ndjson)
+    to a bulk ingest function. NDJSON is consumed incrementally, one chunk of
+    BULK_CHUNK_SIZE lines at a time, so large backfills never sit in memory whole."""
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" not in content_type and "jsonlines" not in content_type:
+        try:
+            records = json.loads(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"invalid JSON: {e}")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=400, detail="expected a JSON array")
+        return await run_write(ingest, DB_PATH, records)
+
+    results = []
+    buffer = ""
+    pending: List[str] = []
+    seen = 0
+    # Incremental: a network chunk can end inside a multibyte character.
+    decoder = codecs.getincrementaldecoder("utf-8")()
+
+    async def flush_lines():
+        nonlocal seen
+        records = parse_ndjson("\n".join(pending))
+        pending.clear()
+        results.append(await run_write(ingest, DB_PATH, records, None, seen))
+        seen += len(records)
+
+    try:
+        async for chunk in request.stream():
+            buffer += decoder.decode(chunk)
+            *lines, buffer = buffer.split("\n")
+            pending.extend(lines)
+            if len(pending) >= BULK_CHUNK_SIZE:
+                await flush_lines()
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        # Chunks before this one may already be committed; say how many.
+        raise HTTPException(status_code=400, detail=f"invalid UTF-8 after {seen} records: {e}")
+    pending.append(buffer)
+    await flush_lines()
+    return merge_bulk_results(results)
+
+@app.get("/events/aggregate")
+async def get_event_aggregate(
+    bucket: str = "day",
+    group_by: Optional[str] = None,
+    team: Optional[str] = None,
+    type: Optional[str] = None,
+    severity: Optional[str] = None,
+    start_ts: Optional[str] = None,
+    end_ts: Optional[str] = None,
+):
+    try:
+        return await run_read(
+            aggregate_events, DB_PATH, bucket, group_by.split(",") if group_by else None,
+            team, type, severity, start_ts, end_ts,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/decisions/search")
+async def get_decision_search(
+    q: Optional[str] = None,
+    owners: Optional[str] = None,
+    start_ts: Optional[str] = None,
+    end_ts: Optional[str] = None,
+    limit: int = 10,
+):
+    try:
+        return await run_read(
+            search_decisions, DB_PATH, q, owners.split(",") if owners else None,
+            start_ts, end_ts, min(limit, 100),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/events/bulk")
+async def add_events_bulk(request: Request):
+    return await _bulk_ingest(request, log_events_bulk)
+
+@app.post("/history/bulk")
+async def add_history_bulk(request: Request):
+    return await _bulk_ingest(request, log_work_bulk)
+
 @app.get("/recommend/{project_id}/{task_type}")
-def get_recommendation(project_id: str, task_type: str):
+async def get_recommendation(project_id: str, task_type: str, k: int = Query(5, ge=1)):
     # Get all users as candidates
-    conn = _connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    users = cur.execute("SELECT id FROM users").fetchall()
-    conn.close()
-    
-    candidate_ids = [u["id"] for u in users]
+    candidate_ids = await db.list_user_ids(DB_PATH)
     if not candidate_ids:
-        return {"recommended_user_id": None}
-        
-    rec_id = recommend_task_assignee(DB_PATH, project_id, task_type, candidate_ids)
-    return {"recommended_user_id": rec_id}
+        return {"recommended_user_id": None, "candidates": []}
+
+    candidates = await run_read(recommend_task_assignees, DB_PATH, project_id, task_type, candidate_ids, k=k)
+    return {"recommended_user_id": candidates[0]["user_id"], "candidates": candidates}
 
 if __name__ == "__main__":
     import uvicorn
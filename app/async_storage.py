@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from . import storage
+from .config import DB_MAX_PENDING, DB_READ_WORKERS
+
+# Async facade over app/storage.py for the FastAPI server.
+#
+# Reads run on a small dedicated pool and all writes on a single thread:
+# SQLite allows one writer at a time anyway, so funnelling writes through one
+# connection removes busy-wait contention, while WAL lets the readers keep
+# going in parallel. Neither pool is Starlette's shared threadpool, so a slow
+# dashboard query can no longer starve unrelated routes of worker threads.
+# At most DB_MAX_PENDING calls may be queued or running per event loop;
+# further callers wait on the semaphore (backpressure) rather than piling up
+# unbounded work in the executors.
+
+_read_executor = ThreadPoolExecutor(max_workers=DB_READ_WORKERS, thread_name_prefix="db-read")
+_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+# One semaphore per loop: a semaphore binds to the first loop that waits on
+# it, and a process can run several loops over time (TestClient, reloads).
+# Weak keys, so a closed loop's entry goes with it.
+_pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _semaphore() -> asyncio.Semaphore:
+    # Only called from coroutines on the loop itself, so no lock is needed.
+    loop = asyncio.get_running_loop()
+    pending = _pending.get(loop)
+    if pending is None:
+        pending = _pending[loop] = asyncio.Semaphore(DB_MAX_PENDING)
+    return pending
+
+
+async def run_read(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    async with _semaphore():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_read_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def run_write(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    async with _semaphore():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_write_executor, functools.partial(fn, *args, **kwargs))
+
+
+def _reader(fn: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await run_read(fn, *args, **kwargs)
+    return wrapper
+
+
+def _writer(fn: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await run_write(fn, *args, **kwargs)
+    return wrapper
+
+
+# Reads
+get_changes = _reader(storage.get_changes)
+change_version = _reader(storage.change_version)
+list_user_ids = _reader(storage.list_user_ids)
+
+# Writes
+create_project = _writer(storage.create_project)
+add_user = _writer(storage.add_user)
+create_milestone = _writer(storage.create_milestone)
+update_milestone_status = _writer(storage.update_milestone_status)
+log_task_history = _writer(storage.log_task_history)
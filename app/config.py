@@ -1,10 +1,112 @@
-
 import os
 
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes", "y")
+
+
 APP_NAME = os.getenv("APP_NAME", "WISE MCP Backbone")
 PORT = int(os.getenv("PORT", "8000"))
 
 SERVER_SECRET = os.getenv("NORTH_SERVER_SECRET", "")
 DB_PATH = os.getenv("DB_PATH", "data.db")
-DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes", "y")
+DEBUG = _env_bool("DEBUG", "false")
+
+# SQLite connection layer (see app/db.py)
+DB_POOL_ENABLED = _env_bool("DB_POOL_ENABLED", "true")
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+
+# Event ingestion (see app/ingest.py). "sync" commits each event before
+# log_event returns; "buffered" queues it for the background batch writer.
+EVENT_WRITE_MODE = os.getenv("EVENT_WRITE_MODE", "sync").lower()
+EVENT_QUEUE_MAX = int(os.getenv("EVENT_QUEUE_MAX", "10000"))
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", "500"))
+EVENT_FLUSH_INTERVAL_MS = int(os.getenv("EVENT_FLUSH_INTERVAL_MS", "200"))
+EVENT_ENQUEUE_TIMEOUT_S = float(os.getenv("EVENT_ENQUEUE_TIMEOUT_S", "5"))
+
+# Bulk ingestion (see app/tools/bulk.py): rows committed per transaction.
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+
+# Assignee scoring cache (see app/scoring.py). Writes in this process
+# invalidate immediately; the TTL bounds staleness from other processes.
+SCORING_CACHE_TTL_S = float(os.getenv("SCORING_CACHE_TTL_S", "30"))
+
+# Weight of User.skills against task history in a user's 0-1 fit for a task
+# type (app/skills.py), used by skill matching and batch milestone assignment.
+ASSIGNMENT_SKILL_WEIGHT = float(os.getenv("ASSIGNMENT_SKILL_WEIGHT", "0.5"))
+
+# Resource state read cache (see tools/resources.py). Updates in this process
+# invalidate immediately; the TTL bounds staleness from other processes.
+RESOURCE_CACHE_SIZE = int(os.getenv("RESOURCE_CACHE_SIZE", "1024"))
+RESOURCE_CACHE_TTL_S = float(os.getenv("RESOURCE_CACHE_TTL_S", "30"))
+
+# Half-life of the time-decayed aggregates in user_task_stats. Changing it
+# requires `python rebuild_stats.py` to recompute existing rows.
+STATS_HALF_LIFE_DAYS = float(os.getenv("STATS_HALF_LIFE_DAYS", "30"))
+
+# Change log behind ETags and /changes: rows kept after startup pruning.
+CHANGES_RETENTION = int(os.getenv("CHANGES_RETENTION", "100000"))
+
+# Live dashboard stream (see app/live.py).
+LIVE_POLL_INTERVAL_MS = int(os.getenv("LIVE_POLL_INTERVAL_MS", "250"))
+LIVE_HEARTBEAT_S = float(os.getenv("LIVE_HEARTBEAT_S", "15"))
+LIVE_SUBSCRIBER_QUEUE = int(os.getenv("LIVE_SUBSCRIBER_QUEUE", "64"))
+
+# Async storage path for the FastAPI server (see app/async_storage.py).
+DB_READ_WORKERS = int(os.getenv("DB_READ_WORKERS", "8"))
+DB_MAX_PENDING = int(os.getenv("DB_MAX_PENDING", "256"))
+
+# Event payload storage. "json" stores compact JSON text; "zlib" stores
+# payloads of at least EVENT_PAYLOAD_COMPRESS_MIN_BYTES as compressed blobs.
+# Reads decode either form, so the setting can change at any time, except
+# that EVENT_INDEXED_PAYLOAD_KEYS requires "json".
+EVENT_PAYLOAD_ENCODING = os.getenv("EVENT_PAYLOAD_ENCODING", "json").lower()
+EVENT_PAYLOAD_COMPRESS_MIN_BYTES = int(os.getenv("EVENT_PAYLOAD_COMPRESS_MIN_BYTES", "256"))
+
+# Payload keys (dotted paths, e.g. "service,details.region") promoted to
+# indexed generated columns on events, so list_events payload filters on them
+# are index seeks. init_db adds missing ones, first rewriting any zlib
+# payloads as JSON text; unlisted columns are left alone.
+EVENT_INDEXED_PAYLOAD_KEYS = [k.strip() for k in os.getenv("EVENT_INDEXED_PAYLOAD_KEYS", "").split(",") if k.strip()]
+
+# Month partitioning of events (see "Event partitions" in app/storage.py).
+# With "month", `python archive_events.py` seals months older than
+# EVENT_HOT_MONTHS (counting the current one) out of the events table into
+# one SQLite file per month under EVENT_PARTITION_DIR (default
+# "<DB_PATH>.partitions"), which list_events still reads. Partitions older
+# than EVENT_RETENTION_MONTHS are gzipped and no longer queried; 0 keeps
+# them queryable forever.
+EVENT_PARTITIONING = os.getenv("EVENT_PARTITIONING", "none").lower()
+EVENT_PARTITION_DIR = os.getenv("EVENT_PARTITION_DIR", "")
+EVENT_HOT_MONTHS = int(os.getenv("EVENT_HOT_MONTHS", "3"))
+EVENT_RETENTION_MONTHS = int(os.getenv("EVENT_RETENTION_MONTHS", "0"))
+
+# Instrumentation (see app/instrument.py): latency histograms for MCP tools,
+# API routes, storage functions and SQL statements, served at /metrics and
+# summarized by health_check. Read once at startup; when off nothing is
+# wrapped, so there is no per-call cost.
+METRICS_ENABLED = _env_bool("METRICS_ENABLED", "false")
+
+# Slow query log (see app/instrument.py): statements taking at least this
+# many milliseconds, execute plus fetch, are logged to the "app.slow_query"
+# logger with their EXPLAIN QUERY PLAN. 0 turns it off.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+
+# Sampling profiler for MCP tool calls. With PROFILE_TOOLS on, the stack of
+# each call is sampled every PROFILE_INTERVAL_MS and calls taking at least
+# PROFILE_MIN_MS are written to PROFILE_DIR as collapsed stacks, one file
+# per call, for flamegraph.pl or speedscope.
+PROFILE_TOOLS = _env_bool("PROFILE_TOOLS", "false")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+PROFILE_MIN_MS = float(os.getenv("PROFILE_MIN_MS", "0"))
 
+# reset_demo.py: the fixture the demo starts from, and the prebuilt database
+# it is loaded into once and then restored from on every reset.
+DEMO_FIXTURE = os.getenv("DEMO_FIXTURE", "fixtures/demo_team.json")
+DEMO_TEMPLATE_PATH = os.getenv("DEMO_TEMPLATE_PATH", DB_PATH + ".demo-template")
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import weakref
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+from .config import (
+    DB_BUSY_TIMEOUT_MS,
+    DB_CACHE_SIZE_KB,
+    DB_JOURNAL_MODE,
+    DB_MMAP_SIZE,
+    DB_POOL_ENABLED,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_SYNCHRONOUS,
+)
+from .instrument import CONNECTION_FACTORY
+
+# One long-lived connection per (thread, db_path). sqlite3 connections are
+# cheap to keep around but expensive to open (file open, schema parse, pragma
+# round trips), and keeping them per thread avoids any locking on our side:
+# the FastAPI threadpool and the MCP server both reuse a bounded set of
+# worker threads. Worker pools also retire idle threads (anyio's expire after
+# a while), so a thread's connections are closed when the thread exits: the
+# open handles track the live threads rather than every thread there ever was.
+_local = threading.local()
+_registry_lock = threading.Lock()
+_registry: List[Tuple[str, sqlite3.Connection]] = []
+_generation = 0
+# Connections retire() took out of the pool; each is closed by its own
+# thread, the next time that thread borrows a connection.
+_retired: Set[sqlite3.Connection] = set()
+_retire_version = 0
+
+
+def payload_text(stored: Any) -> Any:
+    """JSON text of a stored event payload, whichever encoding it was written
+    with (see storage.encode_payload). Also registered as the SQL function
+    payload_text(), which the payload generated columns depend on."""
+    if isinstance(stored, bytes):
+        return zlib.decompress(stored).decode("utf-8")
+    return stored
+
+
+def open_connection(db_path: str) -> sqlite3.Connection:
+    """Open a new, tuned connection. Callers own it and must close it."""
+    conn = sqlite3.connect(
+        db_path,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+        cached_statements=DB_STATEMENT_CACHE_SIZE,
+        # Per-statement timings for /metrics and the slow query log (see app/instrument.py).
+        factory=CONNECTION_FACTORY,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.create_function("payload_text", 1, payload_text, deterministic=True)
+    conn.execute(f"PRAGMA journal_mode={DB_JOURNAL_MODE}")
+    conn.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+    # Negative cache_size is in KiB rather than pages.
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+class _ThreadPool:
+    """A thread's pooled connections by path. Only the thread-local refers to
+    it, so it is dropped, and its finalizer run, when the thread exits."""
+
+    __slots__ = ("conns", "__weakref__")
+
+    def __init__(self) -> None:
+        self.conns: Dict[str, sqlite3.Connection] = {}
+
+
+def _release(conns: Dict[str, sqlite3.Connection]) -> None:
+    """Close and forget the connections of a thread that has exited (or of a
+    pool close_all already closed, which is harmless)."""
+    dead = set(conns.values())
+    with _registry_lock:
+        _registry[:] = [(path, conn) for path, conn in _registry if conn not in dead]
+        _retired.difference_update(dead)
+    for conn in dead:
+        try:
+            conn.close()
+        except sqlite3.ProgrammingError:
+            pass
+
+
+def _thread_connections() -> Dict[str, sqlite3.Connection]:
+    pool = getattr(_local, "pool", None)
+    if pool is None or getattr(_local, "generation", None) != _generation:
+        pool = _ThreadPool()
+        weakref.finalize(pool, _release, pool.conns)
+        _local.pool = pool
+        _local.generation = _generation
+    conns = pool.conns
+    if getattr(_local, "retire_version", None) != _retire_version:
+        _local.retire_version = _retire_version
+        for path, conn in list(conns.items()):
+            if conn in _retired:
+                del conns[path]
+                with _registry_lock:
+                    _retired.discard(conn)
+                conn.close()
+    return conns
+
+
+def get_connection(db_path: str) -> sqlite3.Connection:
+    """Return this thread's pooled connection for db_path, opening it on first use."""
+    conns = _thread_connections()
+    conn = conns.get(db_path)
+    if conn is None:
+        conn = open_connection(db_path)
+        conns[db_path] = conn
+        with _registry_lock:
+            _registry.append((db_path, conn))
+    return conn
+
+
+@contextmanager
+def connection(db_path: str) -> Iterator[sqlite3.Connection]:
+    """Borrow a connection for reads. Pooled unless DB_POOL_ENABLED is off."""
+    if not DB_POOL_ENABLED:
+        conn = open_connection(db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+        return
+    yield get_connection(db_path)
+
+
+@contextmanager
+def transaction(db_path: str) -> Iterator[sqlite3.Connection]:
+    """Borrow a connection and commit on success, roll back on error."""
+    with connection(db_path) as conn:
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def close_all() -> None:
+    """Close every pooled connection in every thread.
+
+    Needed before the database file is removed or renamed (see reset_demo.py;
+    storage.restore_database replaces the contents in place and needs none);
+    threads notice the bumped generation and reopen lazily.
+    """
+    global _generation
+    with _registry_lock:
+        conns = [conn for _, conn in _registry]
+        _registry.clear()
+        _retired.clear()
+        _generation += 1
+    for conn in conns:
+        try:
+            conn.close()
+        except sqlite3.ProgrammingError:
+            pass
+
+
+def retire(db_path: str) -> None:
+    """Take every pooled connection to db_path out of the pool.
+
+    Unlike close_all, other databases' connections are untouched, and no
+    connection is closed while its thread may be using it: the calling
+    thread's closes now, every other thread's the next time that thread
+    borrows a connection. Until then those stay open on the old file, which
+    is harmless for a file that is about to be removed (see
+    storage.archive_event_partition).
+    """
+    global _retire_version
+    with _registry_lock:
+        keep = []
+        for path, conn in _registry:
+            if path == db_path:
+                _retired.add(conn)
+            else:
+                keep.append((path, conn))
+        _registry[:] = keep
+        _retire_version += 1
+    _thread_connections()
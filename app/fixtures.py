@@ -0,0 +1,65 @@
+"""Fixture files for storage.bulk_load.
+
+A fixture is one of:
+- a .json file holding {table: [record, ...]} for any of storage.BULK_TABLES;
+- a .csv file named after its table (users.csv, events.csv, ...) with one
+  record per row. Columns holding objects (skills, payload) are JSON text,
+  and empty cells are left out so the model defaults apply;
+- a directory of such files, loaded together.
+
+CSV rows are read lazily, so a fixture can be far larger than memory.
+"""
+
+import csv
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator
+
+from app.storage import BULK_TABLES
+
+# Columns stored as JSON text in CSV fixtures.
+_CSV_JSON_COLUMNS = ("skills", "payload")
+
+
+def _csv_records(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            record: Dict[str, Any] = {k: v for k, v in row.items() if v not in ("", None)}
+            for column in _CSV_JSON_COLUMNS:
+                if column in record:
+                    record[column] = json.loads(record[column])
+            yield record
+
+
+def load_fixture(path: str) -> Dict[str, Iterable[Dict[str, Any]]]:
+    """Records of a fixture file or directory by table, ready for bulk_load."""
+    if os.path.isdir(path):
+        tables: Dict[str, Iterable[Dict[str, Any]]] = {}
+        for name in sorted(os.listdir(path)):
+            if name.endswith((".json", ".csv")):
+                for table, records in load_fixture(os.path.join(path, name)).items():
+                    if table in tables:
+                        raise ValueError(f"{table} appears twice in {path}")
+                    tables[table] = records
+        return tables
+
+    stem, ext = os.path.splitext(os.path.basename(path))
+    if ext == ".csv":
+        if stem not in BULK_TABLES:
+            raise ValueError(f"{path}: CSV fixtures are named after their table, one of {list(BULK_TABLES)}")
+        return {stem: _csv_records(path)}
+    if ext == ".json":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not all(isinstance(v, list) for v in data.values()):
+            raise ValueError(f"{path}: expected an object of table name -> list of records")
+        return data
+    raise ValueError(f"{path}: fixtures are .json or .csv files")
+
+
+def fixture_mtime(path: str) -> float:
+    """Newest modification time of a fixture file or directory's files."""
+    if not os.path.isdir(path):
+        return os.path.getmtime(path)
+    times = [os.path.getmtime(os.path.join(path, n)) for n in os.listdir(path) if n.endswith((".json", ".csv"))]
+    return max(times, default=os.path.getmtime(path))
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .config import (
+    EVENT_BATCH_SIZE,
+    EVENT_ENQUEUE_TIMEOUT_S,
+    EVENT_FLUSH_INTERVAL_MS,
+    EVENT_QUEUE_MAX,
+)
+from .schemas import Event
+from .storage import insert_event, insert_events
+
+logger = logging.getLogger(__name__)
+
+
+class EventQueueFull(RuntimeError):
+    """Raised when the write-behind queue stays full past the enqueue timeout."""
+
+
+class _FlushMarker:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class EventWriter:
+    """Write-behind batch writer for events.
+
+    submit() appends to a bounded in-memory queue and returns immediately; a
+    single background thread drains it and commits up to `batch_size` events
+    per transaction with executemany, at least every `flush_interval_s`.
+    When the queue is full submit() blocks for up to `enqueue_timeout_s`
+    (backpressure) and then raises EventQueueFull.
+
+    Durability: an event is only on disk once its batch commits. Anything
+    still queued when the process dies is lost, so at most one flush interval
+    (or one full queue) of events is at risk. Call flush() to wait for
+    everything submitted so far, e.g. in tests or at shutdown.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_queue: int = EVENT_QUEUE_MAX,
+        batch_size: int = EVENT_BATCH_SIZE,
+        flush_interval_s: float = EVENT_FLUSH_INTERVAL_MS / 1000,
+        enqueue_timeout_s: float = EVENT_ENQUEUE_TIMEOUT_S,
+    ) -> None:
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.enqueue_timeout_s = enqueue_timeout_s
+        self.written = 0
+        self.failed = 0
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, event: Event) -> None:
+        try:
+            self._queue.put(event, timeout=self.enqueue_timeout_s)
+        except queue.Full:
+            raise EventQueueFull(
+                f"event queue full ({self._queue.maxsize} pending); writer is falling behind"
+            ) from None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every event submitted before this call is committed."""
+        if not self._thread.is_alive():
+            return self._queue.empty()
+        marker = _FlushMarker()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch: List[Event] = []
+            markers: List[_FlushMarker] = []
+            deadline = time.monotonic() + self.flush_interval_s
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, _FlushMarker):
+                    # Commit what we have now rather than waiting out the interval.
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stopping or markers or len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            for marker in markers:
+                marker.done.set()
+
+    def _write(self, batch: List[Event]) -> None:
+        try:
+            insert_events(self.db_path, batch)
+            self.written += len(batch)
+            return
+        except Exception:
+            logger.exception("batch insert of %d events failed; retrying row by row", len(batch))
+        # One bad row (e.g. a duplicate id) must not drop its neighbours.
+        for event in batch:
+            try:
+                insert_event(self.db_path, event)
+                self.written += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("dropping event %s", event.id)
+
+
+_writers: Dict[str, EventWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_event_writer(db_path: str) -> EventWriter:
+    with _writers_lock:
+        writer = _writers.get(db_path)
+        if writer is None:
+            writer = EventWriter(db_path)
+            _writers[db_path] = writer
+        return writer
+
+
+def flush_event_writers(timeout: Optional[float] = None) -> None:
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.flush(timeout)
+
+
+def shutdown_event_writers(timeout: Optional[float] = None) -> None:
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close(timeout)
+
+
+atexit.register(shutdown_event_writers)
@@ -0,0 +1,562 @@
+from __future__ import annotations
+
+import bisect
+import functools
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from time import perf_counter, sleep
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import METRICS_ENABLED, PROFILE_DIR, PROFILE_INTERVAL_MS, PROFILE_MIN_MS, PROFILE_TOOLS, SLOW_QUERY_MS
+
+# Latency histograms and counters for MCP tools, API routes, storage functions
+# and SQL statements, rendered in the Prometheus text format by /metrics; the
+# slow query log; and a sampling profiler for MCP tool calls.
+#
+# Everything is decided at import time: with METRICS_ENABLED, SLOW_QUERY_MS
+# and PROFILE_TOOLS off, timed() and profiled() return the function itself,
+# api_server adds no middleware and db.py opens plain connections, so the hot
+# paths run exactly the code they ran before.
+
+# Statements at or over SLOW_QUERY_MS, with their query plan. A separate
+# logger so it can be routed to its own file.
+slow_query_logger = logging.getLogger("app.slow_query")
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds (+Inf is implicit). The low ones are for SQL
+# statements, most of which take tens of microseconds.
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Distinct SQL statements tracked; later ones are counted under "other" so a
+# query built with varying text cannot grow the registry without bound.
+MAX_STATEMENTS = 500
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "max", "errors", "rows", "fetch")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.rows = 0
+        self.fetch = 0.0  # SQL only: seconds spent fetching rows after execute
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate, interpolating linearly inside the bucket (as Prometheus'
+        histogram_quantile does); capped at the largest observation."""
+        count = self.count
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = BUCKETS[i - 1] if i else 0.0
+                high = min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.max
+
+
+_lock = threading.Lock()
+# (kind, name) -> Histogram; kind is "tool", "route", "storage" or "sql".
+_series: Dict[Tuple[str, str], Histogram] = {}
+
+
+def _histogram(kind: str, name: str) -> Histogram:
+    hist = _series.get((kind, name))
+    if hist is None:
+        hist = _series.setdefault((kind, name), Histogram())
+    return hist
+
+
+def observe(kind: str, name: str, seconds: float, error: bool = False, rows: int = 0) -> None:
+    with _lock:
+        hist = _histogram(kind, name)
+        hist.observe(seconds)
+        hist.errors += error
+        hist.rows += rows
+
+
+def reset() -> None:
+    with _lock:
+        _series.clear()
+        _statement_names.clear()
+
+
+# Rows fetched by SQL statements, credited to the storage call running on
+# this thread (a list per nested call; the innermost is last).
+_local = threading.local()
+
+
+def _add_rows(n: int) -> None:
+    stack = getattr(_local, "rows", None)
+    if stack:
+        stack[-1] += n
+
+
+def timed(kind: str, name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator recording each call's latency and whether it raised.
+
+    Storage calls also record the rows their SQL statements fetched, nested
+    storage calls included. A no-op when METRICS_ENABLED is off.
+    """
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if not METRICS_ENABLED:
+            return fn
+        label = name or fn.__name__
+        count_rows = kind == "storage"
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if count_rows:
+                stack = getattr(_local, "rows", None)
+                if stack is None:
+                    stack = _local.rows = []
+                stack.append(0)
+            error = True
+            start = perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                elapsed = perf_counter() - start
+                rows = 0
+                if count_rows:
+                    rows = stack.pop()
+                    if stack:
+                        stack[-1] += rows
+                observe(kind, label, elapsed, error, rows)
+        return wrapper
+    return decorate
+
+
+def instrument_storage(namespace: Dict[str, Any], module: str) -> None:
+    """Wrap every public function of a storage module taking db_path first.
+
+    Called at the bottom of app/storage.py on its globals(), before any other
+    module imports names from it, so every caller gets the timed version.
+    """
+    if not METRICS_ENABLED:
+        return
+    for attr, fn in list(namespace.items()):
+        code = getattr(fn, "__code__", None)
+        if (
+            attr.startswith("_")
+            or getattr(fn, "__module__", None) != module
+            or code is None
+            or code.co_varnames[: code.co_argcount][:1] != ("db_path",)
+        ):
+            continue
+        namespace[attr] = timed("storage", attr)(fn)
+
+
+# -----------------------
+# SQL statements
+# -----------------------
+
+_SPACE_RE = re.compile(r"\s+")
+# "?, ?, ?" and "(?, ?), (?, ?)" runs from IN lists and multi-row VALUES.
+_PLACEHOLDERS_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROWS_RE = re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+")
+# raw SQL text -> statement label
+_statement_names: Dict[str, str] = {}
+
+
+def statement_name(sql: str) -> str:
+    name = _statement_names.get(sql)
+    if name is None:
+        name = _SPACE_RE.sub(" ", sql).strip()
+        name = _ROWS_RE.sub(r"\1, ...", _PLACEHOLDERS_RE.sub("?, ...", name))
+        if len(name) > 200:
+            name = name[:197] + "..."
+        with _lock:
+            if len(_statement_names) >= MAX_STATEMENTS:
+                return "other"
+            _statement_names[sql] = name
+    return name
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor recording execute time per statement, and rows fetched, for
+    /metrics and the slow query log.
+
+    The histogram covers execute (SQLite's work up to the first row); time
+    spent fetching the remaining rows is kept as a separate total. The slow
+    query log compares the sum of both with SLOW_QUERY_MS.
+    """
+
+    _statement = "other"
+    # Rows and fetch time of an iteration in progress, recorded when it ends.
+    _iter_rows = 0
+    _iter_fetch = 0.0
+    # Slow query log state of the current statement.
+    _sql = ""
+    _params: Any = None
+    _elapsed = 0.0
+    _rows = 0
+    _logged = False
+
+    def _executed(self, sql: str, parameters: Any, seconds: float, error: bool) -> None:
+        if METRICS_ENABLED:
+            observe("sql", self._statement, seconds, error)
+        if SLOW_QUERY_MS and not error:
+            self._sql, self._params, self._elapsed, self._rows, self._logged = sql, parameters, seconds, 0, False
+            self._check_slow()
+
+    def execute(self, sql: str, parameters: Any = ()) -> "TimedCursor":
+        self._statement = statement_name(sql)
+        error = True
+        start = perf_counter()
+        try:
+            super().execute(sql, parameters)
+            error = False
+            return self
+        finally:
+            self._executed(sql, parameters, perf_counter() - start, error)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "TimedCursor":
+        self._statement = statement_name(sql)
+        error = True
+        start = perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+            error = False
+            return self
+        finally:
+            # No single parameter set to explain the statement with.
+            self._executed(sql, None, perf_counter() - start, error)
+
+    def _fetched(self, rows: int, seconds: float) -> None:
+        if METRICS_ENABLED:
+            _add_rows(rows)
+            with _lock:
+                hist = _histogram("sql", self._statement)
+                hist.rows += rows
+                hist.fetch += seconds
+        if SLOW_QUERY_MS:
+            self._elapsed += seconds
+            self._rows += rows
+            self._check_slow()
+
+    def _check_slow(self) -> None:
+        if not self._logged and self._elapsed * 1000 >= SLOW_QUERY_MS:
+            self._logged = True
+            log_slow_query(self.connection, self._sql, self._params, self._elapsed, self._rows)
+
+    def fetchone(self) -> Any:
+        start = perf_counter()
+        row = super().fetchone()
+        self._fetched(row is not None, perf_counter() - start)
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> List[Any]:
+        start = perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(len(rows), perf_counter() - start)
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        start = perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), perf_counter() - start)
+        return rows
+
+    def __iter__(self) -> "TimedCursor":
+        return self
+
+    def __next__(self) -> Any:
+        # Per row only local counters: the lock is taken once, at the end.
+        start = perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(self._iter_rows, self._iter_fetch + perf_counter() - start)
+            self._iter_rows, self._iter_fetch = 0, 0.0
+            raise
+        self._iter_fetch += perf_counter() - start
+        self._iter_rows += 1
+        return row
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors, including the ones behind execute(), are TimedCursors."""
+
+    def cursor(self, factory: Any = TimedCursor) -> Any:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()) -> TimedCursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> TimedCursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# What app/db.py opens: plain connections unless something needs the timings.
+CONNECTION_FACTORY = TimedConnection if METRICS_ENABLED or SLOW_QUERY_MS else sqlite3.Connection
+
+
+def query_plan(conn: sqlite3.Connection, sql: str, parameters: Any = ()) -> List[str]:
+    """EXPLAIN QUERY PLAN of a statement as indented lines, like the sqlite3
+    shell prints it. Runs on a plain cursor, so it is not itself timed."""
+    rows = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    depth = {0: -1}
+    lines = []
+    for r in rows:
+        node, parent, detail = r[0], r[1], r[3]
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return lines
+
+
+def log_slow_query(conn: sqlite3.Connection, sql: str, parameters: Any, seconds: float, rows: int) -> None:
+    text = _SPACE_RE.sub(" ", sql).strip()
+    if parameters is None:
+        plan = ["(executemany: not explained)"]
+    else:
+        try:
+            plan = query_plan(conn, sql, parameters)
+        except sqlite3.Error as e:
+            plan = [f"(no plan: {e})"]
+    params = repr(parameters)
+    if len(params) > 200:
+        params = params[:197] + "..."
+    slow_query_logger.warning(
+        "slow query: %.1f ms, %d rows: %s params=%s\n  %s", seconds * 1000, rows, text, params, "\n  ".join(plan)
+    )
+
+
+# -----------------------
+# Tool profiler
+# -----------------------
+
+class _Sampler:
+    """Samples the stacks of threads running a profiled call, every
+    PROFILE_INTERVAL_MS, from one daemon thread that sleeps while none is."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.cond = threading.Condition()
+        # thread id -> (frame the profile starts below, folded stack -> samples)
+        self.active: Dict[int, Tuple[Any, Counter]] = {}
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self, thread_id: int, root: Any) -> Counter:
+        counts: Counter = Counter()
+        with self.cond:
+            self.active[thread_id] = (root, counts)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="tool-profiler", daemon=True)
+                self.thread.start()
+            self.cond.notify()
+        return counts
+
+    def stop(self, thread_id: int) -> None:
+        with self.cond:
+            self.active.pop(thread_id, None)
+
+    def _run(self) -> None:
+        while True:
+            with self.cond:
+                while not self.active:
+                    self.cond.wait()
+                # Under the lock, so a stopped call's counts are final.
+                frames = sys._current_frames()
+                for thread_id, (root, counts) in self.active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        counts[_folded(frame, root)] += 1
+                del frames
+            sleep(self.interval)
+
+
+def _folded(frame: Any, root: Any) -> str:
+    """One stack in the collapsed format: outermost first, ';'-separated."""
+    names = []
+    while frame is not None and frame is not root:
+        code = frame.f_code
+        path = code.co_filename.replace(os.sep, "/").rsplit("/", 2)
+        names.append(f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+_sampler = _Sampler(PROFILE_INTERVAL_MS / 1000)
+
+
+def _write_profile(name: str, elapsed: float, counts: Counter) -> None:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    path = os.path.join(PROFILE_DIR, f"{name}-{stamp}-{elapsed * 1000:.0f}ms-{uuid.uuid4().hex[:6]}.folded")
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(f"{stack} {n}\n" for stack, n in sorted(counts.items()))
+
+
+def profiled(name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator sampling each call's stack and writing it to PROFILE_DIR as
+    a collapsed-stack file (flamegraph.pl, speedscope), one per call that
+    took PROFILE_MIN_MS or more. A no-op unless PROFILE_TOOLS is on."""
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if not PROFILE_TOOLS:
+            return fn
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            thread_id = threading.get_ident()
+            if thread_id in _sampler.active:
+                return fn(*args, **kwargs)
+            counts = _sampler.start(thread_id, sys._getframe())
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                _sampler.stop(thread_id)
+                if counts and elapsed * 1000 >= PROFILE_MIN_MS:
+                    try:
+                        _write_profile(label, elapsed, counts)
+                    except OSError:
+                        logger.exception("could not write profile of %s", label)
+        return wrapper
+    return decorate
+
+
+# -----------------------
+# API routes
+# -----------------------
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request by method and route template
+    (so /recommend/p1/design and /recommend/p2/qa share one series). Errors
+    are 5xx responses or exceptions. Streaming responses count until closed."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            observe("route", f"{scope['method']} {path}", perf_counter() - start, status >= 500)
+
+
+# -----------------------
+# Export
+# -----------------------
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _snapshot() -> List[Tuple[str, str, Histogram]]:
+    with _lock:
+        out = []
+        for (kind, name), hist in sorted(_series.items()):
+            copy = Histogram()
+            copy.counts = hist.counts[:]
+            copy.total, copy.max, copy.errors, copy.rows, copy.fetch = hist.total, hist.max, hist.errors, hist.rows, hist.fetch
+            out.append((kind, name, copy))
+        return out
+
+
+_KIND_LABELS = {"tool": "tool", "route": "route", "storage": "function", "sql": "statement"}
+
+
+def render_prometheus() -> str:
+    """All series in the Prometheus text exposition format (version 0.0.4)."""
+    lines = [
+        "# HELP wise_metrics_enabled Whether instrumentation is on (METRICS_ENABLED).",
+        "# TYPE wise_metrics_enabled gauge",
+        f"wise_metrics_enabled {int(METRICS_ENABLED)}",
+    ]
+    series = _snapshot()
+    for kind in ("tool", "route", "storage", "sql"):
+        of_kind = [(name, hist) for k, name, hist in series if k == kind]
+        if not of_kind:
+            continue
+        metric = f"wise_{kind}"
+        key = _KIND_LABELS[kind]
+        lines.append(f"# HELP {metric}_duration_seconds Latency of each {key}.")
+        lines.append(f"# TYPE {metric}_duration_seconds histogram")
+        for name, hist in of_kind:
+            label = f'{key}="{_label(name)}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS, hist.counts):
+                cumulative += n
+                lines.append(f'{metric}_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_duration_seconds_bucket{{{label},le="+Inf"}} {hist.count}')
+            lines.append(f"{metric}_duration_seconds_sum{{{label}}} {hist.total:.6f}")
+            lines.append(f"{metric}_duration_seconds_count{{{label}}} {hist.count}")
+        lines.append(f"# HELP {metric}_errors_total Calls of each {key} that raised or returned 5xx.")
+        lines.append(f"# TYPE {metric}_errors_total counter")
+        lines.extend(f'{metric}_errors_total{{{key}="{_label(name)}"}} {hist.errors}' for name, hist in of_kind)
+        if kind in ("storage", "sql"):
+            lines.append(f"# HELP {metric}_rows_total Rows fetched from SQLite by each {key}.")
+            lines.append(f"# TYPE {metric}_rows_total counter")
+            lines.extend(f'{metric}_rows_total{{{key}="{_label(name)}"}} {hist.rows}' for name, hist in of_kind)
+        if kind == "sql":
+            lines.append("# HELP wise_sql_fetch_seconds_total Time spent fetching rows after execute.")
+            lines.append("# TYPE wise_sql_fetch_seconds_total counter")
+            lines.extend(f'wise_sql_fetch_seconds_total{{statement="{_label(name)}"}} {hist.fetch:.6f}' for name, hist in of_kind)
+    return "\n".join(lines) + "\n"
+
+
+def summary(top: int = 10) -> Dict[str, Any]:
+    """The `top` series of each kind by total time, with call counts and
+    latency estimates in milliseconds (for health_check)."""
+    if not METRICS_ENABLED:
+        return {"enabled": False}
+    out: Dict[str, Any] = {"enabled": True}
+    series = _snapshot()
+    for kind in ("tool", "route", "storage", "sql"):
+        of_kind = sorted(((name, hist) for k, name, hist in series if k == kind), key=lambda s: -s[1].total)
+        out[kind] = [
+            {
+                "name": name,
+                "calls": hist.count,
+                "errors": hist.errors,
+                "total_ms": round(hist.total * 1000, 3),
+                "p50_ms": round(hist.quantile(0.5) * 1000, 3),
+                "p95_ms": round(hist.quantile(0.95) * 1000, 3),
+                "max_ms": round(hist.max * 1000, 3),
+                **({"rows": hist.rows} if kind in ("storage", "sql") else {}),
+                **({"fetch_ms": round(hist.fetch * 1000, 3)} if kind == "sql" else {}),
+            }
+            for name, hist in of_kind[:top]
+        ]
+    return out
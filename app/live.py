@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+
+from .async_storage import change_version, get_changes
+from .config import LIVE_POLL_INTERVAL_MS, LIVE_SUBSCRIBER_QUEUE
+
+logger = logging.getLogger(__name__)
+
+
+def sse_message(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class LiveHub:
+    """Fans out database changes to Server-Sent Events subscribers.
+
+    Writes can come from the FastAPI routes or from the MCP server, which runs
+    in a different process, so the hub does not rely on in-process calls:
+    one asyncio task tails the `changes` log (see storage.get_changes) and
+    publishes whatever arrived since the last poll as a single "changes"
+    message. Bursts are coalesced per poll interval, each message is
+    serialized once and shared by all subscribers, and subscribers are plain
+    asyncio queues, so idle clients cost no threads.
+
+    A subscriber that falls `queue_size` messages behind is dropped to a
+    single "reset" message telling it to refetch instead of replaying.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        poll_interval_s: float = LIVE_POLL_INTERVAL_MS / 1000,
+        queue_size: int = LIVE_SUBSCRIBER_QUEUE,
+    ) -> None:
+        self.db_path = db_path
+        self.poll_interval_s = poll_interval_s
+        self.queue_size = queue_size
+        self.version = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self.version = await change_version(self.db_path)
+            self._task = asyncio.get_running_loop().create_task(self._poll_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def subscribe(self) -> asyncio.Queue:
+        await self.start()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, message: str) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._reset_subscriber(queue)
+
+    def _reset_subscriber(self, queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(sse_message("reset", {"version": self.version}))
+
+    async def _poll_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval_s)
+            try:
+                await self._poll_once()
+            except Exception:
+                logger.exception("live update poll failed")
+
+    async def _poll_once(self) -> None:
+        latest = await change_version(self.db_path)
+        if latest == self.version:
+            return
+        if not self._subscribers:
+            # Nobody to tell; just move the cursor.
+            self.version = latest
+            return
+        has_more = True
+        while has_more:
+            batch = await get_changes(self.db_path, self.version)
+            self.version = batch["version"]
+            has_more = batch["has_more"]
+            if batch["reset"]:
+                self.publish(sse_message("reset", {"version": self.version}))
+                return
+            if batch["changes"]:
+                self.publish(sse_message("changes", {"version": self.version, "changes": batch["changes"]}))
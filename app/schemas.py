@@ -2,7 +2,15 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from .utils import normalize_timestamp
+
+
+def _canonical_timestamp(value: Optional[str]) -> Optional[str]:
+    # Every stored timestamp is UTC in one fixed-width form (see
+    # normalize_timestamp), so string order is time order.
+    return None if value is None else normalize_timestamp(value)
 
 
 class Event(BaseModel):
@@ -13,6 +21,8 @@ class Event(BaseModel):
     timestamp: str = Field(..., description="UTC ISO timestamp")
     payload: Dict[str, Any] = Field(default_factory=dict)
 
+    _normalize_timestamp = field_validator("timestamp")(_canonical_timestamp)
+
 
 class Decision(BaseModel):
     id: str
@@ -25,6 +35,8 @@ class Decision(BaseModel):
     actual_outcomes: Dict[str, Any] = Field(default_factory=dict)
     tags: List[str] = Field(default_factory=list)
 
+    _normalize_timestamp = field_validator("timestamp")(_canonical_timestamp)
+
 
 class ResourceUpdate(BaseModel):
     id: str
@@ -36,6 +48,8 @@ class ResourceUpdate(BaseModel):
     timestamp: str = Field(..., description="UTC ISO timestamp")
     notes: str = ""
 
+    _normalize_timestamp = field_validator("timestamp")(_canonical_timestamp)
+
 
 class Project(BaseModel):
     id: str
@@ -44,6 +58,8 @@ class Project(BaseModel):
     status: str = "active"
     created_at: str = Field(..., description="UTC ISO timestamp")
 
+    _normalize_created_at = field_validator("created_at")(_canonical_timestamp)
+
 
 class User(BaseModel):
     id: str
@@ -61,6 +77,8 @@ class Milestone(BaseModel):
     due_date: Optional[str] = None
     completed_at: Optional[str] = None
 
+    _normalize_completed_at = field_validator("completed_at")(_canonical_timestamp)
+
 
 class TaskHistory(BaseModel):
     id: str
@@ -70,4 +88,5 @@ class TaskHistory(BaseModel):
     success_rating: int = Field(..., description="1-5 rating")
     timestamp: str
 
+    _normalize_timestamp = field_validator("timestamp")(_canonical_timestamp)
 
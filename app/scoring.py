@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import SCORING_CACHE_TTL_S
+from .storage import get_task_type_stats, task_history_generation
+
+# (db_path, task_type) -> (history generation, loaded_at, stats by user)
+_cache: Dict[Tuple[str, str], Tuple[int, float, Dict[str, Dict[str, Any]]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _stats_for(db_path: str, task_type: str) -> Dict[str, Dict[str, Any]]:
+    key = (db_path, task_type)
+    generation = task_history_generation(db_path)
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(key)
+    if hit and hit[0] == generation and now - hit[1] < SCORING_CACHE_TTL_S:
+        return hit[2]
+    stats = get_task_type_stats(db_path, task_type)
+    with _cache_lock:
+        _cache[key] = (generation, now, stats)
+    return stats
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def score(stats: Optional[Dict[str, Any]]) -> float:
+    # Rating (higher is better) / Duration (lower is better); no history scores 0.
+    if not stats:
+        return 0.0
+    avg_duration = stats["avg_duration"] or 1  # Avoid div by zero
+    return stats["avg_rating"] / avg_duration
+
+
+def task_type_stats(db_path: str, task_type: str) -> Dict[str, Dict[str, Any]]:
+    """Per-user history aggregates for a task type (cached, see _stats_for)."""
+    return _stats_for(db_path, task_type)
+
+
+def rank_candidates(db_path: str, task_type: str, candidate_user_ids: List[str], k: int = 5) -> List[Dict[str, Any]]:
+    """Top-k candidates for a task type, best first, with their scores.
+
+    Aggregates for every user come from one grouped query that is cached per
+    task type and invalidated by new task history. Ties keep candidate order.
+    Raises ValueError for k < 1.
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    stats = _stats_for(db_path, task_type)
+    ranked = []
+    for user_id in candidate_user_ids:
+        s = stats.get(user_id)
+        ranked.append(
+            {
+                "user_id": user_id,
+                "score": score(s),
+                "tasks": s["tasks"] if s else 0,
+                "avg_rating": s["avg_rating"] if s else None,
+                "avg_duration": s["avg_duration"] if s else None,
+            }
+        )
+    ranked.sort(key=lambda c: c["score"], reverse=True)
+    return ranked[:k]
@@ -4,12 +4,17 @@ from north_mcp_python_sdk import NorthMCPServer
 
 from .config import APP_NAME, PORT, SERVER_SECRET, DB_PATH, DEBUG
 from .storage import init_db
+from .instrument import profiled, timed
 from .tools.health import health_check
-from .tools.events import log_event, list_events
+from .tools.events import log_event, list_events, aggregate_events
 
-from .storage import create_project, add_user, create_milestone, update_milestone_status, log_task_history, get_project_details
+from .storage import create_project, add_user, create_milestone, update_milestone_status, log_task_history, get_project_details, get_dashboard
 from .schemas import Project, User, Milestone, TaskHistory
-from .tools.workflow import recommend_task_assignee
+from .utils import utc_now_iso
+from .tools.workflow import match_skills, plan_milestone_assignments, recommend_task_assignees
+from .tools.bulk import log_events_bulk, log_work_bulk
+from .tools.decisions import record_decision, record_decision_outcomes, search_decisions
+from .tools.metrics import log_resource_metric, log_resource_metrics, query_resource_metrics
 from typing import List
 
 
@@ -23,11 +28,17 @@ def create_server():
 
     mcp = NorthMCPServer(**kwargs)
 
-    @mcp.tool()
+    def tool():
+        # mcp.tool(), timed per tool for health_check when METRICS_ENABLED is
+        # on and sampled to PROFILE_DIR when PROFILE_TOOLS is
+        register = mcp.tool()
+        return lambda fn: register(timed("tool")(profiled()(fn)))
+
+    @tool()
     def Lamar_Afify_v2_health_check():
         return health_check()
 
-    @mcp.tool()
+    @tool()
     def Lamar_Afify_v2_log_event(
         type: str,
         team: str,
@@ -49,7 +60,7 @@ def create_server():
             payload=payload,
         )
 
-    @mcp.tool()
+    @tool()
     def Lamar_Afify_v2_list_events(
         team: str = "",
         type: str = "",
@@ -57,6 +68,9 @@ def create_server():
         start_ts: str = "",
         end_ts: str = "",
         limit: int = 50,
+        cursor: str = "",
+        fields: str = "",
+        payload_filter: dict = None,
     ):
         # Convert empty strings -> None so filters behave nicely
         team = team or None
@@ -64,6 +78,7 @@ def create_server():
         severity = severity or None
         start_ts = start_ts or None
         end_ts = end_ts or None
+        cursor = cursor or None
 
         return list_events(
             db_path=DB_PATH,
@@ -73,9 +88,36 @@ def create_server():
             start_ts=start_ts,
             end_ts=end_ts,
             limit=limit,
+            cursor=cursor,
+            # e.g. "type,severity" to skip payloads; id and timestamp always come back
+            fields=fields.split(",") if fields else None,
+            # e.g. {"service": "ledger", "details.attempts": {"gte": 3}, "region": ["us", "eu"]}
+            payload_filter=payload_filter or None,
         )
 
-    @mcp.tool()
+    @tool()
+    def Lamar_Afify_v2_aggregate_events(
+        bucket: str = "day",
+        group_by: str = "",
+        team: str = "",
+        type: str = "",
+        severity: str = "",
+        start_ts: str = "",
+        end_ts: str = "",
+    ):
+        # bucket: hour, day or week; group_by: any of "team,type,severity"
+        return aggregate_events(
+            db_path=DB_PATH,
+            bucket=bucket,
+            group_by=group_by.split(",") if group_by else None,
+            team=team or None,
+            type=type or None,
+            severity=severity or None,
+            start_ts=start_ts or None,
+            end_ts=end_ts or None,
+        )
+
+    @tool()
     def Lamar_Afify_v2_create_project(
         id: str,
         name: str,
@@ -83,21 +125,20 @@ def create_server():
         status: str = "active",
         created_at: str = None
     ):
-        from datetime import datetime
-        if not created_at: created_at = datetime.utcnow().isoformat()
+        if not created_at: created_at = utc_now_iso()
         
         project = Project(id=id, name=name, deadline=deadline, status=status, created_at=created_at)
         create_project(DB_PATH, project)
         return {"status": "success", "project_id": id}
 
-    @mcp.tool()
+    @tool()
     def Lamar_Afify_v2_onboard_user(id: str, name: str, role: str = "member", skills: dict = None):
         if skills is None: skills = {}
         user = User(id=id, name=name, role=role, skills=skills)
         add_user(DB_PATH, user)
         return {"status": "success", "user_id": id}
 
-    @mcp.tool()
+    @tool()
     def Lamar_Afify_v2_add_milestone(
         id: str, project_id: str, title: str, due_date: str = None, assigned_to: str = None
     ):
@@ -105,37 +146,162 @@ def create_server():
         create_milestone(DB_PATH, ms)
         return {"status": "success", "milestone_id": id}
 
-    @mcp.tool()
+    @tool()
     def Lamar_Afify_v2_complete_milestone(id: str):
-        from datetime import datetime
-        update_milestone_status(DB_PATH, id, "completed", completed_at=datetime.utcnow().isoformat())
+        update_milestone_status(DB_PATH, id, "completed", completed_at=utc_now_iso())
         return {"status": "success", "milestone_id": id}
 
-    @mcp.tool()
-    def Lamar_Afify_v2_get_dashboard():
-        return get_project_details(DB_PATH)
+    @tool()
+    def Lamar_Afify_v2_get_dashboard(
+        project_id: str = "",
+        fields: str = "",
+        limit: int = 20,
+        offset: int = 0,
+        full: bool = False,
+    ):
+        # full=True returns every project, user and milestone (the original dump)
+        if full:
+            return get_project_details(DB_PATH)
+        return get_dashboard(
+            DB_PATH,
+            project_id=project_id or None,
+            fields=fields.split(",") if fields else None,
+            limit=limit,
+            offset=offset,
+        )
+
+    @tool()
+    def Lamar_Afify_v2_recommend_assignee(project_id: str, task_type: str, candidate_users: List[str], k: int = 5):
+        candidates = recommend_task_assignees(DB_PATH, project_id, task_type, candidate_users, k=k)
+        recommended_user = candidates[0]["user_id"] if candidates else None
+        return {"recommended_user_id": recommended_user, "task_type": task_type, "candidates": candidates}
 
-    @mcp.tool()
-    def Lamar_Afify_v2_recommend_assignee(project_id: str, task_type: str, candidate_users: List[str]):
-        recommended_user = recommend_task_assignee(DB_PATH, project_id, task_type, candidate_users)
-        return {"recommended_user_id": recommended_user, "task_type": task_type}
+    @tool()
+    def Lamar_Afify_v2_match_skills(
+        task_type: str, candidate_users: List[str] = None, k: int = 10, skills: dict = None
+    ):
+        # Ranks users by User.skills blended with task history; skills e.g. {"python": 2, "sql": 1}
+        return match_skills(DB_PATH, task_type, candidate_users or None, k=min(k, 100), skills=skills)
 
-    @mcp.tool()
+    @tool()
+    def Lamar_Afify_v2_assign_milestones(
+        project_id: str,
+        default_task_type: str = "",
+        task_types: dict = None,
+        candidate_users: List[str] = None,
+        capacity: int = 0,
+        apply: bool = False,
+    ):
+        # Plans every unassigned milestone of the project at once; task_types maps milestone id -> task type.
+        # capacity caps open milestones per user (0 = spread evenly); apply=True writes the plan.
+        return plan_milestone_assignments(
+            DB_PATH,
+            project_id,
+            candidate_users or None,
+            task_types,
+            default_task_type or None,
+            capacity=capacity or None,
+            apply=apply,
+        )
+
+    @tool()
     def Lamar_Afify_v2_log_work(
         id: str, user_id: str, task_type: str, duration: int, rating: int
     ):
-        from datetime import datetime
         history = TaskHistory(
             id=id,
             user_id=user_id,
             task_type=task_type,
             duration_minutes=duration,
             success_rating=rating,
-            timestamp=datetime.utcnow().isoformat()
+            timestamp=utc_now_iso()
         )
         log_task_history(DB_PATH, history)
         return {"status": "success", "entry_id": id}
 
+    @tool()
+    def Lamar_Afify_v2_log_events_bulk(events: list = None, ndjson: str = ""):
+        # Either a list of event objects or an NDJSON string, one event per line
+        return log_events_bulk(DB_PATH, ndjson if ndjson else (events or []))
+
+    @tool()
+    def Lamar_Afify_v2_log_work_bulk(entries: list = None, ndjson: str = ""):
+        # Records use the TaskHistory fields (duration_minutes, success_rating, ...)
+        return log_work_bulk(DB_PATH, ndjson if ndjson else (entries or []))
+
+    @tool()
+    def Lamar_Afify_v2_log_resource_metric(
+        resource: str,
+        metric: str,
+        value: float,
+        unit: str,
+        team: str = "",
+        timestamp: str = "",
+        notes: str = "",
+    ):
+        # e.g. resource="SupportQueue", metric="tickets", unit="tickets"
+        return log_resource_metric(
+            DB_PATH, resource, metric, value, unit, team=team or None, timestamp=timestamp or None, notes=notes
+        )
+
+    @tool()
+    def Lamar_Afify_v2_log_resource_metrics(samples: list):
+        # ResourceUpdate fields per sample; id and timestamp default like the single-sample tool
+        return log_resource_metrics(DB_PATH, samples)
+
+    @tool()
+    def Lamar_Afify_v2_query_resource_metrics(
+        resource: str,
+        metric: str = "",
+        team: str = "",
+        interval: str = "hour",
+        start_ts: str = "",
+        end_ts: str = "",
+        limit: int = 1000,
+    ):
+        # interval: raw, hour or day (min/max/avg per bucket); no metric lists the resource's series
+        return query_resource_metrics(
+            DB_PATH,
+            resource,
+            metric=metric or None,
+            team=team or None,
+            interval=interval,
+            start_ts=start_ts or None,
+            end_ts=end_ts or None,
+            limit=limit,
+        )
+
+    @tool()
+    def Lamar_Afify_v2_record_decision(
+        title: str,
+        rationale: str = "",
+        made_by: List[str] = None,
+        owners: List[str] = None,
+        tags: List[str] = None,
+        expected_outcomes: dict = None,
+        timestamp: str = "",
+    ):
+        return record_decision(
+            DB_PATH, title, rationale, made_by, owners, tags, expected_outcomes, timestamp=timestamp or None
+        )
+
+    @tool()
+    def Lamar_Afify_v2_record_decision_outcomes(id: str, actual_outcomes: dict):
+        return record_decision_outcomes(DB_PATH, id, actual_outcomes)
+
+    @tool()
+    def Lamar_Afify_v2_search_decisions(
+        query: str = "",
+        owners: List[str] = None,
+        start_ts: str = "",
+        end_ts: str = "",
+        limit: int = 10,
+    ):
+        # Ranked full-text search over title, rationale and tags; no query lists the newest
+        return search_decisions(
+            DB_PATH, query or None, owners, start_ts=start_ts or None, end_ts=end_ts or None, limit=min(limit, 100)
+        )
+
     return mcp
 
 
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import ASSIGNMENT_SKILL_WEIGHT
+from .scoring import score, task_type_stats
+from .storage import change_version, changed_row_ids, get_user_skills
+
+
+class SkillMatrix:
+    """Every user's User.skills as one dense (user x skill) float32 matrix.
+
+    Rows and columns are appended as users and skill names appear, in blocks
+    that double, so adding a user is amortized O(skills). Deleted users keep
+    their row, zeroed and marked inactive. Not thread-safe on its own: use it
+    under _lock (see match_users).
+    """
+
+    def __init__(self) -> None:
+        self.user_ids: List[str] = []
+        self.user_index: Dict[str, int] = {}
+        self.skill_index: Dict[str, int] = {}
+        self.values = np.zeros((0, 0), dtype=np.float32)
+        self.active = np.zeros(0, dtype=bool)
+        self.version = -1
+        # task type -> (history stats object it was built from, user count, scores, tasks)
+        self._history: Dict[str, Tuple[Any, int, np.ndarray, np.ndarray]] = {}
+
+    def _grow(self, rows: int, cols: int) -> None:
+        have_rows, have_cols = self.values.shape
+        if rows <= have_rows and cols <= have_cols:
+            return
+        if rows > have_rows:
+            rows = max(rows, 2 * have_rows, 64)
+        if cols > have_cols:
+            cols = max(cols, 2 * have_cols, 16)
+        grown = np.zeros((max(rows, have_rows), max(cols, have_cols)), dtype=np.float32)
+        grown[:have_rows, :have_cols] = self.values
+        self.values = grown
+        active = np.zeros(grown.shape[0], dtype=bool)
+        active[:have_rows] = self.active
+        self.active = active
+
+    def upsert(self, user_id: str, skills: Dict[str, float]) -> None:
+        for name in skills:
+            self.skill_index.setdefault(name, len(self.skill_index))
+        row = self.user_index.get(user_id)
+        if row is None:
+            row = self.user_index[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+        self._grow(len(self.user_ids), len(self.skill_index))
+        self.values[row] = 0.0
+        if skills:
+            cols = [self.skill_index[name] for name in skills]
+            self.values[row, cols] = np.clip(np.fromiter(skills.values(), dtype=np.float32, count=len(cols)), 0.0, 1.0)
+        self.active[row] = True
+
+    def remove(self, user_id: str) -> None:
+        row = self.user_index.get(user_id)
+        if row is not None:
+            self.values[row] = 0.0
+            self.active[row] = False
+
+    def column(self, skills: Dict[str, float]) -> np.ndarray:
+        """Weighted mean of the named skills for every user row (0 for unknown skills)."""
+        n = len(self.user_ids)
+        total = sum(skills.values())
+        out = np.zeros(n, dtype=np.float32)
+        if total <= 0:
+            return out
+        for name, weight in skills.items():
+            col = self.skill_index.get(name)
+            if col is not None and weight:
+                out += (weight / total) * self.values[:n, col]
+        return out
+
+    def rows(self, user_ids: Sequence[str]) -> np.ndarray:
+        """Row of each id that is an active user, in order; unknown ids are dropped."""
+        index = self.user_index
+        rows = np.fromiter((index.get(u, -1) for u in user_ids), dtype=np.int64, count=len(user_ids))
+        rows = rows[rows >= 0]
+        return rows[self.active[rows]]
+
+
+# db_path -> SkillMatrix, caught up with the change log on every read.
+_matrices: Dict[str, SkillMatrix] = {}
+_lock = threading.Lock()
+
+
+def _refresh(db_path: str) -> SkillMatrix:
+    """The db's SkillMatrix, brought up to date first. Call with _lock held.
+
+    Users written since the last call (add_user here or in any other process)
+    are found in the `changes` log and reloaded one by one; the whole matrix
+    is rebuilt only the first time or when the log has been pruned past it.
+    """
+    matrix = _matrices.get(db_path)
+    changed = None
+    if matrix is not None:
+        version, changed = changed_row_ids(db_path, "users", matrix.version)
+    if changed is None:
+        matrix = SkillMatrix()
+        # Version before rows: a write in between is just reloaded next time.
+        matrix.version = change_version(db_path)
+        for user_id, skills in get_user_skills(db_path).items():
+            matrix.upsert(user_id, skills)
+        _matrices[db_path] = matrix
+        return matrix
+    if changed:
+        current = get_user_skills(db_path, changed)
+        for user_id in changed:
+            if user_id in current:
+                matrix.upsert(user_id, current[user_id])
+            else:
+                matrix.remove(user_id)
+    matrix.version = version
+    return matrix
+
+
+def clear_cache() -> None:
+    with _lock:
+        _matrices.clear()
+
+
+def history_scores(db_path: str, task_type: str, matrix: SkillMatrix) -> Tuple[np.ndarray, np.ndarray]:
+    """(score, tasks) per matrix row from the task type's history rollup (see
+    app/scoring.py: avg rating / avg duration; 0 without history).
+
+    Kept on the matrix until the rollup cache reloads or users are added.
+    """
+    n = len(matrix.user_ids)
+    stats_by_user = task_type_stats(db_path, task_type)
+    cached = matrix._history.get(task_type)
+    if cached and cached[0] is stats_by_user and cached[1] == n:
+        return cached[2], cached[3]
+    scores = np.zeros(n)
+    tasks = np.zeros(n, dtype=np.int64)
+    rows, values, counts = [], [], []
+    # Only users with history for the task type are visited.
+    for user_id, stats in stats_by_user.items():
+        row = matrix.user_index.get(user_id)
+        if row is not None:
+            rows.append(row)
+            values.append(score(stats))
+            counts.append(stats["tasks"])
+    if rows:
+        scores[rows] = values
+        tasks[rows] = counts
+    matrix._history[task_type] = (stats_by_user, n, scores, tasks)
+    return scores, tasks
+
+
+def _blend(skill: np.ndarray, history: np.ndarray, skill_weight: float) -> Tuple[np.ndarray, np.ndarray]:
+    """(fit, history scaled to the best candidate) for one task type's candidate rows."""
+    best = history.max() if history.size else 0.0
+    history_fit = history / best if best > 0 else np.zeros(history.size)
+    return skill_weight * skill + (1 - skill_weight) * history_fit, history_fit
+
+
+def fit_matrix(
+    db_path: str,
+    task_types: Sequence[str],
+    candidate_user_ids: Sequence[str],
+    skill_weight: float = ASSIGNMENT_SKILL_WEIGHT,
+) -> Tuple[List[str], np.ndarray]:
+    """(user ids, task type x user fit) with the match_users blend, for the
+    candidates that are existing users, in candidate order."""
+    with _lock:
+        matrix = _refresh(db_path)
+        rows = matrix.rows(candidate_user_ids)
+        user_ids = [matrix.user_ids[r] for r in rows]
+        fit = np.zeros((len(task_types), rows.size))
+        for t, task_type in enumerate(task_types):
+            history, _ = history_scores(db_path, task_type, matrix)
+            fit[t], _ = _blend(matrix.column({task_type: 1.0})[rows], history[rows], skill_weight)
+    return user_ids, fit
+
+
+def match_users(
+    db_path: str,
+    task_type: str,
+    candidate_user_ids: Optional[Sequence[str]] = None,
+    k: int = 10,
+    skills: Optional[Dict[str, float]] = None,
+    skill_weight: float = ASSIGNMENT_SKILL_WEIGHT,
+) -> List[Dict[str, Any]]:
+    """Top-k users for a task type by skill and history, best first.
+
+    skill is the weighted mean of `skills` (skill name -> weight; default the
+    skill named like the task type) from User.skills. history is the app's
+    history score scaled so the best candidate is 1. score blends the two by
+    skill_weight. Candidates default to every user; unknown ids are skipped.
+    Raises ValueError for k < 1.
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    with _lock:
+        matrix = _refresh(db_path)
+        skill = matrix.column(skills or {task_type: 1.0})
+        history, tasks = history_scores(db_path, task_type, matrix)
+        if candidate_user_ids is None:
+            rows = np.flatnonzero(matrix.active[: len(matrix.user_ids)])
+        else:
+            rows = matrix.rows(candidate_user_ids)
+        user_ids = matrix.user_ids[:]
+    if rows.size == 0:
+        return []
+
+    combined, history_fit = _blend(skill[rows], history[rows], skill_weight)
+    k = min(k, rows.size)
+    top = np.argpartition(-combined, k - 1)[:k]
+    # Best first; among equal scores, candidate order.
+    top = top[np.lexsort((top, -combined[top]))]
+    return [
+        {
+            "user_id": user_ids[rows[i]],
+            "score": round(float(combined[i]), 4),
+            "skill": round(float(skill[rows[i]]), 4),
+            "history": round(float(history_fit[i]), 4),
+            "history_score": float(history[rows[i]]),
+            "tasks": int(tasks[rows[i]]),
+        }
+        for i in top
+    ]
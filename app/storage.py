@@ -1,132 +1,919 @@
-
 from __future__ import annotations
 
+import os
+import re
 import sqlite3
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from .schemas import Event, Project, User, Milestone, TaskHistory
+from .config import (
+    CHANGES_RETENTION,
+    EVENT_HOT_MONTHS,
+    EVENT_INDEXED_PAYLOAD_KEYS,
+    EVENT_PARTITION_DIR,
+    EVENT_PARTITIONING,
+    EVENT_PAYLOAD_COMPRESS_MIN_BYTES,
+    EVENT_PAYLOAD_ENCODING,
+    EVENT_RETENTION_MONTHS,
+    STATS_HALF_LIFE_DAYS,
+)
+from .db import connection, payload_text, transaction
+from .instrument import instrument_storage
+from .schemas import Decision, Event, Project, ResourceUpdate, User, Milestone, TaskHistory
+from .utils import epoch_us_to_timestamp, iso_to_epoch_seconds, normalize_timestamp, timestamp_to_epoch_us
 
 
-def _connect(db_path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+_EVENTS_DDL = """
+    CREATE TABLE IF NOT EXISTS events (
+        id TEXT PRIMARY KEY,
+        type TEXT NOT NULL,
+        team TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        payload_json TEXT NOT NULL
+    )
+"""
 
 
 def init_db(db_path: str) -> None:
-    conn = _connect(db_path)
-    cur = conn.cursor()
+    with transaction(db_path) as conn:
+        # DDL does not open a transaction implicitly; take the write lock up
+        # front so table creation and migrations are atomic and two processes
+        # starting together cannot both migrate.
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(_EVENTS_DDL)
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS projects (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                deadline TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                role TEXT NOT NULL,
+                skills_json TEXT NOT NULL
+            )
+            """
+        )
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS milestones (
+                id TEXT PRIMARY KEY,
+                project_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                status TEXT NOT NULL,
+                assigned_to TEXT,
+                due_date TEXT,
+                completed_at TEXT,
+                FOREIGN KEY(project_id) REFERENCES projects(id)
+            )
+            """
+        )
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS task_history (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                task_type TEXT NOT NULL,
+                duration_minutes INTEGER NOT NULL,
+                success_rating INTEGER NOT NULL,
+                timestamp TEXT NOT NULL,
+                FOREIGN KEY(user_id) REFERENCES users(id)
+            )
+            """
+        )
+
+        _migrate(conn)
+        _sync_payload_columns(conn)
+        _prune_changes(conn, CHANGES_RETENTION)
+
+
+# -----------------------
+# Schema migrations
+# -----------------------
+# Each migration runs once, in order, inside init_db's transaction; the
+# applied version is kept in PRAGMA user_version. Append new steps to
+# _MIGRATIONS, never edit or reorder shipped ones.
+
+def _m001_access_path_indexes(conn: sqlite3.Connection) -> None:
+    # query_events: optional equality on team/type/severity, optional
+    # timestamp range, ORDER BY timestamp DESC. A (column, timestamp) index
+    # per filter column serves the range and the sort without a temp b-tree;
+    # combined filters use one of them and check the rest per row.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_team_ts ON events(team, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events(type, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_severity_ts ON events(severity, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_task_history_user_type ON task_history(user_id, task_type)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_milestones_project ON milestones(project_id)")
 
-    cur.execute(
+
+def _m002_keyset_indexes(conn: sqlite3.Connection) -> None:
+    # Keyset pagination orders by (timestamp, id); id has to be in the index
+    # too or ties on timestamp need a sort.
+    for name, columns in (
+        ("idx_events_timestamp", "timestamp, id"),
+        ("idx_events_team_ts", "team, timestamp, id"),
+        ("idx_events_type_ts", "type, timestamp, id"),
+        ("idx_events_severity_ts", "severity, timestamp, id"),
+    ):
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.execute(f"CREATE INDEX {name} ON events({columns})")
+
+
+def _m003_task_type_stats_index(conn: sqlite3.Connection) -> None:
+    # Covering index for the per-task_type GROUP BY user_id in get_task_type_stats.
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_task_history_type_user "
+        "ON task_history(task_type, user_id, success_rating, duration_minutes)"
+    )
+
+
+def _m004_user_task_stats(conn: sqlite3.Connection) -> None:
+    conn.execute(
         """
-        CREATE TABLE IF NOT EXISTS events (
-            id TEXT PRIMARY KEY,
-            type TEXT NOT NULL,
+        CREATE TABLE IF NOT EXISTS user_task_stats (
+            task_type TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            tasks INTEGER NOT NULL,
+            rating_sum INTEGER NOT NULL,
+            duration_sum INTEGER NOT NULL,
+            last_timestamp TEXT,
+            decay_weight_sum REAL NOT NULL,
+            decay_rating_sum REAL NOT NULL,
+            decay_duration_sum REAL NOT NULL,
+            PRIMARY KEY (task_type, user_id)
+        ) WITHOUT ROWID
+        """
+    )
+    _rebuild_user_task_stats(conn)
+
+
+def _m005_project_milestone_counts(conn: sqlite3.Connection) -> None:
+    # Milestone counts per (project, status), kept current by triggers so the
+    # dashboard summary is a primary-key lookup. Overdue counts depend on the
+    # current date, so they come from the (project_id, status, due_date) index
+    # instead, which also supersedes idx_milestones_project.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS project_milestone_counts (
+            project_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (project_id, status)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_milestones_counts_insert AFTER INSERT ON milestones
+        BEGIN
+            INSERT INTO project_milestone_counts (project_id, status, count)
+            VALUES (NEW.project_id, NEW.status, 1)
+            ON CONFLICT(project_id, status) DO UPDATE SET count = count + 1;
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_milestones_counts_update
+        AFTER UPDATE OF project_id, status ON milestones
+        WHEN OLD.project_id IS NOT NEW.project_id OR OLD.status IS NOT NEW.status
+        BEGIN
+            UPDATE project_milestone_counts SET count = count - 1
+            WHERE project_id = OLD.project_id AND status = OLD.status;
+            INSERT INTO project_milestone_counts (project_id, status, count)
+            VALUES (NEW.project_id, NEW.status, 1)
+            ON CONFLICT(project_id, status) DO UPDATE SET count = count + 1;
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_milestones_counts_delete AFTER DELETE ON milestones
+        BEGIN
+            UPDATE project_milestone_counts SET count = count - 1
+            WHERE project_id = OLD.project_id AND status = OLD.status;
+        END
+        """
+    )
+    conn.execute("DELETE FROM project_milestone_counts")
+    conn.execute(
+        """
+        INSERT INTO project_milestone_counts (project_id, status, count)
+        SELECT project_id, status, COUNT(*) FROM milestones GROUP BY project_id, status
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_milestones_project_status_due ON milestones(project_id, status, due_date)")
+    conn.execute("DROP INDEX IF EXISTS idx_milestones_project")
+
+
+# Tables whose writes are recorded in the change log (see "Change log" below).
+_TRACKED_TABLES = ("projects", "users", "milestones", "task_history", "events")
+
+
+def _m006_change_log(conn: sqlite3.Connection) -> None:
+    # AUTOINCREMENT so versions never go backwards, even after pruning.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS changes (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id TEXT NOT NULL,
+            op TEXT NOT NULL
+        )
+        """
+    )
+    for table in _TRACKED_TABLES:
+        for op, ref in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_changes_{op.lower()} AFTER {op} ON {table}
+                BEGIN
+                    INSERT INTO changes (table_name, row_id, op) VALUES ('{table}', {ref}.id, '{op.lower()}');
+                END
+                """
+            )
+
+
+# Bucket start for an event timestamp, per rollup granularity. strftime
+# converts offsets to UTC and yields NULL for unparseable timestamps, which
+# the triggers skip.
+_EVENT_BUCKET_SQL = {
+    "hour": "strftime('%Y-%m-%dT%H:00:00+00:00', {ts})",
+    "day": "strftime('%Y-%m-%dT00:00:00+00:00', {ts})",
+}
+
+
+def _event_counts_bump_sql(ref: str, delta: str) -> str:
+    """Trigger body adding `delta` to the event_counts rows of the NEW/OLD event."""
+    return "\n".join(
+        f"""
+        INSERT INTO event_counts (granularity, bucket, team, type, severity, count)
+        SELECT '{g}', {expr.format(ts=ref + ".timestamp")}, {ref}.team, {ref}.type, {ref}.severity, {delta}
+        WHERE {expr.format(ts=ref + ".timestamp")} IS NOT NULL
+        ON CONFLICT(granularity, bucket, team, type, severity) DO UPDATE SET count = count + ({delta});
+        """
+        for g, expr in _EVENT_BUCKET_SQL.items()
+    )
+
+
+def _m007_event_counts(conn: sqlite3.Connection) -> None:
+    # Event counts per (hour|day, team, type, severity), kept current by
+    # triggers so aggregate queries read a few thousand rollup rows instead
+    # of every event in the window. Weeks are summed from days.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS event_counts (
+            granularity TEXT NOT NULL,
+            bucket TEXT NOT NULL,
             team TEXT NOT NULL,
+            type TEXT NOT NULL,
             severity TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
-            payload_json TEXT NOT NULL
-        )
+            count INTEGER NOT NULL,
+            PRIMARY KEY (granularity, bucket, team, type, severity)
+        ) WITHOUT ROWID
         """
     )
 
-    cur.execute(
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_events_counts_insert AFTER INSERT ON events BEGIN {_event_counts_bump_sql('NEW', '1')} END")
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_events_counts_update
+        AFTER UPDATE OF team, type, severity, timestamp ON events
+        BEGIN {_event_counts_bump_sql('OLD', '-1')} {_event_counts_bump_sql('NEW', '1')} END
         """
-        CREATE TABLE IF NOT EXISTS projects (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            deadline TEXT NOT NULL,
-            status TEXT NOT NULL,
-            created_at TEXT NOT NULL
+    )
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_events_counts_delete AFTER DELETE ON events BEGIN {_event_counts_bump_sql('OLD', '-1')} END")
+    _rebuild_event_counts(conn)
+
+
+def _rebuild_event_counts(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM event_counts")
+    for granularity, expr in _EVENT_BUCKET_SQL.items():
+        bucket = expr.format(ts="timestamp")
+        conn.execute(
+            f"""
+            INSERT INTO event_counts (granularity, bucket, team, type, severity, count)
+            SELECT '{granularity}', {bucket} AS b, team, type, severity, COUNT(*)
+            FROM events WHERE b IS NOT NULL
+            GROUP BY b, team, type, severity
+            """
         )
+
+
+def _m008_event_partitions(conn: sqlite3.Connection) -> None:
+    # Months sealed out of the hot events table into partition files (see
+    # "Event partitions" below). Moving a sealed month's rows out is not a
+    # logical delete: the change log and event_counts must not see it.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS event_partitions (
+            month TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            state TEXT NOT NULL,
+            rows INTEGER NOT NULL
+        ) WITHOUT ROWID
         """
     )
+    unsealed = "NOT EXISTS (SELECT 1 FROM event_partitions WHERE month = substr(OLD.timestamp, 1, 7))"
+    conn.execute("DROP TRIGGER IF EXISTS trg_events_changes_delete")
+    conn.execute(
+        f"""
+        CREATE TRIGGER trg_events_changes_delete AFTER DELETE ON events WHEN {unsealed}
+        BEGIN
+            INSERT INTO changes (table_name, row_id, op) VALUES ('events', OLD.id, 'delete');
+        END
+        """
+    )
+    conn.execute("DROP TRIGGER IF EXISTS trg_events_counts_delete")
+    conn.execute(
+        f"CREATE TRIGGER trg_events_counts_delete AFTER DELETE ON events WHEN {unsealed} "
+        f"BEGIN {_event_counts_bump_sql('OLD', '-1')} END"
+    )
+
 
-    cur.execute(
+# Keyset/range indexes on the integer event time; see _m009_event_epoch.
+_EVENT_TIME_INDEXES = (
+    ("idx_events_timestamp", "ts_us, id"),
+    ("idx_events_team_ts", "team, ts_us, id"),
+    ("idx_events_type_ts", "type, ts_us, id"),
+    ("idx_events_severity_ts", "severity, ts_us, id"),
+)
+
+# Month of an event row, from its integer time (matches seal_event_month).
+_EVENT_MONTH_SQL = "strftime('%Y-%m', {ref}.ts_us / 1000000, 'unixepoch')"
+
+
+def _m009_event_epoch(conn: sqlite3.Connection) -> None:
+    # Events get ts_us (microseconds since the epoch) for range filters and
+    # ordering, and existing timestamps are rewritten to the canonical form
+    # (see utils.normalize_timestamp). Rewritten rows go through the change
+    # log like any other update.
+    _event_epoch_schema(conn)
+    unsealed = f"NOT EXISTS (SELECT 1 FROM event_partitions WHERE month = {_EVENT_MONTH_SQL.format(ref='OLD')})"
+    conn.execute("DROP TRIGGER IF EXISTS trg_events_changes_delete")
+    conn.execute(
+        f"""
+        CREATE TRIGGER trg_events_changes_delete AFTER DELETE ON events WHEN {unsealed}
+        BEGIN
+            INSERT INTO changes (table_name, row_id, op) VALUES ('events', OLD.id, 'delete');
+        END
         """
-        CREATE TABLE IF NOT EXISTS users (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            role TEXT NOT NULL,
-            skills_json TEXT NOT NULL
+    )
+    conn.execute("DROP TRIGGER IF EXISTS trg_events_counts_delete")
+    conn.execute(
+        f"CREATE TRIGGER trg_events_counts_delete AFTER DELETE ON events WHEN {unsealed} "
+        f"BEGIN {_event_counts_bump_sql('OLD', '-1')} END"
+    )
+
+    # Sealed partition files carry their own copy of the events table.
+    from .db import open_connection
+
+    main_file = next(r["file"] for r in conn.execute("PRAGMA database_list") if r["name"] == "main")
+    for r in conn.execute("SELECT path FROM event_partitions WHERE state = 'sealed'").fetchall():
+        pconn = open_connection(os.path.join(_partition_dir(main_file), r["path"]))
+        try:
+            _event_epoch_schema(pconn)
+            pconn.commit()
+        finally:
+            pconn.close()
+
+
+def _event_epoch_schema(conn: sqlite3.Connection) -> None:
+    """Add and backfill events.ts_us and index on it instead of timestamp."""
+    columns = {r["name"] for r in conn.execute("PRAGMA table_xinfo(events)")}
+    if "ts_us" not in columns:
+        conn.execute("ALTER TABLE events ADD COLUMN ts_us INTEGER NOT NULL DEFAULT 0")
+        last = 0
+        while True:
+            batch = conn.execute(
+                "SELECT rowid, timestamp FROM events WHERE rowid > ? ORDER BY rowid LIMIT 10000", (last,)
+            ).fetchall()
+            if not batch:
+                break
+            last = batch[-1]["rowid"]
+            retimed, epochs = [], []
+            for r in batch:
+                try:
+                    canonical = normalize_timestamp(r["timestamp"])
+                except ValueError:
+                    continue  # unparseable legacy value: left as is, ts_us 0
+                if canonical != r["timestamp"]:
+                    retimed.append((canonical, r["rowid"]))
+                epochs.append((timestamp_to_epoch_us(canonical), r["rowid"]))
+            conn.executemany("UPDATE events SET timestamp = ? WHERE rowid = ?", retimed)
+            conn.executemany("UPDATE events SET ts_us = ? WHERE rowid = ?", epochs)
+    for name, columns in _EVENT_TIME_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.execute(f"CREATE INDEX {name} ON events({columns})")
+    # Payload key indexes are recreated on ts_us by _sync_payload_columns.
+    for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_events_payload%'").fetchall():
+        conn.execute(f"DROP INDEX {r['name']}")
+
+
+# Rollup intervals kept for resource metrics, in seconds.
+_RESOURCE_INTERVALS = {"hour": 3600, "day": 86400}
+
+
+def _m010_resource_metrics(conn: sqlite3.Connection) -> None:
+    # ResourceUpdate history. Each (resource, team, metric) is a series with
+    # a small integer id, so a sample is (series, epoch second, value) in a
+    # WITHOUT ROWID table clustered by series and time: roughly 25 bytes a
+    # row, about 13 MB per series-year at one sample a minute. Notes are
+    # rare and kept aside. resource_rollups holds count/sum/min/max per hour
+    # and day, maintained by trigger, so long ranges read a few hundred rows.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS resource_series (
+            id INTEGER PRIMARY KEY,
+            resource TEXT NOT NULL,
+            team TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            unit TEXT NOT NULL,
+            UNIQUE (resource, metric, team)
         )
         """
     )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS resource_samples (
+            series_id INTEGER NOT NULL,
+            ts INTEGER NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (series_id, ts)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS resource_sample_notes (
+            series_id INTEGER NOT NULL,
+            ts INTEGER NOT NULL,
+            notes TEXT NOT NULL,
+            PRIMARY KEY (series_id, ts)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS resource_rollups (
+            series_id INTEGER NOT NULL,
+            interval INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            sum REAL NOT NULL,
+            min REAL NOT NULL,
+            max REAL NOT NULL,
+            PRIMARY KEY (series_id, interval, bucket)
+        ) WITHOUT ROWID
+        """
+    )
+    upserts = "".join(
+        f"""
+        INSERT INTO resource_rollups (series_id, interval, bucket, count, sum, min, max)
+        VALUES (NEW.series_id, {seconds}, NEW.ts - NEW.ts % {seconds}, 1, NEW.value, NEW.value, NEW.value)
+        ON CONFLICT(series_id, interval, bucket) DO UPDATE SET
+            count = count + 1,
+            sum = sum + excluded.sum,
+            min = MIN(min, excluded.min),
+            max = MAX(max, excluded.max);
+        """
+        for seconds in _RESOURCE_INTERVALS.values()
+    )
+    # Samples are append-only (duplicates are ignored), so insert is the
+    # only event the rollup has to follow.
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_resource_samples_rollup AFTER INSERT ON resource_samples BEGIN {upserts} END")
 
-    cur.execute(
+
+def _m011_decisions(conn: sqlite3.Connection) -> None:
+    # Decision log. List and dict fields are JSON text. decision_owners is
+    # an (owner, decision) index of owners_json for owner filters, and
+    # decisions_fts a contentless FTS5 index of title, rationale and tags
+    # keyed by decisions.seq (declared, because VACUUM may renumber an
+    # implicit rowid). Triggers keep both in step with every write, so
+    # nothing else has to remember to.
+    conn.execute(
         """
-        CREATE TABLE IF NOT EXISTS milestones (
-            id TEXT PRIMARY KEY,
-            project_id TEXT NOT NULL,
+        CREATE TABLE IF NOT EXISTS decisions (
+            seq INTEGER PRIMARY KEY,
+            id TEXT NOT NULL UNIQUE,
             title TEXT NOT NULL,
-            status TEXT NOT NULL,
-            assigned_to TEXT,
-            due_date TEXT,
-            completed_at TEXT,
-            FOREIGN KEY(project_id) REFERENCES projects(id)
+            made_by_json TEXT NOT NULL,
+            owners_json TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            rationale TEXT NOT NULL,
+            expected_outcomes_json TEXT NOT NULL,
+            actual_outcomes_json TEXT NOT NULL,
+            tags_json TEXT NOT NULL
         )
         """
     )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_decisions_timestamp ON decisions(timestamp, id)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS decision_owners (
+            owner TEXT NOT NULL,
+            decision_id TEXT NOT NULL,
+            PRIMARY KEY (owner, decision_id)
+        ) WITHOUT ROWID
+        """
+    )
+    # Porter stemming so "migrate" finds "migration"; contentless because
+    # the text is already in decisions and results are read from there.
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS decisions_fts
+        USING fts5(title, rationale, tags, content='', tokenize='porter unicode61')
+        """
+    )
+    index = _decision_index_sql("NEW")
+    unindex = _decision_unindex_sql("OLD")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_decisions_index_insert AFTER INSERT ON decisions BEGIN {index} END")
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_decisions_index_update
+        AFTER UPDATE OF id, title, rationale, tags_json, owners_json ON decisions
+        BEGIN {unindex} {index} END
+        """
+    )
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_decisions_index_delete AFTER DELETE ON decisions BEGIN {unindex} END")
+
+
+def _decision_tags_sql(ref: str) -> str:
+    return f"(SELECT COALESCE(group_concat(value, ' '), '') FROM json_each({ref}.tags_json))"
+
+
+def _decision_index_sql(ref: str) -> str:
+    return f"""
+        INSERT INTO decisions_fts (rowid, title, rationale, tags)
+        VALUES ({ref}.seq, {ref}.title, {ref}.rationale, {_decision_tags_sql(ref)});
+        INSERT OR IGNORE INTO decision_owners (owner, decision_id)
+        SELECT value, {ref}.id FROM json_each({ref}.owners_json);
+    """
+
 
-    cur.execute(
+def _decision_unindex_sql(ref: str) -> str:
+    # A contentless FTS5 table removes a row given the exact values it indexed.
+    return f"""
+        INSERT INTO decisions_fts (decisions_fts, rowid, title, rationale, tags)
+        VALUES ('delete', {ref}.seq, {ref}.title, {ref}.rationale, {_decision_tags_sql(ref)});
+        -- By primary key: (owner, decision_id) has no decision_id-first index.
+        DELETE FROM decision_owners WHERE decision_id = {ref}.id
+            AND owner IN (SELECT value FROM json_each({ref}.owners_json));
+    """
+
+
+# Timestamp columns outside events, rewritten by _m012_normalize_timestamps.
+_NORMALIZED_TIMESTAMP_COLUMNS = (
+    ("projects", "created_at"),
+    ("task_history", "timestamp"),
+    ("milestones", "completed_at"),
+)
+
+
+def _normalize_column(conn: sqlite3.Connection, table: str, column: str) -> int:
+    """Rewrite `column` to the canonical timestamp form; returns rows changed.
+    NULLs and unparseable legacy values are left as they are."""
+    changed, last = 0, 0
+    while True:
+        batch = conn.execute(
+            f"SELECT rowid, {column} AS ts FROM {table} WHERE rowid > ? AND {column} IS NOT NULL ORDER BY rowid LIMIT 10000",
+            (last,),
+        ).fetchall()
+        if not batch:
+            return changed
+        last = batch[-1]["rowid"]
+        retimed = []
+        for r in batch:
+            try:
+                canonical = normalize_timestamp(r["ts"])
+            except ValueError:
+                continue
+            if canonical != r["ts"]:
+                retimed.append((canonical, r["rowid"]))
+        conn.executemany(f"UPDATE {table} SET {column} = ? WHERE rowid = ?", retimed)
+        changed += len(retimed)
+
+
+def _m012_normalize_timestamps(conn: sqlite3.Connection) -> None:
+    # _m009 only rewrote events; rows written before the schema validators
+    # still mix offsets, "Z" and naive values, which sort wrong as text.
+    # Rewritten rows go through the change log like any other update.
+    changed = {table: _normalize_column(conn, table, column) for table, column in _NORMALIZED_TIMESTAMP_COLUMNS}
+    if changed["task_history"]:
+        # last_timestamp is a copy of the newest history timestamp.
+        _rebuild_user_task_stats(conn)
+
+
+def _m013_resource_state(conn: sqlite3.Connection) -> None:
+    # Current state per resource (tools/resources.py). Used to be created
+    # lazily by its first read or write; IF NOT EXISTS keeps those tables.
+    conn.execute(
         """
-        CREATE TABLE IF NOT EXISTS task_history (
+        CREATE TABLE IF NOT EXISTS resource_state (
             id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            task_type TEXT NOT NULL,
-            duration_minutes INTEGER NOT NULL,
-            success_rating INTEGER NOT NULL,
-            timestamp TEXT NOT NULL,
-            FOREIGN KEY(user_id) REFERENCES users(id)
+            updated_at TEXT NOT NULL,
+            status TEXT NOT NULL,
+            capacity REAL,
+            owner TEXT,
+            team TEXT,
+            notes TEXT,
+            metadata TEXT
         )
         """
     )
 
-    conn.commit()
-    conn.close()
+
+_MIGRATIONS = [
+    _m001_access_path_indexes,
+    _m002_keyset_indexes,
+    _m003_task_type_stats_index,
+    _m004_user_task_stats,
+    _m005_project_milestone_counts,
+    _m006_change_log,
+    _m007_event_counts,
+    _m008_event_partitions,
+    _m009_event_epoch,
+    _m010_resource_metrics,
+    _m011_decisions,
+    _m012_normalize_timestamps,
+    _m013_resource_state,
+]
+
+
+def schema_version(db_path: str) -> int:
+    with connection(db_path) as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, migration in enumerate(_MIGRATIONS[version:], start=version + 1):
+        migration(conn)
+        conn.execute(f"PRAGMA user_version = {target}")
+
+
+# -----------------------
+# Payload key columns
+# -----------------------
+# Keys listed in EVENT_INDEXED_PAYLOAD_KEYS become VIRTUAL generated columns
+# (computed on read, nothing stored in the row) with a (column, ts_us, id)
+# index, so payload filters on them seek like the fixed columns do. They are
+# config-driven rather than migrations; init_db adds whatever is missing.
+# The columns use only SQLite's built-in json_extract, so any connection (the
+# sqlite3 shell, backup tools, VACUUM) can read and write the table; that
+# needs every payload stored as JSON text, never a zlib blob.
+
+_PAYLOAD_KEY_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*")
+
+# Compressed payloads are blobs; only those pay for the Python decompress.
+_PAYLOAD_TEXT_SQL = "CASE WHEN typeof(payload_json) = 'blob' THEN payload_text(payload_json) ELSE payload_json END"
+
+
+def _payload_path(key: str) -> str:
+    if not _PAYLOAD_KEY_RE.fullmatch(key):
+        raise ValueError(f"invalid payload key {key!r}; use dotted identifiers like 'details.region'")
+    return "$." + key
+
+
+def _payload_column(key: str) -> str:
+    return "payload__" + key.replace(".", "__")
+
+
+def _sync_payload_columns(conn: sqlite3.Connection) -> None:
+    if EVENT_INDEXED_PAYLOAD_KEYS and EVENT_PAYLOAD_ENCODING == "zlib":
+        raise ValueError("EVENT_INDEXED_PAYLOAD_KEYS needs EVENT_PAYLOAD_ENCODING=json: indexed keys are read from plain JSON text")
+    # table_xinfo, unlike table_info, lists generated columns.
+    existing = {r["name"] for r in conn.execute("PRAGMA table_xinfo(events)")}
+    table_sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'events'").fetchone()[0]
+    if "payload_text(" in table_sql:
+        # Columns added before they used json_extract alone called the
+        # app-only payload_text() function; drop them all, listed or not,
+        # and add the listed ones back below.
+        for column in sorted(c for c in existing if c.startswith("payload__")):
+            conn.execute(f"DROP INDEX IF EXISTS idx_events_{column}_ts")
+            conn.execute(f"ALTER TABLE events DROP COLUMN {column}")
+            existing.discard(column)
+    missing = [key for key in EVENT_INDEXED_PAYLOAD_KEYS if _payload_column(key) not in existing]
+    if missing:
+        # Payloads written while EVENT_PAYLOAD_ENCODING was zlib.
+        conn.execute("UPDATE events SET payload_json = payload_text(payload_json) WHERE typeof(payload_json) = 'blob'")
+    for key in missing:
+        conn.execute(
+            f"ALTER TABLE events ADD COLUMN {_payload_column(key)} "
+            f"GENERATED ALWAYS AS (json_extract(payload_json, '{_payload_path(key)}')) VIRTUAL"
+        )
+    for key in EVENT_INDEXED_PAYLOAD_KEYS:
+        column = _payload_column(key)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_events_{column}_ts ON events({column}, ts_us, id)")
+
+
+def explain_query_plan(db_path: str, sql: str, params: Sequence[Any] = ()) -> List[str]:
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement."""
+    with connection(db_path) as conn:
+        rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return [r["detail"] for r in rows]
 
 
 # -----------------------
 # Events
 # -----------------------
 
-def insert_event(db_path: str, event: Event) -> None:
+_INSERT_EVENT_SQL = """
+    INSERT INTO events (id, type, team, severity, timestamp, ts_us, payload_json)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def encode_payload(payload: Dict[str, Any]) -> Any:
+    """Stored form of an event payload: compact JSON text, or a zlib blob
+    when EVENT_PAYLOAD_ENCODING=zlib and the JSON is large enough to gain."""
     import json
+    import zlib
 
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO events (id, type, team, severity, timestamp, payload_json)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            event.id,
-            event.type,
-            event.team,
-            event.severity,
-            event.timestamp,
-            json.dumps(event.payload, ensure_ascii=False),
-        ),
+    text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    if EVENT_PAYLOAD_ENCODING == "zlib" and len(text) >= EVENT_PAYLOAD_COMPRESS_MIN_BYTES:
+        return zlib.compress(text.encode("utf-8"), 6)
+    return text
+
+
+def decode_payload(stored: Any) -> Dict[str, Any]:
+    import json
+
+    return json.loads(payload_text(stored))
+
+
+def _event_row(event: Event) -> tuple:
+    return (
+        event.id,
+        event.type,
+        event.team,
+        event.severity,
+        event.timestamp,
+        timestamp_to_epoch_us(event.timestamp),
+        encode_payload(event.payload),
     )
-    conn.commit()
-    conn.close()
 
 
-def query_events(
+def insert_event(db_path: str, event: Event) -> None:
+    with transaction(db_path) as conn:
+        conn.execute(_INSERT_EVENT_SQL, _event_row(event))
+
+
+def insert_events(db_path: str, events: List[Event]) -> None:
+    """Insert many events in a single transaction (all or nothing)."""
+    with transaction(db_path) as conn:
+        conn.executemany(_INSERT_EVENT_SQL, [_event_row(e) for e in events])
+
+
+def insert_events_bulk(db_path: str, events: List[Event], chunk_size: int) -> Dict[int, str]:
+    """Insert events in chunked transactions; returns {position: error} for rejected rows."""
+    return _executemany_chunked(db_path, _INSERT_EVENT_SQL, [_event_row(e) for e in events], chunk_size)
+
+
+def _executemany_chunked(
     db_path: str,
+    sql: str,
+    rows: Sequence[tuple],
+    chunk_size: int,
+    on_inserted: Optional[Callable[[sqlite3.Connection, Sequence[tuple]], None]] = None,
+) -> Dict[int, str]:
+    """on_inserted(conn, rows) runs in the same transaction as each chunk with
+    the rows that made it in, for keeping derived tables in step."""
+    errors: Dict[int, str] = {}
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        try:
+            with transaction(db_path) as conn:
+                conn.executemany(sql, chunk)
+                if on_inserted:
+                    on_inserted(conn, chunk)
+            continue
+        except sqlite3.IntegrityError:
+            pass
+        # Some row in the chunk was rejected. A failed statement only aborts
+        # itself, so replay the chunk row by row in one transaction and keep
+        # the good rows.
+        with transaction(db_path) as conn:
+            inserted = []
+            for offset, row in enumerate(chunk):
+                try:
+                    conn.execute(sql, row)
+                    inserted.append(row)
+                except sqlite3.IntegrityError as e:
+                    errors[start + offset] = str(e)
+            if on_inserted and inserted:
+                on_inserted(conn, inserted)
+    return errors
+
+
+def encode_event_cursor(ts_us: int, event_id: str) -> str:
+    import base64
+    import json
+
+    raw = json.dumps([ts_us, event_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_event_cursor(cursor: str) -> Tuple[int, str]:
+    import base64
+    import binascii
+    import json
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts_us, event_id = json.loads(raw)
+        # Cursors issued before ts_us carry the ISO timestamp instead.
+        if isinstance(ts_us, str):
+            ts_us = timestamp_to_epoch_us(ts_us)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("invalid cursor") from None
+    if not isinstance(ts_us, int) or isinstance(ts_us, bool) or not isinstance(event_id, str):
+        raise ValueError("invalid cursor")
+    return ts_us, event_id
+
+
+EVENT_FIELDS = ("id", "type", "team", "severity", "timestamp", "payload")
+
+
+def _event_columns(fields: Optional[Sequence[str]]) -> List[str]:
+    if not fields:
+        return list(EVENT_FIELDS)
+    unknown = [f for f in fields if f not in EVENT_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown event fields {unknown}; allowed: {list(EVENT_FIELDS)}")
+    # id and timestamp are always returned.
+    return ["id", "timestamp"] + [f for f in fields if f not in ("id", "timestamp")]
+
+
+_PAYLOAD_COMPARISONS = {"eq": "=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+def _payload_conditions(payload_filter: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    """WHERE terms for {key: spec}. spec is a scalar (equality), a list (IN),
+    or a dict of operators: eq, in, gt, gte, lt, lte."""
+    where: List[str] = []
+    params: List[Any] = []
+    for key, spec in payload_filter.items():
+        if key in EVENT_INDEXED_PAYLOAD_KEYS:
+            expr, expr_params = _payload_column(key), []
+        else:
+            expr, expr_params = f"json_extract({_PAYLOAD_TEXT_SQL}, ?)", [_payload_path(key)]
+
+        if isinstance(spec, dict):
+            ops = spec
+        elif isinstance(spec, list):
+            ops = {"in": spec}
+        else:
+            ops = {"eq": spec}
+        for op, value in ops.items():
+            if op == "in":
+                if not isinstance(value, list) or not value or not all(_is_scalar(v) for v in value):
+                    raise ValueError(f"payload filter {key!r}: 'in' needs a non-empty list of scalars")
+                where.append(f"{expr} IN ({', '.join('?' * len(value))})")
+                params.extend(expr_params + value)
+            elif op in _PAYLOAD_COMPARISONS:
+                if not _is_scalar(value):
+                    raise ValueError(f"payload filter {key!r}: {op!r} needs a scalar value")
+                if value is None and op == "eq":
+                    where.append(f"{expr} IS NULL")
+                    params.extend(expr_params)
+                else:
+                    where.append(f"{expr} {_PAYLOAD_COMPARISONS[op]} ?")
+                    params.extend(expr_params + [value])
+            else:
+                raise ValueError(f"payload filter {key!r}: unknown operator {op!r}")
+    return where, params
+
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _events_query(
     team: Optional[str] = None,
     event_type: Optional[str] = None,
     severity: Optional[str] = None,
     start_ts: Optional[str] = None,
     end_ts: Optional[str] = None,
     limit: int = 200,
-) -> List[Dict[str, Any]]:
-    import json
-
-    conn = _connect(db_path)
-    cur = conn.cursor()
-
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    payload_filter: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, List[Any]]:
     where = []
     params: List[Any] = []
 
@@ -140,118 +927,1503 @@ def query_events(
         where.append("severity = ?")
         params.append(severity)
     if start_ts:
-        where.append("timestamp >= ?")
-        params.append(start_ts)
+        where.append("ts_us >= ?")
+        params.append(timestamp_to_epoch_us(start_ts))
     if end_ts:
-        where.append("timestamp <= ?")
-        params.append(end_ts)
+        where.append("ts_us <= ?")
+        params.append(timestamp_to_epoch_us(end_ts))
+    if cursor:
+        # Keyset pagination: resume strictly after the last row of the
+        # previous page, so every page is an index seek regardless of depth.
+        where.append("(ts_us, id) < (?, ?)")
+        params.extend(decode_event_cursor(cursor))
+    if payload_filter:
+        payload_where, payload_params = _payload_conditions(payload_filter)
+        where.extend(payload_where)
+        params.extend(payload_params)
 
     where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+    # ts_us is read for the cursor and dropped from the output.
+    columns = ", ".join(["ts_us"] + ["payload_json" if f == "payload" else f for f in _event_columns(fields)])
     sql = f"""
-        SELECT id, type, team, severity, timestamp, payload_json
+        SELECT {columns}
         FROM events
         {where_sql}
-        ORDER BY timestamp DESC
+        ORDER BY ts_us DESC, id DESC
         LIMIT ?
     """
     params.append(limit)
+    return sql, params
 
-    rows = cur.execute(sql, params).fetchall()
-    conn.close()
+
+def query_events_page(
+    db_path: str,
+    team: Optional[str] = None,
+    event_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    start_ts: Optional[str] = None,
+    end_ts: Optional[str] = None,
+    limit: int = 200,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    decode: bool = True,
+    payload_filter: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """One page of events, newest first.
+
+    `next_cursor` is an opaque token for the page after this one, or None
+    when there are no more rows. `fields` limits the columns read (id and
+    timestamp are always included); leaving out "payload" skips reading and
+    decoding it entirely. With decode=False the payload is returned as its
+    JSON text, for callers that pass it through or parse it lazily.
+    `payload_filter` matches payload keys by dotted path, e.g.
+    {"service": "ledger", "details.attempts": {"gte": 3}} (see
+    _payload_conditions); keys in EVENT_INDEXED_PAYLOAD_KEYS use their index.
+    With EVENT_PARTITIONING=month, sealed months overlapping the window are
+    read too. Raises ValueError for a limit below 1, a malformed cursor, an
+    unknown field or a bad filter.
+    """
+    if limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+    # Ask for one extra row to learn whether another page exists.
+    sql, params = _events_query(
+        team, event_type, severity, start_ts, end_ts, limit + 1, cursor, fields, payload_filter
+    )
+
+    with connection(db_path) as conn:
+        rows = conn.execute(sql, params).fetchall()
+        partitions = _queried_partitions(conn, db_path, start_ts, end_ts, cursor) if EVENT_PARTITIONING == "month" else []
+
+    # Same statement against each sealed month in the window, newest first,
+    # merged into the top limit + 1 by (ts_us, id).
+    for month_start, path in partitions:
+        if len(rows) > limit and rows[limit]["ts_us"] < month_start:
+            break  # this month and older ones all sort after the page
+        with connection(path) as conn:
+            rows.extend(conn.execute(sql, params).fetchall())
+        rows.sort(key=lambda r: (r["ts_us"], r["id"]), reverse=True)
+        del rows[limit + 1:]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_event_cursor(rows[-1]["ts_us"], rows[-1]["id"])
 
     out: List[Dict[str, Any]] = []
     for r in rows:
-        out.append(
-            {
-                "id": r["id"],
-                "type": r["type"],
-                "team": r["team"],
-                "severity": r["severity"],
-                "timestamp": r["timestamp"],
-                "payload": json.loads(r["payload_json"]),
-            }
+        event = dict(r)
+        del event["ts_us"]
+        if "payload_json" in event:
+            stored = event.pop("payload_json")
+            event["payload"] = decode_payload(stored) if decode else payload_text(stored)
+        out.append(event)
+    return {"events": out, "next_cursor": next_cursor}
+
+
+def query_events(
+    db_path: str,
+    team: Optional[str] = None,
+    event_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    start_ts: Optional[str] = None,
+    end_ts: Optional[str] = None,
+    limit: int = 200,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    decode: bool = True,
+    payload_filter: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    return query_events_page(
+        db_path, team, event_type, severity, start_ts, end_ts, limit, cursor, fields, decode, payload_filter
+    )["events"]
+
+
+EVENT_BUCKETS = ("hour", "day", "week")
+EVENT_GROUP_BY = ("team", "type", "severity")
+
+
+def aggregate_event_counts(
+    db_path: str,
+    bucket: str = "day",
+    group_by: Optional[Sequence[str]] = None,
+    team: Optional[str] = None,
+    event_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    start_ts: Optional[str] = None,
+    end_ts: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Event counts per time bucket, oldest first, from the event_counts rollup.
+
+    Buckets are whole: start_ts/end_ts select the buckets containing them and
+    everything in between. Each row has "bucket" (its UTC start), the
+    group_by columns and "count"; empty buckets are omitted. Raises
+    ValueError for an unknown bucket or group_by column.
+    """
+    if bucket not in EVENT_BUCKETS:
+        raise ValueError(f"unknown bucket {bucket!r}; allowed: {list(EVENT_BUCKETS)}")
+    group_by = list(group_by or [])
+    unknown = [g for g in group_by if g not in EVENT_GROUP_BY]
+    if unknown:
+        raise ValueError(f"unknown group_by {unknown}; allowed: {list(EVENT_GROUP_BY)}")
+
+    for value in (start_ts, end_ts):
+        if value and iso_to_epoch_seconds(value) is None:
+            raise ValueError(f"invalid timestamp {value!r}")
+
+    # Weeks (starting Monday) are summed from day rows.
+    granularity = "hour" if bucket == "hour" else "day"
+    bucket_expr = _EVENT_BUCKET_SQL[granularity]
+    end_expr = bucket_expr
+    if bucket == "week":
+        bucket_expr = "strftime('%Y-%m-%dT00:00:00+00:00', {ts}, 'weekday 0', '-6 days')"
+        # Sunday of end_ts's week, as a day bucket.
+        end_expr = "strftime('%Y-%m-%dT00:00:00+00:00', {ts}, 'weekday 0')"
+
+    where = ["granularity = ?", "count > 0"]
+    params: List[Any] = [granularity]
+    if start_ts:
+        where.append(f"bucket >= {bucket_expr.format(ts='?')}")
+        params.append(start_ts)
+    if end_ts:
+        where.append(f"bucket <= {end_expr.format(ts='?')}")
+        params.append(end_ts)
+    for column, value in (("team", team), ("type", event_type), ("severity", severity)):
+        if value:
+            where.append(f"{column} = ?")
+            params.append(value)
+
+    b = bucket_expr.format(ts="bucket")
+    columns = "".join(f", {g}" for g in group_by)
+    sql = f"""
+        SELECT {b} AS b{columns}, SUM(count) AS count
+        FROM event_counts
+        WHERE {" AND ".join(where)}
+        GROUP BY b{columns}
+        ORDER BY b{columns}
+    """
+    with connection(db_path) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [{"bucket": r["b"], **{g: r[g] for g in group_by}, "count": r["count"]} for r in rows]
+
+
+def explain_query_events(db_path: str, **filters: Any) -> List[str]:
+    """EXPLAIN QUERY PLAN for the statement query_events would run with these filters."""
+    sql, params = _events_query(**filters)
+    return explain_query_plan(db_path, sql, params)
+
+
+
+# -----------------------
+# Event partitions
+# -----------------------
+# With EVENT_PARTITIONING=month the events table only holds recent ("hot")
+# months. apply_event_retention seals each older month into its own SQLite
+# file, listed in event_partitions, and query_events_page reads the sealed
+# months a window overlaps. Partitions past EVENT_RETENTION_MONTHS are
+# gzipped whole and leave the query path. Inserts always go to the hot
+# table, so a late event for a sealed month is folded into its partition by
+# the next sealing pass, and one for an archived month into its archive. Months are UTC calendar months of ts_us, so each
+# month is one range on idx_events_timestamp. event_counts keeps counting
+# sealed and archived months.
+
+def _partition_dir(db_path: str) -> str:
+    return EVENT_PARTITION_DIR or db_path + ".partitions"
+
+
+def _month_add(month: str, months: int) -> str:
+    year, mon = divmod(int(month[:4]) * 12 + int(month[5:7]) - 1 + months, 12)
+    return f"{year:04d}-{mon + 1:02d}"
+
+
+def _month_start_us(month: str) -> int:
+    return timestamp_to_epoch_us(month + "-01")
+
+
+def _month_of_us(ts_us: int) -> str:
+    return epoch_us_to_timestamp(ts_us)[:7]
+
+
+def _queried_partitions(
+    conn: sqlite3.Connection,
+    db_path: str,
+    start_ts: Optional[str],
+    end_ts: Optional[str],
+    cursor: Optional[str],
+) -> List[Tuple[str, str]]:
+    """(month start in ts_us, path) of sealed partitions that can hold rows
+    for this window, newest first."""
+    where = ["state = 'sealed'"]
+    params: List[Any] = []
+    if start_ts:
+        where.append("month >= ?")
+        params.append(_month_of_us(timestamp_to_epoch_us(start_ts)))
+    if end_ts:
+        where.append("month <= ?")
+        params.append(_month_of_us(timestamp_to_epoch_us(end_ts)))
+    if cursor:
+        where.append("month <= ?")
+        params.append(_month_of_us(decode_event_cursor(cursor)[0]))
+    rows = conn.execute(
+        f"SELECT month, path FROM event_partitions WHERE {' AND '.join(where)} ORDER BY month DESC", params
+    ).fetchall()
+    return [(_month_start_us(r["month"]), os.path.join(_partition_dir(db_path), r["path"])) for r in rows]
+
+
+def list_event_partitions(db_path: str) -> List[Dict[str, Any]]:
+    with connection(db_path) as conn:
+        rows = conn.execute("SELECT month, path, state, rows FROM event_partitions ORDER BY month").fetchall()
+    return [dict(r) for r in rows]
+
+
+def _remove_db_files(path: str) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _partition_month_state(conn: sqlite3.Connection, month: str) -> Optional[str]:
+    row = conn.execute("SELECT state FROM event_partitions WHERE month = ?", (month,)).fetchone()
+    return row["state"] if row else None
+
+
+def _create_partition_file(path: str) -> None:
+    # A private connection: a pooled one would keep the file's -wal and
+    # -shm around for as long as the process runs.
+    from .db import open_connection
+
+    pconn = open_connection(path)
+    try:
+        pconn.execute(_EVENTS_DDL)
+        _event_epoch_schema(pconn)
+        _sync_payload_columns(pconn)
+        pconn.commit()
+    finally:
+        pconn.close()
+
+
+def seal_event_month(db_path: str, month: str) -> int:
+    """Move the hot rows of `month` ("YYYY-MM") into its partition file.
+
+    Returns the number of rows moved. Safe to re-run: rows already in the
+    partition are kept and only the hot copies are removed. Raises
+    ValueError for an archived month (see fold_into_archived_partition).
+    """
+    from .db import open_connection
+
+    name = f"events_{month.replace('-', '_')}.db"
+    path = os.path.join(_partition_dir(db_path), name)
+    os.makedirs(_partition_dir(db_path), exist_ok=True)
+    with connection(db_path) as conn:
+        state = _partition_month_state(conn, month)
+    if state == "archived":
+        raise ValueError(f"event partition {month} is archived")
+    if state is None:
+        _remove_db_files(path)  # left over from a reset database
+    _create_partition_file(path)
+
+    # A private connection: ATTACH must happen outside a transaction and
+    # should not leak into the pool. In WAL mode the commit is atomic per
+    # file only; a crash in between leaves rows in both places, which the
+    # next run resolves (INSERT OR IGNORE, then the delete).
+    conn = open_connection(db_path)
+    try:
+        conn.execute("ATTACH DATABASE ? AS part", (path,))
+        conn.execute("BEGIN IMMEDIATE")
+        # Checked again under the write lock: archiving may have won the race.
+        if _partition_month_state(conn, month) == "archived":
+            conn.rollback()
+            raise ValueError(f"event partition {month} is archived")
+        bounds = (_month_start_us(month), _month_start_us(_month_add(month, 1)))
+        moved = conn.execute(
+            """
+            INSERT OR IGNORE INTO part.events (id, type, team, severity, timestamp, ts_us, payload_json)
+            SELECT id, type, team, severity, timestamp, ts_us, payload_json FROM main.events
+            WHERE ts_us >= ? AND ts_us < ?
+            """,
+            bounds,
+        ).rowcount
+        total = conn.execute("SELECT COUNT(*) FROM part.events").fetchone()[0]
+        # Registered before the delete: the delete triggers skip sealed months.
+        conn.execute(
+            """
+            INSERT INTO event_partitions (month, path, state, rows) VALUES (?, ?, 'sealed', ?)
+            ON CONFLICT(month) DO UPDATE SET rows = excluded.rows WHERE state = 'sealed'
+            """,
+            (month, name, total),
         )
-    return out
+        conn.execute("DELETE FROM main.events WHERE ts_us >= ? AND ts_us < ?", bounds)
+        conn.commit()
+    finally:
+        conn.close()
+    return moved
 
 
+def _gzip_partition(path: str) -> None:
+    """Write path + ".gz" (atomically replacing any older one) from a partition
+    file with no pooled connections left."""
+    import gzip
+    import shutil
+
+    from .db import open_connection
+
+    # Fold the WAL into the file so the archive is self-contained. Readers
+    # still inside a query hold the checkpoint back until the busy timeout.
+    pconn = open_connection(path)
+    try:
+        busy = pconn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+    finally:
+        pconn.close()
+    if busy:
+        raise ValueError(f"{path} is still being read; try again")
+    with open(path, "rb") as src, gzip.open(path + ".gz.tmp", "wb") as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    os.replace(path + ".gz.tmp", path + ".gz")
+
+
+def archive_event_partition(db_path: str, month: str) -> str:
+    """Gzip a sealed partition file and take it off the query path; returns the archive path."""
+    from .db import retire
+
+    with connection(db_path) as conn:
+        row = conn.execute("SELECT path, state FROM event_partitions WHERE month = ?", (month,)).fetchone()
+    if row is None or row["state"] != "sealed":
+        raise ValueError(f"no sealed event partition for {month}")
+    path = os.path.join(_partition_dir(db_path), row["path"])
+
+    # Only this file's pooled handles; other databases are in use.
+    retire(path)
+    _gzip_partition(path)
+    with transaction(db_path) as conn:
+        conn.execute(
+            "UPDATE event_partitions SET state = 'archived', path = ? WHERE month = ?",
+            (row["path"] + ".gz", month),
+        )
+    _remove_db_files(path)
+    return path + ".gz"
+
+
+def fold_into_archived_partition(db_path: str, month: str) -> int:
+    """Move late hot rows of an archived `month` into its archive: unpack,
+    append, re-gzip. Returns the number of rows moved.
+
+    The archive is replaced before the hot rows are deleted, and only rows
+    now in it are deleted, so a crash or a concurrent insert loses nothing;
+    the next run picks up whatever is left.
+    """
+    import gzip
+    import shutil
+
+    from .db import open_connection
+
+    with connection(db_path) as conn:
+        row = conn.execute("SELECT path, state FROM event_partitions WHERE month = ?", (month,)).fetchone()
+    if row is None or row["state"] != "archived":
+        raise ValueError(f"no archived event partition for {month}")
+    archive = os.path.join(_partition_dir(db_path), row["path"])
+    path = archive[: -len(".gz")]
+    bounds = (_month_start_us(month), _month_start_us(_month_add(month, 1)))
+
+    _remove_db_files(path)
+    with gzip.open(archive, "rb") as src, open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    try:
+        _create_partition_file(path)  # brings an old archive's schema up to date
+        conn = open_connection(db_path)
+        try:
+            conn.execute("ATTACH DATABASE ? AS part", (path,))
+            conn.execute("BEGIN IMMEDIATE")
+            moved = conn.execute(
+                """
+                INSERT OR IGNORE INTO part.events (id, type, team, severity, timestamp, ts_us, payload_json)
+                SELECT id, type, team, severity, timestamp, ts_us, payload_json FROM main.events
+                WHERE ts_us >= ? AND ts_us < ?
+                """,
+                bounds,
+            ).rowcount
+            total = conn.execute("SELECT COUNT(*) FROM part.events").fetchone()[0]
+            # Commits the partition file only; main is unchanged so far.
+            conn.commit()
+            conn.execute("DETACH DATABASE part")
+            _gzip_partition(path)
+
+            conn.execute("ATTACH DATABASE ? AS part", (path,))
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("UPDATE event_partitions SET rows = ? WHERE month = ?", (total, month))
+            # The month is listed, so the delete triggers leave the change
+            # log and event_counts alone.
+            conn.execute(
+                "DELETE FROM main.events WHERE ts_us >= ? AND ts_us < ? AND id IN (SELECT id FROM part.events)",
+                bounds,
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    finally:
+        _remove_db_files(path)
+    return moved
+
+
+def apply_event_retention(db_path: str, today: Optional[str] = None) -> Dict[str, Any]:
+    """Seal months older than EVENT_HOT_MONTHS and archive partitions older
+    than EVENT_RETENTION_MONTHS (0: never), relative to `today` (ISO date,
+    default now). Late rows of archived months go into their archives
+    ("late_archived"). Raises ValueError unless EVENT_PARTITIONING=month, since
+    sealed rows would otherwise drop out of list_events."""
+    from .utils import utc_now_iso
+
+    if EVENT_PARTITIONING != "month":
+        raise ValueError("event partitioning is off; set EVENT_PARTITIONING=month")
+    current = (today or utc_now_iso())[:7]
+
+    sealed: Dict[str, int] = {}
+    late: Dict[str, int] = {}
+    hot_from = _month_add(current, 1 - max(EVENT_HOT_MONTHS, 1))
+    with connection(db_path) as conn:
+        oldest = conn.execute("SELECT MIN(ts_us) FROM events WHERE ts_us < ?", (_month_start_us(hot_from),)).fetchone()[0]
+    month = _month_of_us(oldest) if oldest is not None else hot_from
+    while month < hot_from:
+        with connection(db_path) as conn:
+            # Skip empty months without creating files for them.
+            has_rows = conn.execute(
+                "SELECT 1 FROM events WHERE ts_us >= ? AND ts_us < ? LIMIT 1",
+                (_month_start_us(month), _month_start_us(_month_add(month, 1))),
+            ).fetchone()
+        if has_rows:
+            with connection(db_path) as conn:
+                state = _partition_month_state(conn, month)
+            if state == "archived":
+                late[month] = fold_into_archived_partition(db_path, month)
+            else:
+                sealed[month] = seal_event_month(db_path, month)
+        month = _month_add(month, 1)
+
+    archived: List[str] = []
+    if EVENT_RETENTION_MONTHS > 0:
+        keep_from = _month_add(current, 1 - EVENT_RETENTION_MONTHS)
+        for p in list_event_partitions(db_path):
+            if p["state"] == "sealed" and p["month"] < keep_from:
+                archive_event_partition(db_path, p["month"])
+                archived.append(p["month"])
+    return {"sealed": sealed, "archived": archived, "late_archived": late}
+
 
 # -----------------------
 # Workflow Hub Functions
 # -----------------------
 
 def create_project(db_path: str, project: Project) -> None:
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO projects (id, name, deadline, status, created_at) VALUES (?, ?, ?, ?, ?)",
-        (project.id, project.name, project.deadline, project.status, project.created_at),
-    )
-    conn.commit()
-    conn.close()
+    with transaction(db_path) as conn:
+        conn.execute(
+            "INSERT INTO projects (id, name, deadline, status, created_at) VALUES (?, ?, ?, ?, ?)",
+            (project.id, project.name, project.deadline, project.status, project.created_at),
+        )
 
 def add_user(db_path: str, user: User) -> None:
     import json
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT OR REPLACE INTO users (id, name, role, skills_json) VALUES (?, ?, ?, ?)",
-        (user.id, user.name, user.role, json.dumps(user.skills)),
-    )
-    conn.commit()
-    conn.close()
+    with transaction(db_path) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO users (id, name, role, skills_json) VALUES (?, ?, ?, ?)",
+            (user.id, user.name, user.role, json.dumps(user.skills)),
+        )
 
 def create_milestone(db_path: str, milestone: Milestone) -> None:
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO milestones (id, project_id, title, status, assigned_to, due_date, completed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
-        (milestone.id, milestone.project_id, milestone.title, milestone.status, milestone.assigned_to, milestone.due_date, milestone.completed_at),
-    )
-    conn.commit()
-    conn.close()
+    with transaction(db_path) as conn:
+        conn.execute(
+            "INSERT INTO milestones (id, project_id, title, status, assigned_to, due_date, completed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (milestone.id, milestone.project_id, milestone.title, milestone.status, milestone.assigned_to, milestone.due_date, milestone.completed_at),
+        )
 
 def update_milestone_status(db_path: str, milestone_id: str, status: str, completed_at: Optional[str] = None) -> None:
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE milestones SET status = ?, completed_at = ? WHERE id = ?",
-        (status, completed_at, milestone_id),
-    )
-    conn.commit()
-    conn.close()
+    """Raises ValueError for an unparseable completed_at."""
+    if completed_at is not None:
+        completed_at = normalize_timestamp(completed_at)
+    with transaction(db_path) as conn:
+        conn.execute(
+            "UPDATE milestones SET status = ?, completed_at = ? WHERE id = ?",
+            (status, completed_at, milestone_id),
+        )
+
+_INSERT_TASK_HISTORY_SQL = "INSERT INTO task_history (id, user_id, task_type, duration_minutes, success_rating, timestamp) VALUES (?, ?, ?, ?, ?, ?)"
+
+def _task_history_row(history: TaskHistory) -> tuple:
+    return (history.id, history.user_id, history.task_type, history.duration_minutes, history.success_rating, history.timestamp)
+
+# Bumped on every task_history write in this process so derived caches
+# (app/scoring.py) know when to recompute.
+# Writers on different threads bump it, so the read-modify-write is locked.
+_task_history_generation: Dict[str, int] = {}
+_generation_lock = threading.Lock()
+
+def task_history_generation(db_path: str) -> int:
+    with _generation_lock:
+        return _task_history_generation.get(db_path, 0)
+
+def _bump_task_history_generation(db_path: str) -> None:
+    with _generation_lock:
+        _task_history_generation[db_path] = _task_history_generation.get(db_path, 0) + 1
 
 def log_task_history(db_path: str, history: TaskHistory) -> None:
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO task_history (id, user_id, task_type, duration_minutes, success_rating, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
-        (history.id, history.user_id, history.task_type, history.duration_minutes, history.success_rating, history.timestamp),
+    row = _task_history_row(history)
+    with transaction(db_path) as conn:
+        conn.execute(_INSERT_TASK_HISTORY_SQL, row)
+        _add_to_user_task_stats(conn, [row])
+    _bump_task_history_generation(db_path)
+
+def log_task_history_bulk(db_path: str, entries: List[TaskHistory], chunk_size: int) -> Dict[int, str]:
+    """Insert history rows in chunked transactions; returns {position: error} for rejected rows."""
+    try:
+        return _executemany_chunked(
+            db_path,
+            _INSERT_TASK_HISTORY_SQL,
+            [_task_history_row(h) for h in entries],
+            chunk_size,
+            on_inserted=_add_to_user_task_stats,
+        )
+    finally:
+        _bump_task_history_generation(db_path)
+
+def get_task_type_stats(db_path: str, task_type: str) -> Dict[str, Dict[str, Any]]:
+    """Per-user aggregates for one task type, read from the user_task_stats rollup."""
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT user_id, tasks, rating_sum, duration_sum, last_timestamp,
+                   decay_weight_sum, decay_rating_sum, decay_duration_sum
+            FROM user_task_stats
+            WHERE task_type = ?
+            """,
+            (task_type,),
+        ).fetchall()
+    return {r["user_id"]: _stats_view(r) for r in rows}
+
+
+# -----------------------
+# user_task_stats rollup
+# -----------------------
+# Per (task_type, user_id) running sums of task_history, updated in the same
+# transaction as every history insert, so recommendations never touch raw
+# history. The decay_* columns weight each task by 2 ** (t / half-life)
+# relative to a fixed epoch; dividing two of them gives a recency-weighted
+# average that never needs rescaling as time passes.
+
+_DECAY_EPOCH = 1577836800.0  # 2020-01-01T00:00:00Z
+
+_UPSERT_USER_TASK_STATS_SQL = """
+    INSERT INTO user_task_stats (
+        task_type, user_id, tasks, rating_sum, duration_sum, last_timestamp,
+        decay_weight_sum, decay_rating_sum, decay_duration_sum
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(task_type, user_id) DO UPDATE SET
+        tasks = tasks + excluded.tasks,
+        rating_sum = rating_sum + excluded.rating_sum,
+        duration_sum = duration_sum + excluded.duration_sum,
+        last_timestamp = MAX(COALESCE(last_timestamp, ''), excluded.last_timestamp),
+        decay_weight_sum = decay_weight_sum + excluded.decay_weight_sum,
+        decay_rating_sum = decay_rating_sum + excluded.decay_rating_sum,
+        decay_duration_sum = decay_duration_sum + excluded.decay_duration_sum
+"""
+
+def _decay_weight(timestamp: str) -> float:
+    epoch = iso_to_epoch_seconds(timestamp)
+    if epoch is None:
+        return 0.0
+    half_lives = (epoch - _DECAY_EPOCH) / (STATS_HALF_LIFE_DAYS * 86400)
+    return 2.0 ** max(-1000.0, min(1000.0, half_lives))
+
+def _stats_delta(row: Sequence[Any]) -> tuple:
+    # row is a task_history row: (id, user_id, task_type, duration, rating, timestamp)
+    _, user_id, task_type, duration, rating, timestamp = row
+    w = _decay_weight(timestamp)
+    return (task_type, user_id, rating, duration, timestamp, w, w * rating, w * duration)
+
+def _sum_stats(
+    rows: Iterable[Sequence[Any]], totals: Optional[Dict[Tuple[str, str], List[Any]]] = None
+) -> Dict[Tuple[str, str], List[Any]]:
+    """Fold task_history rows into per (task_type, user_id) sums, in
+    user_task_stats column order: tasks, rating_sum, duration_sum,
+    last_timestamp, decay_weight_sum, decay_rating_sum, decay_duration_sum."""
+    if totals is None:
+        totals = {}
+    for row in rows:
+        task_type, user_id, rating, duration, timestamp, w, wr, wd = _stats_delta(tuple(row))
+        t = totals.get((task_type, user_id))
+        if t is None:
+            totals[(task_type, user_id)] = [1, rating, duration, timestamp, w, wr, wd]
+        else:
+            t[0] += 1
+            t[1] += rating
+            t[2] += duration
+            t[3] = max(t[3] or "", timestamp)
+            t[4] += w
+            t[5] += wr
+            t[6] += wd
+    return totals
+
+def _merge_user_task_stats(conn: sqlite3.Connection, totals: Dict[Tuple[str, str], List[Any]]) -> None:
+    conn.executemany(
+        _UPSERT_USER_TASK_STATS_SQL, [(task_type, user_id, *t) for (task_type, user_id), t in totals.items()]
+    )
+
+def _add_to_user_task_stats(conn: sqlite3.Connection, rows: Sequence[Sequence[Any]]) -> None:
+    # One upsert per (task_type, user) in the batch rather than per row.
+    _merge_user_task_stats(conn, _sum_stats(rows))
+
+def _stats_view(r: Any) -> Dict[str, Any]:
+    tasks = r["tasks"]
+    weight = r["decay_weight_sum"]
+    return {
+        "tasks": tasks,
+        "avg_rating": r["rating_sum"] / tasks,
+        "avg_duration": r["duration_sum"] / tasks,
+        "last_timestamp": r["last_timestamp"],
+        "decayed_avg_rating": r["decay_rating_sum"] / weight if weight else None,
+        "decayed_avg_duration": r["decay_duration_sum"] / weight if weight else None,
+    }
+
+def _recompute_user_task_stats(conn: sqlite3.Connection) -> Dict[Tuple[str, str], List[Any]]:
+    return _sum_stats(conn.execute(
+        "SELECT id, user_id, task_type, duration_minutes, success_rating, timestamp FROM task_history"
+    ))
+
+def _rebuild_user_task_stats(conn: sqlite3.Connection) -> int:
+    totals = _recompute_user_task_stats(conn)
+    conn.execute("DELETE FROM user_task_stats")
+    conn.executemany(
+        "INSERT INTO user_task_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(task_type, user_id, *t) for (task_type, user_id), t in totals.items()],
     )
-    conn.commit()
-    conn.close()
+    return len(totals)
+
+def rebuild_user_task_stats(db_path: str) -> int:
+    """Recompute the whole rollup from task_history; returns the number of rows written."""
+    with transaction(db_path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        count = _rebuild_user_task_stats(conn)
+    _bump_task_history_generation(db_path)
+    return count
+
+def check_user_task_stats(db_path: str, rel_tol: float = 1e-9) -> List[Dict[str, Any]]:
+    """Compare the rollup against a full recomputation; returns one entry per mismatch."""
+    import math
+
+    columns = ("tasks", "rating_sum", "duration_sum", "last_timestamp",
+               "decay_weight_sum", "decay_rating_sum", "decay_duration_sum")
+    with transaction(db_path) as conn:
+        # One read transaction so history and rollup are a consistent snapshot.
+        conn.execute("BEGIN")
+        expected = _recompute_user_task_stats(conn)
+        actual = {
+            (r["task_type"], r["user_id"]): [r[c] for c in columns]
+            for r in conn.execute("SELECT * FROM user_task_stats")
+        }
+
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        want, got = expected.get(key), actual.get(key)
+        if want is None or got is None:
+            mismatches.append({"task_type": key[0], "user_id": key[1], "expected": want, "actual": got})
+            continue
+        for column, w, g in zip(columns, want, got):
+            same = math.isclose(w, g, rel_tol=rel_tol) if isinstance(w, float) else w == g
+            if not same:
+                mismatches.append({"task_type": key[0], "user_id": key[1], "column": column, "expected": w, "actual": g})
+    return mismatches
 
 def get_project_details(db_path: str) -> Dict[str, Any]:
     # Simplifying: get all projects and milestones (assuming single active project context for now or returning list)
-    conn = _connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    
-    projects = cur.execute("SELECT * FROM projects").fetchall()
-    users = cur.execute("SELECT * FROM users").fetchall()
-    milestones = cur.execute("SELECT * FROM milestones").fetchall()
-    
-    conn.close()
-    
+    with connection(db_path) as conn:
+        projects = conn.execute("SELECT * FROM projects").fetchall()
+        users = conn.execute("SELECT * FROM users").fetchall()
+        milestones = conn.execute("SELECT * FROM milestones").fetchall()
+
     return {
         "projects": [dict(p) for p in projects],
         "users": [dict(u) for u in users],
         "milestones": [dict(m) for m in milestones]
     }
 
+def list_user_ids(db_path: str) -> List[str]:
+    with connection(db_path) as conn:
+        rows = conn.execute("SELECT id FROM users").fetchall()
+    return [r["id"] for r in rows]
+
 def get_user_performance(db_path: str, user_id: str) -> List[Dict[str, Any]]:
-    conn = _connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    rows = cur.execute("SELECT * FROM task_history WHERE user_id = ?", (user_id,)).fetchall()
-    conn.close()
+    with connection(db_path) as conn:
+        rows = conn.execute("SELECT * FROM task_history WHERE user_id = ?", (user_id,)).fetchall()
+    return [dict(r) for r in rows]
+
+def get_user_skills(db_path: str, user_ids: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, float]]:
+    """Skills of the given users that exist (all users when None), by id."""
+    import json
+    out: Dict[str, Dict[str, float]] = {}
+    with connection(db_path) as conn:
+        if user_ids is None:
+            rows = conn.execute("SELECT id, skills_json FROM users").fetchall()
+            return {r["id"]: json.loads(r["skills_json"]) for r in rows}
+        for i in range(0, len(user_ids), 500):
+            chunk = list(user_ids[i:i + 500])
+            rows = conn.execute(
+                f"SELECT id, skills_json FROM users WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            out.update((r["id"], json.loads(r["skills_json"])) for r in rows)
+    return out
+
+def list_unassigned_milestones(db_path: str, project_id: str) -> List[Dict[str, Any]]:
+    """A project's open milestones with no assignee, soonest due first (undated last)."""
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT id, title, status, due_date FROM milestones
+            WHERE project_id = ? AND status != 'completed' AND assigned_to IS NULL
+            ORDER BY due_date IS NULL, due_date, id
+            """,
+            (project_id,),
+        ).fetchall()
     return [dict(r) for r in rows]
+
+def open_milestone_counts(db_path: str) -> Dict[str, int]:
+    """Open (not completed) milestones per assignee, across all projects."""
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            "SELECT assigned_to, COUNT(*) AS n FROM milestones "
+            "WHERE assigned_to IS NOT NULL AND status != 'completed' GROUP BY assigned_to"
+        ).fetchall()
+    return {r["assigned_to"]: r["n"] for r in rows}
+
+def assign_milestones(db_path: str, assignments: Dict[str, str]) -> int:
+    """Set assigned_to for many milestones in one transaction, only where it is
+    still empty; returns how many were assigned."""
+    with transaction(db_path) as conn:
+        return conn.executemany(
+            "UPDATE milestones SET assigned_to = ? WHERE id = ? AND assigned_to IS NULL",
+            [(user_id, milestone_id) for milestone_id, user_id in assignments.items()],
+        ).rowcount
+
+
+# -----------------------
+# Dashboard
+# -----------------------
+
+_PROJECT_FIELDS = ("id", "name", "deadline", "status", "created_at")
+_MILESTONE_FIELDS = ("id", "project_id", "title", "status", "assigned_to", "due_date", "completed_at")
+_USER_FIELDS = ("id", "name", "role")
+
+
+def _projection(requested: Optional[Sequence[str]], allowed: Tuple[str, ...], required: str) -> List[str]:
+    if not requested:
+        return list(allowed)
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f"unknown fields {unknown}; allowed: {list(allowed)}")
+    # Keep the key column so rows can still be joined client-side.
+    return [required] + [f for f in requested if f != required]
+
+
+def get_dashboard(
+    db_path: str,
+    project_id: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    milestone_fields: Optional[Sequence[str]] = None,
+    limit: int = 20,
+    offset: int = 0,
+    include_milestones: bool = True,
+    include_users: bool = True,
+    today: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Scoped dashboard view: a page of projects (newest first) with a
+    milestone summary each, plus only those projects' milestones.
+
+    `fields` / `milestone_fields` project columns; unknown names raise
+    ValueError, as do limit < 1 and offset < 0. `today` (YYYY-MM-DD, default
+    UTC today) decides overdue.
+    """
+    from datetime import datetime, timezone
+
+    # SQLite reads LIMIT -1 as no limit at all.
+    if limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+    if offset < 0:
+        raise ValueError(f"offset must not be negative, got {offset}")
+
+    project_cols = _projection(fields, _PROJECT_FIELDS, "id")
+    milestone_cols = _projection(milestone_fields, _MILESTONE_FIELDS, "project_id")
+    today = today or datetime.now(timezone.utc).date().isoformat()
+
+    where, params = "", []
+    if project_id:
+        where, params = "WHERE id = ?", [project_id]
+
+    with connection(db_path) as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM projects {where}", params).fetchone()[0]
+        projects = [
+            dict(r)
+            for r in conn.execute(
+                f"SELECT {', '.join(project_cols)} FROM projects {where} "
+                "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            )
+        ]
+        ids = [p["id"] for p in projects]
+        marks = ", ".join("?" * len(ids))
+
+        summaries: Dict[str, Dict[str, Any]] = {
+            pid: {"total": 0, "by_status": {}, "overdue": 0} for pid in ids
+        }
+        if ids:
+            for r in conn.execute(
+                f"SELECT project_id, status, count FROM project_milestone_counts "
+                f"WHERE project_id IN ({marks}) AND count > 0",
+                ids,
+            ):
+                summary = summaries[r["project_id"]]
+                summary["by_status"][r["status"]] = r["count"]
+                summary["total"] += r["count"]
+            for r in conn.execute(
+                f"SELECT project_id, COUNT(*) AS overdue FROM milestones "
+                f"WHERE project_id IN ({marks}) AND status != 'completed' AND due_date < ? "
+                f"GROUP BY project_id",
+                ids + [today],
+            ):
+                summaries[r["project_id"]]["overdue"] = r["overdue"]
+
+        milestones: List[Dict[str, Any]] = []
+        if include_milestones and ids:
+            milestones = [
+                dict(r)
+                for r in conn.execute(
+                    f"SELECT {', '.join(milestone_cols)} FROM milestones WHERE project_id IN ({marks})",
+                    ids,
+                )
+            ]
+
+        users: List[Dict[str, Any]] = []
+        if include_users:
+            users = [dict(r) for r in conn.execute(f"SELECT {', '.join(_USER_FIELDS)} FROM users")]
+
+    for p in projects:
+        p["summary"] = summaries[p["id"]]
+
+    next_offset = offset + len(projects)
+    return {
+        "projects": projects,
+        "milestones": milestones,
+        "users": users,
+        "total_projects": total,
+        "next_offset": next_offset if next_offset < total else None,
+    }
+
+
+# -----------------------
+# Change log
+# -----------------------
+# Triggers append (version, table, row id, op) for every write to the tracked
+# tables, whichever process or code path made it. The latest version doubles
+# as an ETag, and clients holding an old version fetch only what changed.
+
+def change_version(db_path: str) -> int:
+    with connection(db_path) as conn:
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+    return row[0] if row else 0
+
+
+def changed_row_ids(db_path: str, table: str, since: int) -> Tuple[int, Optional[List[str]]]:
+    """(current version, ids of `table` rows written after version `since`).
+
+    The ids are None when the log no longer reaches back to `since`, as for
+    get_changes' "reset": the caller must reload everything.
+    """
+    with transaction(db_path) as conn:
+        conn.execute("BEGIN")
+        current = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+        current = current[0] if current else 0
+        if since == current:
+            return current, []
+        oldest = conn.execute("SELECT MIN(version) FROM changes").fetchone()[0]
+        if since > current or oldest is None or since + 1 < oldest:
+            return current, None
+        rows = conn.execute(
+            "SELECT DISTINCT row_id FROM changes WHERE version > ? AND table_name = ?", (since, table)
+        ).fetchall()
+    return current, [r["row_id"] for r in rows]
+
+
+def _prune_changes(conn: sqlite3.Connection, keep_last: int) -> None:
+    conn.execute(
+        "DELETE FROM changes WHERE version <= (SELECT MAX(version) FROM changes) - ?",
+        (keep_last,),
+    )
+
+
+def prune_changes(db_path: str, keep_last: int = CHANGES_RETENTION) -> None:
+    with transaction(db_path) as conn:
+        _prune_changes(conn, keep_last)
+
+
+def _current_rows(conn: sqlite3.Connection, table: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    rows: Dict[str, Dict[str, Any]] = {}
+    for start in range(0, len(ids), 500):
+        batch = ids[start:start + 500]
+        marks = ", ".join("?" * len(batch))
+        # Not * for events: that would include the payload key columns.
+        columns = "id, type, team, severity, timestamp, payload_json" if table == "events" else "*"
+        for r in conn.execute(f"SELECT {columns} FROM {table} WHERE id IN ({marks})", batch):
+            row = dict(r)
+            if table == "events":
+                row["payload"] = decode_payload(row.pop("payload_json"))
+            rows[row["id"]] = row
+    return rows
+
+
+def _sealed_event_rows(conn: sqlite3.Connection, db_path: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Rows of `ids` found in sealed event partitions, newest month first."""
+    rows: Dict[str, Dict[str, Any]] = {}
+    for _, path in _queried_partitions(conn, db_path, None, None, None):
+        missing = [i for i in ids if i not in rows]
+        if not missing:
+            break
+        with connection(path) as pconn:
+            rows.update(_current_rows(pconn, "events", missing))
+    return rows
+
+
+def get_changes(db_path: str, since: int, limit: int = 1000) -> Dict[str, Any]:
+    """Rows of the tracked tables changed after version `since`.
+
+    Each table lists the current state of changed rows under "upserted" and
+    ids of rows that no longer exist under "deleted". Pass the returned
+    "version" as the next `since`; "has_more" means call again right away.
+    "reset" means the log no longer reaches back to `since` (pruned) and the
+    client must refetch everything. Events sealed into a partition since
+    they changed are read from it; archived ones are in neither list.
+    Raises ValueError for limit < 1.
+    """
+    if limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+    with transaction(db_path) as conn:
+        # One read transaction: the change list and row contents must agree.
+        conn.execute("BEGIN")
+        current = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+        current = current[0] if current else 0
+        oldest = conn.execute("SELECT MIN(version) FROM changes").fetchone()[0]
+        # since > current: the client saw a different (e.g. reset) database.
+        if since > current or (since < current and (oldest is None or since + 1 < oldest)):
+            return {"version": current, "reset": True, "has_more": False, "changes": {}}
+
+        # Latest change per row; SQLite returns the other columns from the
+        # MAX(version) row of each group.
+        changed = conn.execute(
+            """
+            SELECT table_name, row_id, op, MAX(version) AS version
+            FROM changes
+            WHERE version > ?
+            GROUP BY table_name, row_id
+            ORDER BY version
+            LIMIT ?
+            """,
+            (since, limit + 1),
+        ).fetchall()
+        has_more = len(changed) > limit
+        changed = changed[:limit]
+        upto = changed[-1]["version"] if has_more else max(current, since)
+
+        by_table: Dict[str, List[str]] = {}
+        deleted_ids = set()
+        for r in changed:
+            by_table.setdefault(r["table_name"], []).append(r["row_id"])
+            if r["op"] == "delete":
+                deleted_ids.add((r["table_name"], r["row_id"]))
+
+        out: Dict[str, Dict[str, Any]] = {}
+        for table, ids in by_table.items():
+            rows = _current_rows(conn, table, ids)
+            gone = [i for i in ids if i not in rows]
+            if table == "events" and gone:
+                # Sealing moves rows out without logging a delete: those are
+                # read from their partition, or left out once archived.
+                rows.update(_sealed_event_rows(conn, db_path, [i for i in gone if ("events", i) not in deleted_ids]))
+                gone = [i for i in gone if ("events", i) in deleted_ids]
+            out[table] = {
+                "upserted": [rows[i] for i in ids if i in rows],
+                "deleted": gone,
+            }
+
+    return {"version": upto, "reset": False, "has_more": has_more, "changes": out}
+
+
+# -----------------------
+# Resource metrics
+# -----------------------
+# Append-only ResourceUpdate samples (see _m010_resource_metrics). A sample
+# for a (series, second) that already exists is ignored. The ResourceUpdate
+# id is not stored: samples are addressed by series and time.
+
+def insert_resource_updates(db_path: str, updates: Sequence[ResourceUpdate]) -> int:
+    """Append samples in one transaction; returns how many were new."""
+    with transaction(db_path) as conn:
+        series_ids: Dict[Tuple[str, str, str], int] = {}
+        samples, notes = [], []
+        for u in updates:
+            key = (u.resource, u.metric, u.team or "")
+            if key not in series_ids:
+                conn.execute(
+                    "INSERT OR IGNORE INTO resource_series (resource, team, metric, unit) VALUES (?, ?, ?, ?)",
+                    (u.resource, key[2], u.metric, u.unit),
+                )
+                series_ids[key] = conn.execute(
+                    "SELECT id FROM resource_series WHERE resource = ? AND metric = ? AND team = ?", key
+                ).fetchone()[0]
+            ts = timestamp_to_epoch_us(u.timestamp) // 1_000_000
+            samples.append((series_ids[key], ts, u.value))
+            if u.notes:
+                notes.append((series_ids[key], ts, u.notes))
+        # rowcount excludes the rollup trigger's writes.
+        inserted = conn.executemany(
+            "INSERT OR IGNORE INTO resource_samples (series_id, ts, value) VALUES (?, ?, ?)", samples
+        ).rowcount
+        conn.executemany("INSERT OR IGNORE INTO resource_sample_notes (series_id, ts, notes) VALUES (?, ?, ?)", notes)
+    return inserted
+
+
+def list_resource_series(db_path: str, resource: Optional[str] = None) -> List[Dict[str, Any]]:
+    sql = "SELECT resource, team, metric, unit FROM resource_series"
+    params: List[Any] = []
+    if resource:
+        sql += " WHERE resource = ?"
+        params.append(resource)
+    with connection(db_path) as conn:
+        rows = conn.execute(sql + " ORDER BY resource, metric, team", params).fetchall()
+    return [{**dict(r), "team": r["team"] or None} for r in rows]
+
+
+def query_resource_metric(
+    db_path: str,
+    resource: str,
+    metric: str,
+    team: Optional[str] = None,
+    interval: str = "hour",
+    start_ts: Optional[str] = None,
+    end_ts: Optional[str] = None,
+    limit: int = 10000,
+) -> Dict[str, Any]:
+    """Samples of one series, oldest first.
+
+    interval "raw" returns the samples themselves (with notes); "hour" and
+    "day" return count/min/max/avg per UTC bucket from resource_rollups,
+    with start_ts/end_ts widened to whole buckets. At most `limit` points.
+    Raises ValueError for an unknown interval or bad timestamp.
+    """
+    if interval != "raw" and interval not in _RESOURCE_INTERVALS:
+        raise ValueError(f"unknown interval {interval!r}; allowed: {['raw', *_RESOURCE_INTERVALS]}")
+    lo = timestamp_to_epoch_us(start_ts) // 1_000_000 if start_ts else None
+    hi = timestamp_to_epoch_us(end_ts) // 1_000_000 if end_ts else None
+
+    with connection(db_path) as conn:
+        series = conn.execute(
+            "SELECT id, unit FROM resource_series WHERE resource = ? AND metric = ? AND team = ?",
+            (resource, metric, team or ""),
+        ).fetchone()
+        out: Dict[str, Any] = {
+            "resource": resource,
+            "metric": metric,
+            "team": team,
+            "unit": series["unit"] if series else None,
+            "interval": interval,
+            "points": [],
+        }
+        if series is None:
+            return out
+
+        if interval == "raw":
+            where, params = ["s.series_id = ?"], [series["id"]]
+            if lo is not None:
+                where.append("s.ts >= ?")
+                params.append(lo)
+            if hi is not None:
+                where.append("s.ts <= ?")
+                params.append(hi)
+            rows = conn.execute(
+                f"""
+                SELECT s.ts, s.value, n.notes
+                FROM resource_samples s
+                LEFT JOIN resource_sample_notes n ON n.series_id = s.series_id AND n.ts = s.ts
+                WHERE {" AND ".join(where)}
+                ORDER BY s.ts
+                LIMIT ?
+                """,
+                params + [limit],
+            ).fetchall()
+            out["points"] = [
+                {"timestamp": epoch_us_to_timestamp(r["ts"] * 1_000_000), "value": r["value"],
+                 **({"notes": r["notes"]} if r["notes"] else {})}
+                for r in rows
+            ]
+            return out
+
+        seconds = _RESOURCE_INTERVALS[interval]
+        where, params = ["series_id = ?", "interval = ?"], [series["id"], seconds]
+        if lo is not None:
+            where.append("bucket >= ?")
+            params.append(lo - lo % seconds)
+        if hi is not None:
+            where.append("bucket <= ?")
+            params.append(hi)
+        rows = conn.execute(
+            f"""
+            SELECT bucket, count, sum, min, max FROM resource_rollups
+            WHERE {" AND ".join(where)}
+            ORDER BY bucket
+            LIMIT ?
+            """,
+            params + [limit],
+        ).fetchall()
+    out["points"] = [
+        {
+            "timestamp": epoch_us_to_timestamp(r["bucket"] * 1_000_000),
+            "count": r["count"],
+            "min": r["min"],
+            "max": r["max"],
+            "avg": r["sum"] / r["count"],
+        }
+        for r in rows
+    ]
+    return out
+
+
+# -----------------------
+# Decision log
+# -----------------------
+# Decisions and their search index (see _m011_decisions). Free text is
+# matched word by word against title, rationale and tags and ranked by BM25,
+# with title and tag hits weighted above rationale hits.
+
+_DECISION_JSON_FIELDS = ("made_by", "owners", "expected_outcomes", "actual_outcomes", "tags")
+_DECISION_BM25_WEIGHTS = (10.0, 1.0, 5.0)  # title, rationale, tags
+_FTS_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _decision_row(decision: Decision) -> tuple:
+    import json
+
+    return (
+        decision.id,
+        decision.title,
+        json.dumps(decision.made_by),
+        json.dumps(decision.owners),
+        decision.timestamp,
+        decision.rationale,
+        json.dumps(decision.expected_outcomes),
+        json.dumps(decision.actual_outcomes),
+        json.dumps(decision.tags),
+    )
+
+
+def _decision_view(r: Any) -> Dict[str, Any]:
+    import json
+
+    out = {k: r[k] for k in ("id", "title", "timestamp", "rationale")}
+    for field in _DECISION_JSON_FIELDS:
+        out[field] = json.loads(r[f"{field}_json"])
+    return out
+
+
+def upsert_decision(db_path: str, decision: Decision) -> None:
+    """Insert a decision, or replace every field of the one with its id."""
+    with transaction(db_path) as conn:
+        # ON CONFLICT DO UPDATE (not INSERT OR REPLACE) so the update trigger
+        # reindexes the row in place.
+        conn.execute(
+            """
+            INSERT INTO decisions (id, title, made_by_json, owners_json, timestamp, rationale,
+                                   expected_outcomes_json, actual_outcomes_json, tags_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                title = excluded.title,
+                made_by_json = excluded.made_by_json,
+                owners_json = excluded.owners_json,
+                timestamp = excluded.timestamp,
+                rationale = excluded.rationale,
+                expected_outcomes_json = excluded.expected_outcomes_json,
+                actual_outcomes_json = excluded.actual_outcomes_json,
+                tags_json = excluded.tags_json
+            """,
+            _decision_row(decision),
+        )
+
+
+def get_decision(db_path: str, decision_id: str) -> Optional[Dict[str, Any]]:
+    with connection(db_path) as conn:
+        row = conn.execute("SELECT * FROM decisions WHERE id = ?", (decision_id,)).fetchone()
+    return _decision_view(row) if row else None
+
+
+def _fts_query(text: str) -> Optional[str]:
+    # Quote every word so user text can never be FTS5 syntax; OR them so a
+    # partial match still ranks, with more matched words ranking higher.
+    terms = _FTS_TERM_RE.findall(text)
+    return " OR ".join(f'"{t}"' for t in terms) if terms else None
+
+
+def search_decisions(
+    db_path: str,
+    query: Optional[str] = None,
+    owners: Optional[Sequence[str]] = None,
+    start_ts: Optional[str] = None,
+    end_ts: Optional[str] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """Decisions matching `query`, best BM25 match first.
+
+    owners keeps decisions owned by any of them; start_ts/end_ts bound the
+    decision timestamp (inclusive). Without a query the newest decisions
+    come first. Each result carries `score` (higher is better; absent
+    without a query). Raises ValueError for a bad timestamp.
+    """
+    match = _fts_query(query) if query else None
+    if query and match is None:
+        return []
+
+    # Filters are sets of decision seqs, so the ranked search can apply them
+    # to FTS rowids and read full rows only for the page it returns. The
+    # unary + keeps SQLite from handing the IN list to FTS5 as rowid lookups,
+    # which is one index probe per candidate instead of one scan.
+    filters: List[str] = []
+    params: List[Any] = []
+    if owners:
+        filters.append(
+            f"""IN (SELECT d.seq FROM decision_owners o JOIN decisions d ON d.id = o.decision_id
+                    WHERE o.owner IN ({",".join("?" * len(owners))}))"""
+        )
+        params.extend(owners)
+    if start_ts or end_ts:
+        bounds = []
+        if start_ts:
+            bounds.append("timestamp >= ?")
+            params.append(normalize_timestamp(start_ts))
+        if end_ts:
+            bounds.append("timestamp <= ?")
+            params.append(normalize_timestamp(end_ts))
+        filters.append(f"IN (SELECT seq FROM decisions WHERE {' AND '.join(bounds)})")
+
+    if match:
+        weights = ", ".join(str(w) for w in _DECISION_BM25_WEIGHTS)
+        sql = f"""
+            SELECT d.*, f.rank FROM (
+                SELECT rowid AS seq, bm25(decisions_fts, {weights}) AS rank
+                FROM decisions_fts
+                WHERE decisions_fts MATCH ?{"".join(" AND +rowid " + f for f in filters)}
+                ORDER BY rank
+                LIMIT ?
+            ) f JOIN decisions d ON d.seq = f.seq
+            ORDER BY f.rank
+        """
+        params = [match, *params, limit]
+    else:
+        sql = f"""
+            SELECT d.* FROM decisions d
+            {"WHERE " + " AND ".join("d.seq " + f for f in filters) if filters else ""}
+            ORDER BY d.timestamp DESC, d.id DESC
+            LIMIT ?
+        """
+        params.append(limit)
+    with connection(db_path) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    results = []
+    for r in rows:
+        item = _decision_view(r)
+        if match:
+            # bm25() is negative, more negative for better matches. Not
+            # rounded: scores of large collections can be tiny, and rounding
+            # would show ties the ranking does not have.
+            item["score"] = -r["rank"]
+        results.append(item)
+    return results
+
+
+
+# -----------------------
+# Bulk load and restore
+# -----------------------
+# Seeding and demo resets. bulk_load feeds fixture records straight into
+# executemany inside one transaction: no per-row commits, and a bad record
+# anywhere rolls the whole load back. Triggers still fire, so the change log
+# and the count rollups stay right. restore_database swaps a prebuilt
+# database in with SQLite's online backup instead of replaying inserts.
+
+def _user_row(user: User) -> tuple:
+    import json
+    return (user.id, user.name, user.role, json.dumps(user.skills))
+
+
+# table -> (model, columns, row builder), in load order (referenced rows first)
+_BULK_TABLES: Dict[str, Tuple[Any, str, Callable[[Any], tuple]]] = {
+    "projects": (
+        Project, "id, name, deadline, status, created_at",
+        lambda p: (p.id, p.name, p.deadline, p.status, p.created_at),
+    ),
+    "users": (User, "id, name, role, skills_json", _user_row),
+    "milestones": (
+        Milestone, "id, project_id, title, status, assigned_to, due_date, completed_at",
+        lambda m: (m.id, m.project_id, m.title, m.status, m.assigned_to, m.due_date, m.completed_at),
+    ),
+    "task_history": (
+        TaskHistory, "id, user_id, task_type, duration_minutes, success_rating, timestamp", _task_history_row,
+    ),
+    "events": (
+        Event, "id, type, team, severity, timestamp, ts_us, payload_json", _event_row,
+    ),
+}
+BULK_TABLES = tuple(_BULK_TABLES)
+# "replace" is an upsert (see _bulk_insert_sql), not INSERT OR REPLACE: with
+# recursive_triggers off, the row REPLACE deletes fires no DELETE trigger, so
+# event_counts and project_milestone_counts would count it again.
+_BULK_CONFLICT_VERBS = {"error": "INSERT", "skip": "INSERT OR IGNORE", "replace": "INSERT"}
+
+
+def _bulk_insert_sql(table: str, columns: str, on_conflict: str) -> str:
+    names = [c.strip() for c in columns.split(",")]
+    sql = f"{_BULK_CONFLICT_VERBS[on_conflict]} INTO {table} ({columns}) VALUES ({', '.join('?' * len(names))})"
+    if on_conflict == "replace":
+        sql += " ON CONFLICT(id) DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in names if c != "id")
+    return sql
+
+
+def bulk_load(
+    db_path: str,
+    tables: Dict[str, Iterable[Dict[str, Any]]],
+    on_conflict: str = "error",
+    log_changes: bool = True,
+) -> Dict[str, int]:
+    """Insert records ({table: iterable of dicts shaped like the app.schemas
+    model}) for any of BULK_TABLES in one transaction; returns rows inserted
+    per table.
+
+    on_conflict decides what an existing id does: "error" aborts the load,
+    "skip" keeps the stored row, "replace" overwrites it. Records are read
+    lazily, so a CSV reader or generator of millions of rows never sits in
+    memory. Invalid records raise ValueError naming the table and position,
+    and nothing is written.
+
+    log_changes=False skips writing a change log row per record and pruning
+    them afterwards. The log is emptied instead, so /changes and live
+    clients see a reset, as after restore_database: meant for seeding, not
+    for databases that clients sync incrementally.
+    """
+    from pydantic import ValidationError
+
+    if on_conflict not in _BULK_CONFLICT_VERBS:
+        raise ValueError(f"on_conflict must be one of {sorted(_BULK_CONFLICT_VERBS)}")
+    unknown = set(tables) - set(_BULK_TABLES)
+    if unknown:
+        raise ValueError(f"unknown tables {sorted(unknown)}; expected some of {list(BULK_TABLES)}")
+
+    inserted: Dict[str, int] = {}
+    position = [0]
+    with transaction(db_path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if not log_changes:
+            # Dropped and recreated inside the transaction: other connections
+            # never see the tables without their triggers.
+            names = [f"trg_{t}_changes_{op}" for t in _TRACKED_TABLES for op in ("insert", "update", "delete")]
+            marks = ", ".join("?" * len(names))
+            triggers = conn.execute(
+                f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN ({marks})", names
+            ).fetchall()
+            for name, _ in triggers:
+                conn.execute(f"DROP TRIGGER {name}")
+        for table, (model, columns, to_row) in _BULK_TABLES.items():
+            if table not in tables:
+                continue
+
+            def rows() -> Iterator[tuple]:
+                for position[0], record in enumerate(tables[table]):
+                    yield to_row(model.model_validate(record))
+
+            source: Iterable[tuple] = rows()
+            stats: Dict[Tuple[str, str], List[Any]] = {}
+            if table == "task_history" and on_conflict == "error":
+                # Every row is new, so the rollup only needs these rows' sums.
+                source = _tee_stats(source, stats)
+            try:
+                cur = conn.executemany(_bulk_insert_sql(table, columns, on_conflict), source)
+            except ValidationError as e:
+                raise ValueError(f"{table} record {position[0]}: {e.errors()[0]['loc']}: {e.errors()[0]['msg']}") from None
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"{table} record {position[0]}: {e}") from None
+            inserted[table] = cur.rowcount
+            if table == "task_history":
+                if on_conflict == "error":
+                    _merge_user_task_stats(conn, stats)
+                elif inserted[table]:
+                    # Skipped or replaced rows: recompute rather than guess.
+                    _rebuild_user_task_stats(conn)
+        if log_changes:
+            _prune_changes(conn, CHANGES_RETENTION)
+        else:
+            for _, sql in triggers:
+                conn.execute(sql)
+            _reset_change_log(conn, _change_seq(conn))
+    if "task_history" in tables:
+        _bump_task_history_generation(db_path)
+    return inserted
+
+
+def _change_seq(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+    return row[0] if row else 0
+
+
+def _reset_change_log(conn: sqlite3.Connection, above: int) -> int:
+    """Empty the change log and move its version past `above`, so every
+    client's `since` is either older than the log or from another database:
+    both read as a reset. Returns the new version."""
+    version = above + 1
+    conn.execute("DELETE FROM changes")
+    conn.execute("DELETE FROM sqlite_sequence WHERE name = 'changes'")
+    conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('changes', ?)", (version,))
+    return version
+
+
+def _tee_stats(rows: Iterable[tuple], totals: Dict[Tuple[str, str], List[Any]]) -> Iterator[tuple]:
+    for row in rows:
+        _sum_stats((row,), totals)
+        yield row
+
+
+def restore_database(db_path: str, source_path: str) -> int:
+    """Replace everything in db_path with the contents of source_path.
+
+    Uses SQLite's online backup into the live database, as one write
+    transaction: connections in this and other processes stay open and see
+    either the old or the new data, never a mix, and no file is removed
+    under them. The restored change log is emptied and its version set above
+    both databases' versions, so /changes clients, the live stream and the
+    skill matrix all see a reset. Returns the new change version.
+    """
+    import tempfile
+
+    if not os.path.exists(source_path):
+        raise ValueError(f"no database at {source_path}")
+    old_version = change_version(db_path)
+    fd, staging_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(db_path)), suffix=".restore")
+    os.close(fd)
+    try:
+        source = sqlite3.connect(source_path)
+        staging = sqlite3.connect(staging_path)
+        try:
+            source.backup(staging)
+            version = _reset_change_log(staging, max(old_version, _change_seq(staging)))
+            staging.commit()
+            with connection(db_path) as conn:
+                staging.backup(conn)
+        finally:
+            source.close()
+            staging.close()
+    finally:
+        _remove_db_files(staging_path)
+    _bump_task_history_generation(db_path)
+    return version
+
+
+# Last, so every module importing from here gets the timed functions.
+instrument_storage(globals(), __name__)
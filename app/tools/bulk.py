@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from ..config import BULK_CHUNK_SIZE
+from ..schemas import Event, TaskHistory
+from ..storage import insert_events_bulk, log_task_history_bulk
+from ..utils import new_id, utc_now_iso
+
+
+class _BadLine:
+    def __init__(self, error: str) -> None:
+        self.error = error
+
+
+def parse_ndjson(text: str) -> List[Any]:
+    """Split an NDJSON body into records; unparseable lines become placeholders
+    so row indexes in the response still match line numbers (blank lines skipped)."""
+    records: List[Any] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError as e:
+            records.append(_BadLine(f"invalid JSON: {e}"))
+    return records
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'record'}: {err['msg']}" for err in e.errors()
+    )
+
+
+def _validate(records: List[Any], build) -> Tuple[List[Tuple[int, Any]], List[Dict[str, Any]]]:
+    valid: List[Tuple[int, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for index, record in enumerate(records):
+        if isinstance(record, _BadLine):
+            errors.append({"index": index, "error": record.error})
+            continue
+        if not isinstance(record, dict):
+            errors.append({"index": index, "error": "record must be a JSON object"})
+            continue
+        try:
+            valid.append((index, build(record)))
+        except ValidationError as e:
+            errors.append({"index": index, "error": _validation_message(e)})
+    return valid, errors
+
+
+def _ingest(records, build, insert, db_path: str, chunk_size: int, start_index: int) -> dict:
+    if isinstance(records, str):
+        records = parse_ndjson(records)
+    valid, errors = _validate(records, build)
+    db_errors = insert(db_path, [model for _, model in valid], chunk_size)
+    for position, message in db_errors.items():
+        errors.append({"index": valid[position][0], "error": message})
+    errors.sort(key=lambda e: e["index"])
+    for e in errors:
+        e["index"] += start_index
+    return {
+        "ok": not errors,
+        "received": len(records),
+        "inserted": len(valid) - len(db_errors),
+        "failed": len(errors),
+        "errors": errors,
+    }
+
+
+def _build_event(record: Dict[str, Any]) -> Event:
+    data = dict(record)
+    data.setdefault("id", new_id("evt"))
+    if not data.get("timestamp"):
+        data["timestamp"] = utc_now_iso()
+    data.setdefault("severity", "P3")
+    if data.get("payload") is None:
+        data["payload"] = {}
+    return Event(**data)
+
+
+def _build_history(record: Dict[str, Any]) -> TaskHistory:
+    data = dict(record)
+    data.setdefault("id", new_id("hist"))
+    if not data.get("timestamp"):
+        data["timestamp"] = utc_now_iso()
+    return TaskHistory(**data)
+
+
+def log_events_bulk(
+    db_path: str,
+    events: Union[List[Dict[str, Any]], str],
+    chunk_size: Optional[int] = None,
+    start_index: int = 0,
+) -> dict:
+    """Validate and insert many events (a list of objects or an NDJSON string).
+
+    Rows are committed `chunk_size` at a time; rows that fail validation or
+    hit a constraint are reported in `errors` by input index and the rest of
+    the batch is still written. `start_index` offsets reported indexes when a
+    stream is fed in pieces.
+    """
+    return _ingest(events, _build_event, insert_events_bulk, db_path, chunk_size or BULK_CHUNK_SIZE, start_index)
+
+
+def log_work_bulk(
+    db_path: str,
+    entries: Union[List[Dict[str, Any]], str],
+    chunk_size: Optional[int] = None,
+    start_index: int = 0,
+) -> dict:
+    """Like log_events_bulk, for TaskHistory records."""
+    return _ingest(entries, _build_history, log_task_history_bulk, db_path, chunk_size or BULK_CHUNK_SIZE, start_index)
+
+
+def merge_bulk_results(results: List[dict]) -> dict:
+    errors = [e for r in results for e in r["errors"]]
+    return {
+        "ok": not errors,
+        "received": sum(r["received"] for r in results),
+        "inserted": sum(r["inserted"] for r in results),
+        "failed": len(errors),
+        "errors": errors,
+    }
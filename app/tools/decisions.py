@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from ..schemas import Decision
+from ..storage import get_decision, search_decisions as query_decisions, upsert_decision
+from ..utils import new_id, utc_now_iso
+
+
+def record_decision(
+    db_path: str,
+    title: str,
+    rationale: str = "",
+    made_by: Optional[List[str]] = None,
+    owners: Optional[List[str]] = None,
+    tags: Optional[List[str]] = None,
+    expected_outcomes: Optional[Dict[str, Any]] = None,
+    timestamp: Optional[str] = None,
+) -> dict:
+    decision = Decision(
+        id=new_id("dec"),
+        title=title,
+        made_by=made_by or [],
+        owners=owners or [],
+        timestamp=timestamp or utc_now_iso(),
+        rationale=rationale,
+        expected_outcomes=expected_outcomes or {},
+        tags=tags or [],
+    )
+    upsert_decision(db_path, decision)
+    return {"ok": True, "decision": decision.model_dump()}
+
+
+def record_decision_outcomes(db_path: str, id: str, actual_outcomes: Dict[str, Any]) -> dict:
+    # Merged into what was recorded before, so outcomes can arrive piecemeal.
+    current = get_decision(db_path, id)
+    if current is None:
+        return {"ok": False, "error": f"unknown decision {id!r}"}
+    decision = Decision(**{**current, "actual_outcomes": {**current["actual_outcomes"], **actual_outcomes}})
+    upsert_decision(db_path, decision)
+    return {"ok": True, "decision": decision.model_dump()}
+
+
+def search_decisions(
+    db_path: str,
+    query: Optional[str] = None,
+    owners: Optional[List[str]] = None,
+    start_ts: Optional[str] = None,
+    end_ts: Optional[str] = None,
+    limit: int = 10,
+) -> dict:
+    results = query_decisions(db_path, query=query, owners=owners, start_ts=start_ts, end_ts=end_ts, limit=limit)
+    return {"count": len(results), "decisions": results}
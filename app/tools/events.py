@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
+from ..config import EVENT_WRITE_MODE
 from ..schemas import Event
 from ..utils import new_id, utc_now_iso
-from ..storage import insert_event, query_events
+from ..storage import aggregate_event_counts, insert_event, query_events_page
 
 
 def log_event(
@@ -23,6 +24,12 @@ def log_event(
         timestamp=timestamp or utc_now_iso(),
         payload=payload or {},
     )
+    if EVENT_WRITE_MODE == "buffered":
+        from ..ingest import get_event_writer
+
+        # Returns once queued; see EventWriter for what that guarantees.
+        get_event_writer(db_path).submit(evt)
+        return {"ok": True, "queued": True, "event": evt.model_dump()}
     insert_event(db_path, evt)
     return {"ok": True, "event": evt.model_dump()}
 
@@ -35,8 +42,11 @@ def list_events(
     start_ts: Optional[str] = None,
     end_ts: Optional[str] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    payload_filter: Optional[Dict[str, Any]] = None,
 ) -> dict:
-    rows = query_events(
+    page = query_events_page(
         db_path=db_path,
         team=team,
         event_type=type,
@@ -44,5 +54,32 @@ def list_events(
         start_ts=start_ts,
         end_ts=end_ts,
         limit=limit,
+        cursor=cursor,
+        fields=fields,
+        payload_filter=payload_filter,
+    )
+    # Pass next_cursor back as `cursor` (with the same filters) for the next page.
+    return {"count": len(page["events"]), "events": page["events"], "next_cursor": page["next_cursor"]}
+
+
+def aggregate_events(
+    db_path: str,
+    bucket: str = "day",
+    group_by: Optional[List[str]] = None,
+    team: Optional[str] = None,
+    type: Optional[str] = None,
+    severity: Optional[str] = None,
+    start_ts: Optional[str] = None,
+    end_ts: Optional[str] = None,
+) -> dict:
+    rows = aggregate_event_counts(
+        db_path=db_path,
+        bucket=bucket,
+        group_by=group_by,
+        team=team,
+        event_type=type,
+        severity=severity,
+        start_ts=start_ts,
+        end_ts=end_ts,
     )
-    return {"count": len(rows), "events": rows}
+    return {"bucket": bucket, "group_by": group_by or [], "total": sum(r["count"] for r in rows), "rows": rows}
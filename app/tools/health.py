@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from .. import instrument
 from ..utils import utc_now_iso
 
 
 def health_check() -> dict:
-    return {"status": "ok", "time": utc_now_iso()}
+    # Slowest tools, routes, storage functions and SQL statements of this
+    # process so far; {"enabled": false} unless METRICS_ENABLED is on.
+    return {"status": "ok", "time": utc_now_iso(), "metrics": instrument.summary()}
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from ..schemas import ResourceUpdate
+from ..storage import insert_resource_updates, list_resource_series, query_resource_metric
+from ..utils import new_id, utc_now_iso
+
+
+def log_resource_metric(
+    db_path: str,
+    resource: str,
+    metric: str,
+    value: float,
+    unit: str,
+    team: Optional[str] = None,
+    timestamp: Optional[str] = None,
+    notes: str = "",
+) -> dict:
+    update = ResourceUpdate(
+        id=new_id("res"),
+        resource=resource,
+        team=team,
+        metric=metric,
+        value=value,
+        unit=unit,
+        timestamp=timestamp or utc_now_iso(),
+        notes=notes,
+    )
+    inserted = insert_resource_updates(db_path, [update])
+    # A sample for the same series and second is kept only once.
+    return {"ok": True, "inserted": bool(inserted), "sample": update.model_dump(exclude={"id"})}
+
+
+def log_resource_metrics(db_path: str, samples: List[Dict[str, Any]]) -> dict:
+    updates = [
+        ResourceUpdate(**{"id": new_id("res"), "timestamp": utc_now_iso(), **{k: v for k, v in s.items() if v is not None}})
+        for s in samples
+    ]
+    inserted = insert_resource_updates(db_path, updates)
+    return {"ok": True, "received": len(updates), "inserted": inserted}
+
+
+def query_resource_metrics(
+    db_path: str,
+    resource: str,
+    metric: Optional[str] = None,
+    team: Optional[str] = None,
+    interval: str = "hour",
+    start_ts: Optional[str] = None,
+    end_ts: Optional[str] = None,
+    limit: int = 1000,
+) -> dict:
+    # Without a metric, list the resource's series so the caller can pick one.
+    if not metric:
+        return {"resource": resource, "series": list_resource_series(db_path, resource)}
+    return query_resource_metric(
+        db_path,
+        resource=resource,
+        metric=metric,
+        team=team,
+        interval=interval,
+        start_ts=start_ts,
+        end_ts=end_ts,
+        limit=limit,
+    )
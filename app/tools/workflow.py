@@ -1,34 +1,90 @@
+from typing import List, Dict, Any, Optional
+from ..scoring import rank_candidates
 
-from typing import List, Dict, Any
-from ..schemas import TaskHistory
-from ..storage import get_user_performance
-
-def recommend_task_assignee(db_path: str, project_id: str, task_type: str, candidate_user_ids: List[str]) -> str:
+def recommend_task_assignee(db_path: str, project_id: str, task_type: str, candidate_user_ids: List[str]) -> Optional[str]:
     """
     Analyzes user history to recommend the best assignee for a task type.
-    Simple logic: Returns the user with the highest average success rating * (1 / average duration) for this task type.
-    """
-    best_score = -1
-    best_user = None
-
-    for user_id in candidate_user_ids:
-        history = get_user_performance(db_path, user_id)
-        relevant_tasks = [h for h in history if h['task_type'] == task_type]
-        
-        if not relevant_tasks:
-            # Default score for users with no history in this task
-            score = 0
-        else:
-            avg_rating = sum(h['success_rating'] for h in relevant_tasks) / len(relevant_tasks)
-            avg_duration = sum(h['duration_minutes'] for h in relevant_tasks) / len(relevant_tasks)
-            if avg_duration == 0: avg_duration = 1 # Avoid div by zero
-            
-            # Score formula: Rating (higher is better) / Duration (lower is better)
-            # Normalizing duration might be needed, but for now simple ratio
-            score = avg_rating / avg_duration
-
-        if score > best_score:
-            best_score = score
-            best_user = user_id
-            
-    return best_user if best_user else candidate_user_ids[0] # Default to first if all zero
+    Simple logic: Returns the user with the highest average success rating * (1 / average duration) for this task type,
+    or None when there are no candidates.
+    """
+    ranked = rank_candidates(db_path, task_type, candidate_user_ids, k=1)
+    return ranked[0]["user_id"] if ranked else None
+
+def recommend_task_assignees(db_path: str, project_id: str, task_type: str, candidate_user_ids: List[str], k: int = 5) -> List[Dict[str, Any]]:
+    """
+    Top-k ranked candidates with their scores (see app/scoring.py).
+    """
+    return rank_candidates(db_path, task_type, candidate_user_ids, k=k)
+
+def match_skills(
+    db_path: str,
+    task_type: str,
+    candidate_user_ids: Optional[List[str]] = None,
+    k: int = 10,
+    skills: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Top-k candidates (default: all users) by skill and history for a task type, with each part of
+    the score (see app/skills.py). skills weights several User.skills entries instead of the one
+    named like the task type.
+    """
+    from ..config import ASSIGNMENT_SKILL_WEIGHT
+    from ..skills import match_users
+
+    candidates = match_users(db_path, task_type, candidate_user_ids, k=k, skills=skills)
+    return {"task_type": task_type, "skill_weight": ASSIGNMENT_SKILL_WEIGHT, "candidates": candidates}
+
+def plan_milestone_assignments(
+    db_path: str,
+    project_id: str,
+    candidate_user_ids: Optional[List[str]] = None,
+    task_types: Optional[Dict[str, str]] = None,
+    default_task_type: Optional[str] = None,
+    capacity: Optional[int] = None,
+    apply: bool = False,
+) -> Dict[str, Any]:
+    """
+    Assigns all of a project's unassigned open milestones in one plan that maximizes total fit
+    (skills plus task history, see app/assignment.py) with at most `capacity` open milestones per
+    user, instead of sending every milestone to the same top scorer.
+    Milestones have no task type of their own: task_types maps milestone id -> task type, and
+    default_task_type covers the rest. With apply=True the plan is written in one transaction.
+    """
+    from ..assignment import plan
+    from ..skills import fit_matrix
+    from ..storage import assign_milestones, list_unassigned_milestones, list_user_ids, open_milestone_counts
+
+    task_types = task_types or {}
+    milestones = list_unassigned_milestones(db_path, project_id)
+    missing = [m["id"] for m in milestones if m["id"] not in task_types and not default_task_type]
+    if missing:
+        raise ValueError(f"no task type for milestones {missing[:10]}; pass task_types or default_task_type")
+
+    type_of = [task_types.get(m["id"], default_task_type) for m in milestones]
+    distinct = sorted(set(type_of))
+    type_index = {t: i for i, t in enumerate(distinct)}
+
+    user_ids, fit = fit_matrix(db_path, distinct, candidate_user_ids or list_user_ids(db_path))
+    fit = fit[[type_index[t] for t in type_of]]
+    open_counts = open_milestone_counts(db_path)
+    chosen = plan(fit, [open_counts.get(u, 0) for u in user_ids], capacity)
+
+    assignments, unassigned, load = [], [], {}
+    for m, task_type, row, col in zip(milestones, type_of, fit, chosen):
+        if col < 0:
+            unassigned.append(m["id"])
+            continue
+        user_id = user_ids[col]
+        load[user_id] = load.get(user_id, 0) + 1
+        assignments.append(
+            {"milestone_id": m["id"], "title": m["title"], "task_type": task_type, "user_id": user_id, "fit": round(float(row[col]), 4)}
+        )
+    applied = assign_milestones(db_path, {a["milestone_id"]: a["user_id"] for a in assignments}) if apply else 0
+    return {
+        "project_id": project_id,
+        "assignments": assignments,
+        "unassigned": unassigned,
+        "total_fit": round(sum(a["fit"] for a in assignments), 4),
+        "new_load": load,
+        "applied": applied,
+    }
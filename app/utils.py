@@ -2,11 +2,58 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 
 def utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _parse_iso(value: str) -> datetime:
+    if value[-1:] in ("Z", "z"):  # fromisoformat only takes Z from Python 3.11
+        value = value[:-1] + "+00:00"
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def normalize_timestamp(value: str) -> str:
+    """Canonical form of an ISO timestamp: UTC, microseconds, "+00:00"
+    (2025-01-31T09:30:00.000000+00:00). Fixed width, so string order is time
+    order. Naive values are taken as UTC; raises ValueError if unparseable."""
+    if not isinstance(value, str):
+        raise ValueError(f"invalid timestamp {value!r}")
+    try:
+        dt = _parse_iso(value)
+    except ValueError:
+        raise ValueError(f"invalid timestamp {value!r}") from None
+    return dt.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def timestamp_to_epoch_us(value: str) -> int:
+    """Integer microseconds since the epoch; raises ValueError like normalize_timestamp."""
+    try:
+        dt = _parse_iso(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid timestamp {value!r}") from None
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def epoch_us_to_timestamp(value: int) -> str:
+    return (_EPOCH + timedelta(microseconds=value)).isoformat(timespec="microseconds")
+
+
+def iso_to_epoch_seconds(value: str) -> Optional[float]:
+    """Parse an ISO timestamp to epoch seconds; naive values are taken as UTC."""
+    try:
+        return _parse_iso(value).timestamp()
+    except (TypeError, ValueError):
+        return None
 
 
 def new_id(prefix: str) -> str:
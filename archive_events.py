@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+
+# Ensure app module can be found
+sys.path.append(os.getcwd())
+
+from app.storage import init_db, apply_event_retention, list_event_partitions
+from app.config import DB_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seal old event months into partitions and archive expired ones.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--today", help="ISO date to apply the policy as of (default: now)")
+    parser.add_argument("--list", action="store_true", help="only list partitions")
+    args = parser.parse_args()
+
+    init_db(args.db)
+
+    if not args.list:
+        try:
+            result = apply_event_retention(args.db, args.today)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        for month, moved in result["sealed"].items():
+            print(f"Sealed {month}: {moved} rows moved.")
+        for month in result["archived"]:
+            print(f"Archived {month}.")
+        for month, moved in result["late_archived"].items():
+            print(f"Added {moved} late rows to the {month} archive.")
+
+    for p in list_event_partitions(args.db):
+        print(f"{p['month']}  {p['state']:<8}  {p['rows']:>10}  {p['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Batch milestone assignment at scale: optimal plan vs one greedy call per milestone.
+
+    python benchmarks/bench_assignment.py --milestones 1000 --users 1000
+
+Builds a throwaway database with --users users (random skills over
+--task-types task types), task history for them and one project with
+--milestones unassigned milestones. "greedy" replays the old pattern: each
+milestone goes to the top recommend_task_assignees candidate by fit;
+"greedy_capped" does the same but skips users already holding the even-spread
+capacity; "optimal" is plan_milestone_assignments with that capacity. Reports
+wall time, total fit and the heaviest per-user load of each, plus solver-only
+time on random matrices.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from app.assignment import solve_assignment
+from app.db import close_all
+from app.schemas import Milestone, Project, TaskHistory, User
+from app.skills import fit_matrix
+from app.storage import add_user, create_milestone, create_project, init_db, log_task_history_bulk
+from app.tools.workflow import plan_milestone_assignments
+from app.utils import utc_now_iso
+
+
+def build(db_path, n_milestones, n_users, n_types, history_per_user, seed):
+    rng = random.Random(seed)
+    types = [f"type-{t}" for t in range(n_types)]
+    init_db(db_path)
+    for u in range(n_users):
+        skills = {t: round(rng.random(), 3) for t in rng.sample(types, min(3, n_types))}
+        add_user(db_path, User(id=f"u{u}", name=f"User {u}", skills=skills))
+    history = [
+        TaskHistory(
+            id=f"h{u}-{k}",
+            user_id=f"u{u}",
+            task_type=rng.choice(types),
+            duration_minutes=rng.randint(15, 240),
+            success_rating=rng.randint(1, 5),
+            timestamp=utc_now_iso(),
+        )
+        for u in range(n_users)
+        for k in range(history_per_user)
+    ]
+    log_task_history_bulk(db_path, history, 5000)
+    create_project(db_path, Project(id="p1", name="Bench", deadline="2030-01-01", created_at=utc_now_iso()))
+    task_types = {}
+    for m in range(n_milestones):
+        create_milestone(db_path, Milestone(id=f"m{m}", project_id="p1", title=f"Milestone {m}"))
+        task_types[f"m{m}"] = rng.choice(types)
+    return types, task_types
+
+
+def greedy(db_path, task_types, user_ids):
+    # One independent "best candidate" decision per milestone, as with
+    # repeated recommend_task_assignee calls.
+    distinct = sorted(set(task_types.values()))
+    _, fit = fit_matrix(db_path, distinct, user_ids)
+    best = {t: int(fit[i].argmax()) for i, t in enumerate(distinct)}
+    load, total = {}, 0.0
+    for task_type in task_types.values():
+        col = best[task_type]
+        total += fit[distinct.index(task_type), col]
+        load[col] = load.get(col, 0) + 1
+    return total, max(load.values())
+
+
+def greedy_capped(db_path, task_types, user_ids, capacity):
+    # Same per-milestone greedy, but skipping users already at capacity.
+    distinct = sorted(set(task_types.values()))
+    _, fit = fit_matrix(db_path, distinct, user_ids)
+    left = np.full(len(user_ids), capacity)
+    total = 0.0
+    for task_type in task_types.values():
+        row = np.where(left > 0, fit[distinct.index(task_type)], -np.inf)
+        col = int(row.argmax())
+        total += row[col]
+        left[col] -= 1
+    return total
+
+
+def solver_only(n_rows, n_users, capacity, seed):
+    fit = np.random.default_rng(seed).random((n_rows, n_users))
+    start = time.perf_counter()
+    solve_assignment(fit, [capacity] * n_users)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--milestones", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--task-types", type=int, default=20)
+    parser.add_argument("--history-per-user", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    results = {"milestones": args.milestones, "users": args.users, "task_types": args.task_types}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        _, task_types = build(db_path, args.milestones, args.users, args.task_types, args.history_per_user, args.seed)
+        user_ids = [f"u{u}" for u in range(args.users)]
+
+        start = time.perf_counter()
+        total, max_load = greedy(db_path, task_types, user_ids)
+        results["greedy"] = {"seconds": round(time.perf_counter() - start, 3), "total_fit": round(total, 2), "max_load": max_load}
+
+        capacity = -(-args.milestones // args.users)
+        start = time.perf_counter()
+        total = greedy_capped(db_path, task_types, user_ids, capacity)
+        results["greedy_capped"] = {"seconds": round(time.perf_counter() - start, 3), "total_fit": round(total, 2), "max_load": capacity}
+
+        start = time.perf_counter()
+        planned = plan_milestone_assignments(db_path, "p1", user_ids, task_types)
+        elapsed = time.perf_counter() - start
+        loads = planned["new_load"].values()
+        results["optimal"] = {
+            "seconds": round(elapsed, 3),
+            "total_fit": round(planned["total_fit"], 2),
+            "max_load": max(loads) if loads else 0,
+            "unassigned": len(planned["unassigned"]),
+        }
+        close_all()
+
+    for capacity in (1, 3):
+        results[f"solver_random_capacity_{capacity}_seconds"] = round(
+            solver_only(args.milestones, args.users, capacity, args.seed), 3
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Ops/sec of the storage layer with per-call connections vs the pooled layer.
+
+    python benchmarks/bench_connections.py --ops 2000
+
+"Before" replays the original storage pattern (open, one statement, commit,
+close with SQLite defaults); "after" calls the real app.storage functions,
+which go through app.db's pooled, WAL-tuned connections.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+from app.db import close_all
+from app.schemas import Event
+from app.storage import init_db, insert_event, query_events, get_project_details
+from app.utils import new_id, utc_now_iso
+
+
+def _legacy_connect(db_path):
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def legacy_insert_event(db_path, event):
+    conn = _legacy_connect(db_path)
+    conn.execute(
+        "INSERT INTO events (id, type, team, severity, timestamp, payload_json) VALUES (?, ?, ?, ?, ?, ?)",
+        (event.id, event.type, event.team, event.severity, event.timestamp, json.dumps(event.payload)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_query_events(db_path, team):
+    conn = _legacy_connect(db_path)
+    rows = conn.execute(
+        "SELECT * FROM events WHERE team = ? ORDER BY timestamp DESC LIMIT 50", (team,)
+    ).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
+def legacy_get_project_details(db_path):
+    conn = _legacy_connect(db_path)
+    out = {
+        "projects": [dict(r) for r in conn.execute("SELECT * FROM projects").fetchall()],
+        "users": [dict(r) for r in conn.execute("SELECT * FROM users").fetchall()],
+        "milestones": [dict(r) for r in conn.execute("SELECT * FROM milestones").fetchall()],
+    }
+    conn.close()
+    return out
+
+
+def _event():
+    return Event(
+        id=new_id("evt"),
+        type="pr_merged",
+        team="Payments",
+        severity="P2",
+        timestamp=utc_now_iso(),
+        payload={"repo": "ledger"},
+    )
+
+
+def _ops_per_sec(fn, ops):
+    start = time.perf_counter()
+    for _ in range(ops):
+        fn()
+    return ops / (time.perf_counter() - start)
+
+
+def run(ops):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = os.path.join(tmp, "legacy.db")
+        pooled_db = os.path.join(tmp, "pooled.db")
+        init_db(legacy_db)
+        init_db(pooled_db)
+        # init_db switches the file to WAL; put the legacy file back to the
+        # rollback journal it would have had before.
+        close_all()
+        conn = sqlite3.connect(legacy_db)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+
+        cases = [
+            ("insert_event",
+             lambda: legacy_insert_event(legacy_db, _event()),
+             lambda: insert_event(pooled_db, _event())),
+            ("query_events",
+             lambda: legacy_query_events(legacy_db, "Payments"),
+             lambda: query_events(pooled_db, team="Payments", limit=50)),
+            ("get_project_details",
+             lambda: legacy_get_project_details(legacy_db),
+             lambda: get_project_details(pooled_db)),
+        ]
+        for name, before, after in cases:
+            results[name] = {
+                "before_ops_per_sec": round(_ops_per_sec(before, ops), 1),
+                "after_ops_per_sec": round(_ops_per_sec(after, ops), 1),
+            }
+        close_all()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.ops), indent=2))
@@ -0,0 +1,121 @@
+"""Bytes on disk and list_events latency per payload encoding and read mode.
+
+    python benchmarks/bench_event_payloads.py --events 1000000
+
+For each EVENT_PAYLOAD_ENCODING a fresh database is filled in a subprocess
+(the encoding is read from the environment at import), then list_events is
+timed with full payload decoding, undecoded payload text, and no payload.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+WORDS = ("ledger settlement retry timeout upstream queue refund card issuer webhook "
+         "deploy rollback latency spike customer merchant payout batch reconcile alert").split()
+TEAMS = ["Payments", "Risk", "Platform", "Growth", "Support"]
+TYPES = ["jira_issue_updated", "pr_merged", "customer_escalation", "deploy", "incident"]
+
+
+def _payload(rng):
+    return {
+        "service": rng.choice(WORDS),
+        "summary": " ".join(rng.choice(WORDS) for _ in range(20)),
+        "labels": rng.sample(WORDS, 4),
+        "url": f"https://tracker.example.com/browse/PAY-{rng.randrange(100000)}",
+        "author": f"user{rng.randrange(500)}@example.com",
+        "details": {"attempts": rng.randrange(10), "region": rng.choice(["us-east", "eu-west", "ap-south"]),
+                    "notes": " ".join(rng.choice(WORDS) for _ in range(15))},
+    }
+
+
+def build(db_path, events, seed):
+    from app.db import close_all
+    from app.schemas import Event
+    from app.storage import init_db, insert_events_bulk
+
+    rng = random.Random(seed)
+    init_db(db_path)
+    batch = []
+    for i in range(events):
+        batch.append(Event(
+            id=f"evt_{i:08d}", type=rng.choice(TYPES), team=rng.choice(TEAMS),
+            severity=rng.choice(["P0", "P1", "P2", "P3"]),
+            timestamp=f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00+00:00",
+            payload=_payload(rng),
+        ))
+        if len(batch) == 50000:
+            insert_events_bulk(db_path, batch, 50000)
+            batch = []
+    if batch:
+        insert_events_bulk(db_path, batch, 50000)
+    close_all()
+
+
+def measure(db_path, reps):
+    import sqlite3
+
+    from app.storage import query_events
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    payload_bytes = conn.execute("SELECT SUM(length(payload_json)) FROM events").fetchone()[0]
+    conn.close()
+
+    modes = {
+        "decoded": {},
+        "payload_text": {"decode": False},
+        "no_payload": {"fields": ["type", "team", "severity"]},
+    }
+    latency = {}
+    for limit in (50, 500):
+        for name, kwargs in modes.items():
+            query_events(db_path, team="Payments", limit=limit, **kwargs)  # warm up
+            start = time.perf_counter()
+            for _ in range(reps):
+                query_events(db_path, team="Payments", limit=limit, **kwargs)
+            latency[f"limit_{limit}_{name}_ms"] = round((time.perf_counter() - start) / reps * 1000, 3)
+    return {
+        "file_bytes": os.path.getsize(db_path),
+        "payload_bytes": payload_bytes,
+        **latency,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--reps", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        build(args.worker, args.events, args.seed)
+        print(json.dumps(measure(args.worker, args.reps)))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for encoding in ("json", "zlib"):
+            db_path = os.path.join(tmp, f"{encoding}.db")
+            env = dict(os.environ, EVENT_PAYLOAD_ENCODING=encoding)
+            out = subprocess.run(
+                [sys.executable, __file__, "--worker", db_path, "--events", str(args.events),
+                 "--reps", str(args.reps), "--seed", str(args.seed)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            results[encoding] = json.loads(out)
+            os.remove(db_path)
+    print(json.dumps({"events": args.events, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
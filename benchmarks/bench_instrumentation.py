@@ -0,0 +1,95 @@
+"""Per-call cost of the metrics layer: the same storage calls with
+METRICS_ENABLED off and on.
+
+    python benchmarks/bench_instrumentation.py --ops 5000
+
+The setting is read at import time, so each mode runs in its own child
+process against a copy of the same seeded database. Reports microseconds per
+call for a point write, a keyset event page and the full dashboard dump.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+
+def run(db_path, ops):
+    from app.db import close_all
+    from app.schemas import Event
+    from app.storage import get_project_details, insert_event, query_events_page
+    from app.utils import new_id, utc_now_iso
+
+    def write():
+        insert_event(db_path, Event(id=new_id("evt"), type="deploy", team="core", severity="P3", timestamp=utc_now_iso(), payload={}))
+
+    calls = {
+        "insert_event": write,
+        "query_events_page": lambda: query_events_page(db_path, team="core", limit=50),
+        "get_project_details": lambda: get_project_details(db_path),
+    }
+    out = {}
+    for name, call in calls.items():
+        call()
+        start = time.perf_counter()
+        for _ in range(ops):
+            call()
+        out[name] = round((time.perf_counter() - start) / ops * 1e6, 2)
+    close_all()
+    return out
+
+
+def seed(db_path):
+    from app.db import close_all
+    from app.schemas import Event, Milestone, Project, User
+    from app.storage import add_user, create_milestone, create_project, init_db, insert_events
+    from app.utils import new_id, utc_now_iso
+
+    init_db(db_path)
+    insert_events(db_path, [
+        Event(id=new_id("evt"), type="deploy", team="core", severity="P3", timestamp=utc_now_iso(), payload={"n": i})
+        for i in range(5000)
+    ])
+    for u in range(50):
+        add_user(db_path, User(id=f"u{u}", name=f"User {u}"))
+    for p in range(20):
+        create_project(db_path, Project(id=f"p{p}", name=f"Project {p}", deadline="2030-01-01", created_at=utc_now_iso()))
+        for m in range(10):
+            create_milestone(db_path, Milestone(id=f"p{p}-m{m}", project_id=f"p{p}", title=f"Milestone {m}"))
+    close_all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=5000)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run(args.child, args.ops)))
+        return
+
+    results = {"ops": args.ops}
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.db")
+        seed(template)
+        for enabled in ("false", "true"):
+            db_path = os.path.join(tmp, f"metrics-{enabled}.db")
+            with open(template, "rb") as src, open(db_path, "wb") as dst:
+                dst.write(src.read())
+            env = dict(os.environ, METRICS_ENABLED=enabled)
+            child = subprocess.run(
+                [sys.executable, __file__, "--ops", str(args.ops), "--child", db_path],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            results[f"metrics_{'on' if enabled == 'true' else 'off'}_us_per_call"] = json.loads(child.stdout)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
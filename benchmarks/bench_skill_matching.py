@@ -0,0 +1,126 @@
+"""Skill matching: vectorized ranking vs the per-user loop.
+
+    python benchmarks/bench_skill_matching.py --users 5000 --skills 50
+
+Builds a throwaway database of --users users with random User.skills and
+task history, then ranks every user for one task type with:
+
+- "loop": recommend_task_assignees (app/scoring.py, one Python step per
+  candidate, history only);
+- "loop_with_skills": the same loop also reading each user's skills_json,
+  i.e. what blending skills in without a matrix would cost;
+- "vectorized": app.skills.match_users on the cached skill matrix.
+
+Also reports the one-off matrix build and the cost of catching up after one
+add_user.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+from app.config import ASSIGNMENT_SKILL_WEIGHT
+from app.db import close_all, connection
+from app.schemas import TaskHistory, User
+from app.scoring import score, task_type_stats
+from app.skills import clear_cache, match_users
+from app.storage import add_user, init_db, list_user_ids, log_task_history_bulk
+from app.tools.workflow import recommend_task_assignees
+from app.utils import utc_now_iso
+
+
+def build(db_path, n_users, n_skills, history_per_user, seed):
+    rng = random.Random(seed)
+    skills = [f"skill-{s}" for s in range(n_skills)]
+    init_db(db_path)
+    with connection(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, name, role, skills_json) VALUES (?, ?, 'member', ?)",
+            [
+                (f"u{u}", f"User {u}", json.dumps({s: round(rng.random(), 3) for s in rng.sample(skills, min(8, n_skills))}))
+                for u in range(n_users)
+            ],
+        )
+        conn.commit()
+    history = [
+        TaskHistory(
+            id=f"h{u}-{k}",
+            user_id=f"u{u}",
+            task_type=rng.choice(skills[:5]),
+            duration_minutes=rng.randint(15, 240),
+            success_rating=rng.randint(1, 5),
+            timestamp=utc_now_iso(),
+        )
+        for u in range(n_users)
+        for k in range(history_per_user)
+    ]
+    log_task_history_bulk(db_path, history, 5000)
+    return skills
+
+
+def loop_with_skills(db_path, task_type, candidates, k):
+    stats = task_type_stats(db_path, task_type)
+    ranked = []
+    with connection(db_path) as conn:
+        for user_id in candidates:
+            row = conn.execute("SELECT skills_json FROM users WHERE id = ?", (user_id,)).fetchone()
+            skill = json.loads(row["skills_json"]).get(task_type, 0.0) if row else 0.0
+            ranked.append((user_id, skill, score(stats.get(user_id))))
+    best = max((h for _, _, h in ranked), default=0) or 1
+    ranked = [(u, ASSIGNMENT_SKILL_WEIGHT * s + (1 - ASSIGNMENT_SKILL_WEIGHT) * h / best) for u, s, h in ranked]
+    ranked.sort(key=lambda c: c[1], reverse=True)
+    return ranked[:k]
+
+
+def timed(fn, repeat):
+    fn()  # warm caches
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return round((time.perf_counter() - start) / repeat * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--skills", type=int, default=50)
+    parser.add_argument("--history-per-user", type=int, default=5)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    results = {"users": args.users, "skills": args.skills, "k": args.k}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        skills = build(db_path, args.users, args.skills, args.history_per_user, args.seed)
+        task_type = skills[0]
+        candidates = list_user_ids(db_path)
+
+        clear_cache()
+        start = time.perf_counter()
+        match_users(db_path, task_type, k=args.k)
+        results["matrix_build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+        results["loop_ms"] = timed(lambda: recommend_task_assignees(db_path, "p", task_type, candidates, k=args.k), args.repeat)
+        results["loop_with_skills_ms"] = timed(lambda: loop_with_skills(db_path, task_type, candidates, args.k), args.repeat)
+        results["vectorized_ms"] = timed(lambda: match_users(db_path, task_type, candidates, k=args.k), args.repeat)
+        results["vectorized_all_users_ms"] = timed(lambda: match_users(db_path, task_type, k=args.k), args.repeat)
+
+        add_user(db_path, User(id="new-user", name="New", skills={task_type: 1.0}))
+        start = time.perf_counter()
+        match_users(db_path, task_type, k=args.k)
+        results["after_add_user_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        results["new_user_matched"] = bool(match_users(db_path, task_type, ["new-user"]))
+        close_all()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
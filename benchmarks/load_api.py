@@ -0,0 +1,140 @@
+"""Mixed read/write load test for the FastAPI server, reporting p50/p99 per route.
+
+    python benchmarks/load_api.py --requests 3000 --concurrency 64
+
+Seeds a temporary database, starts `uvicorn app.api_server:app` on it in a
+subprocess and fires a fixed, seeded mix of dashboard, recommendation and
+write requests. Run it on two commits to compare.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.append(os.getcwd())
+
+from app.db import close_all
+from app.schemas import Milestone, Project, TaskHistory, User
+from app.storage import create_milestone, create_project, init_db, log_task_history_bulk, add_user
+
+TASK_TYPES = ["coding", "writing", "analytics", "design"]
+
+# (weight, label, method, path factory, json body factory)
+MIX = [
+    (30, "GET /dashboard", "GET", lambda r, i: "/dashboard", None),
+    (30, "GET /dashboard?limit=5", "GET", lambda r, i: "/dashboard?limit=5", None),
+    (15, "GET /recommend", "GET", lambda r, i: f"/recommend/p0/{r.choice(TASK_TYPES)}", None),
+    (15, "POST /history", "POST", lambda r, i: "/history", lambda r, i: {
+        "id": f"load-h{i}", "user_id": f"u{r.randrange(200)}", "task_type": r.choice(TASK_TYPES),
+        "duration_minutes": r.randint(10, 120), "success_rating": r.randint(1, 5),
+        "timestamp": "2025-06-01T00:00:00+00:00",
+    }),
+    (10, "POST /milestones/complete", "POST", lambda r, i: f"/milestones/m{r.randrange(1000)}/complete", None),
+]
+
+
+def seed(db_path, rng):
+    init_db(db_path)
+    for p in range(50):
+        create_project(db_path, Project(id=f"p{p}", name=f"Project {p}", deadline="2026-01-01",
+                                        created_at=f"2025-01-01T00:00:{p:02d}"))
+    for m in range(1000):
+        create_milestone(db_path, Milestone(id=f"m{m}", project_id=f"p{m % 50}", title=f"Milestone {m}",
+                                            due_date="2025-06-01"))
+    for u in range(200):
+        add_user(db_path, User(id=f"u{u}", name=f"User {u}", skills={t: rng.random() for t in TASK_TYPES}))
+    log_task_history_bulk(db_path, [
+        TaskHistory(id=f"h{i}", user_id=f"u{rng.randrange(200)}", task_type=rng.choice(TASK_TYPES),
+                    duration_minutes=rng.randint(10, 120), success_rating=rng.randint(1, 5),
+                    timestamp="2025-01-01T00:00:00+00:00")
+        for i in range(5000)
+    ], 1000)
+    close_all()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+async def fire(base_url, total, concurrency, rng):
+    weights = [m[0] for m in MIX]
+    plan = [rng.choices(MIX, weights)[0] for _ in range(total)]
+    latencies = {m[1]: [] for m in MIX}
+    errors = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        async def one(i, entry):
+            nonlocal errors
+            _, label, method, path, body = entry
+            async with sem:
+                start = time.perf_counter()
+                resp = await client.request(method, path(rng, i), json=body(rng, i) if body else None)
+                latencies[label].append((time.perf_counter() - start) * 1000)
+                if resp.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i, e) for i, e in enumerate(plan)))
+        elapsed = time.perf_counter() - start
+
+    report = {
+        label: {"n": len(v), "p50_ms": round(_percentile(v, 50), 2), "p99_ms": round(_percentile(v, 99), 2)}
+        for label, v in latencies.items() if v
+    }
+    everything = [x for v in latencies.values() for x in v]
+    report["ALL"] = {"n": len(everything), "p50_ms": round(_percentile(everything, 50), 2),
+                     "p99_ms": round(_percentile(everything, 99), 2),
+                     "req_per_sec": round(total / elapsed, 1), "errors": errors}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "load.db")
+        seed(db_path, rng)
+        port = _free_port()
+        env = dict(os.environ, DB_PATH=db_path)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.api_server:app", "--port", str(port), "--log-level", "warning"],
+            env=env,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            for _ in range(100):
+                try:
+                    httpx.get(base_url + "/changes?since=0&limit=1")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+            print(json.dumps(asyncio.run(fire(base_url, args.requests, args.concurrency, rng)), indent=2))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
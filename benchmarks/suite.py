@@ -0,0 +1,367 @@
+"""Benchmark suite over synthetic data, with JSON results to compare commits.
+
+    python -m benchmarks.suite --scale small --out before.json
+    git checkout <other commit>
+    python -m benchmarks.suite --scale small --out after.json --compare before.json
+
+or, keeping this suite and timing another commit's app from a worktree:
+
+    git worktree add /tmp/old <other commit>
+    python -m benchmarks.suite --scale small --app /tmp/old --out before.json
+
+Generates a database with benchmarks/synthetic.py, or reuses --template when it
+was generated with the same counts and seed. Each run works on a fresh copy,
+so the write benchmarks never change the template. Then it times these
+operations one call at a time:
+- insert_event;
+- query_events with a range of filter combinations, and a second keyset page;
+- get_project_details;
+- recommend_task_assignee over all users, with a warm and a cold cache;
+- resource metric writes and hourly rollup reads;
+- update_resource_state, and get_resource_state / get_resource_states with a
+  warm and a cold cache.
+
+A benchmark whose function or parameter the app under test does not have is
+skipped and listed under meta.skipped. "Cold" clears the app's cache before
+each call where there is one. Each benchmark draws its arguments from its own
+RNG, seeded from --seed and its name, so two runs issue the same calls even
+when one of them skips some benchmarks. The output has p50/p95/p99/mean
+microseconds and ops/s for each benchmark, each the best of --rounds passes,
+plus the commit, Python and SQLite versions. With --compare, each
+p50 is listed next to the older run's, and a slowdown beyond --threshold
+counts as a regression. Add --fail-on-regression to exit 1 when any is found.
+"""
+
+import argparse
+import inspect
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.synthetic import ANCHOR, add_arguments, app_function, counts_from, generate
+
+# Resource ids the resource state benchmarks write and read.
+RESOURCE_IDS = [f"res-{r:04d}" for r in range(1000)]
+
+
+def measure(call, ops, rounds):
+    """Time `ops` calls of call(i) one by one, `rounds` times, after a tenth
+    as many untimed calls that warm SQLite's page cache and the app's caches.
+    Each figure is the best round's: noise on a shared machine only ever
+    adds time, so the minimum is the most repeatable estimate."""
+    for i in range(max(3, ops // 10)):
+        call(-1 - i)
+    best = None
+    for _ in range(rounds):
+        samples = []
+        for i in range(ops):
+            start = time.perf_counter()
+            call(i)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        total = sum(samples)
+
+        def pct(q):
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1e6, 1)
+
+        stats = {
+            "ops": ops,
+            "ops_per_s": round(ops / total, 1) if total else None,
+            "mean_us": round(total / ops * 1e6, 1),
+            "p50_us": pct(0.5),
+            "p95_us": pct(0.95),
+            "p99_us": pct(0.99),
+        }
+        best = stats if best is None else {
+            k: max(best[k], v) if k == "ops_per_s" else min(best[k], v) for k, v in stats.items()
+        }
+    return best
+
+
+def event_filters(info):
+    """query_events keyword arguments by name, each drawn fresh per call from
+    the rng passed in."""
+    teams, types, severities = info["teams"], info["event_types"], info["severities"]
+
+    def window(rng, days):
+        end = ANCHOR - timedelta(days=rng.uniform(0, info["days"] - days))
+        return {"start_ts": (end - timedelta(days=days)).isoformat(), "end_ts": end.isoformat()}
+
+    return {
+        "none": lambda rng: {},
+        "team": lambda rng: {"team": rng.choice(teams)},
+        "type": lambda rng: {"event_type": rng.choice(types)},
+        "severity": lambda rng: {"severity": rng.choice(severities)},
+        "team_type": lambda rng: {"team": rng.choice(teams), "event_type": rng.choice(types)},
+        "team_severity": lambda rng: {"team": rng.choice(teams), "severity": rng.choice(severities)},
+        "time_1d": lambda rng: window(rng, 1),
+        "team_time_7d": lambda rng: {"team": rng.choice(teams), **window(rng, 7)},
+        "severity_time_30d": lambda rng: {"severity": rng.choice(severities[1:]), **window(rng, 30)},
+        "payload_eq": lambda rng: {"payload_filter": {"service": rng.choice(["api", "db", "auth"])}},
+        "team_payload_range": lambda rng: {"team": rng.choice(teams), "payload_filter": {"latency_ms": {"gte": 500}}},
+    }
+
+
+def accepts(func, parameter):
+    return func is not None and parameter in inspect.signature(func).parameters
+
+
+def run(db_path, info, ops, rounds, seed):
+    """Results by benchmark name, and the skipped benchmarks with what the
+    app under test is missing for each."""
+    results, skipped = {}, {}
+
+    def bench(name, needs, make_call, n=ops):
+        # needs maps a label to the function (None when missing) or to
+        # whether a parameter exists; make_call(rng) returns call(i).
+        missing = [label for label, have in needs.items() if have is None or have is False]
+        if missing:
+            skipped[name] = missing
+            return
+        results[name] = measure(make_call(random.Random(f"{seed}:{name}")), n, rounds)
+
+    user_ids = info["user_ids"]
+    task_types = info["task_types"]
+    project_ids = info["project_ids"]
+    Event = app_function("app.schemas", "Event")
+    query_events = app_function("app.storage", "query_events")
+    query_events_page = app_function("app.storage", "query_events_page")
+    get_project_details = app_function("app.storage", "get_project_details")
+    insert_event = app_function("app.storage", "insert_event")
+    recommend_task_assignee = app_function("app.tools.workflow", "recommend_task_assignee")
+    clear_scoring_cache = app_function("app.scoring", "clear_cache")
+    log_resource_metric = app_function("app.tools.metrics", "log_resource_metric")
+    query_resource_metrics = app_function("app.tools.metrics", "query_resource_metrics")
+    update_resource_state = app_function("tools.resources", "update_resource_state")
+    get_resource_state = app_function("tools.resources", "get_resource_state")
+    get_resource_states = app_function("tools.resources", "get_resource_states")
+    clear_resource_cache = app_function("tools.resources", "clear_cache")
+
+    # Reads first, on the data exactly as generated.
+    for name, make in event_filters(info).items():
+        needs = {"query_events": query_events}
+        for parameter in make(random.Random(0)):
+            needs[f"query_events({parameter})"] = accepts(query_events, parameter)
+        bench(f"query_events.{name}", needs,
+              lambda rng, make=make: lambda i: query_events(db_path, limit=50, **make(rng)))
+
+    def second_page(rng):
+        def call(i):
+            team = rng.choice(info["teams"])
+            page = query_events_page(db_path, team=team, limit=50)
+            if page["next_cursor"]:
+                query_events(db_path, team=team, limit=50, cursor=page["next_cursor"])
+        return call
+    bench("query_events.first_and_second_page", {"query_events_page": query_events_page}, second_page)
+
+    bench("get_project_details", {"get_project_details": get_project_details},
+          lambda rng: lambda i: get_project_details(db_path), max(10, ops // 10))
+
+    def recommend(rng, clear=None):
+        def call(i):
+            if clear is not None:
+                clear()
+            recommend_task_assignee(db_path, rng.choice(project_ids), rng.choice(task_types), user_ids)
+        return call
+    bench("recommend_task_assignee.warm", {"recommend_task_assignee": recommend_task_assignee}, recommend)
+    bench("recommend_task_assignee.cold", {"recommend_task_assignee": recommend_task_assignee},
+          lambda rng: recommend(rng, clear_scoring_cache), max(10, ops // 10))
+
+    # Writes. Numbered by a counter rather than i, which repeats every round.
+    written = itertools.count()
+
+    def write_event(rng):
+        return lambda i: insert_event(db_path, Event(
+            id=f"bench-evt-{next(written)}", type=rng.choice(info["event_types"]), team=rng.choice(info["teams"]),
+            severity=rng.choice(info["severities"]), timestamp=ANCHOR.isoformat(),
+            payload={"service": "api", "latency_ms": 100.0},
+        ))
+    bench("insert_event", {"insert_event": insert_event}, write_event)
+
+    resources = [("SupportQueue", "tickets", "tickets"), ("CloudSpend", "dollars", "USD"), ("OncallLoad", "available_hours", "hours")]
+
+    def write_metric(rng):
+        def call(i):
+            n = next(written)
+            resource, metric, unit = resources[n % len(resources)]
+            # One sample a minute per series, going back from ANCHOR.
+            ts = (ANCHOR - timedelta(minutes=n // len(resources) + 1)).isoformat()
+            log_resource_metric(db_path, resource, metric, rng.uniform(0, 100), unit, team=rng.choice(info["teams"][:3]), timestamp=ts)
+        return call
+    bench("log_resource_metric", {"log_resource_metric": log_resource_metric}, write_metric)
+
+    def read_rollup(rng):
+        def call(i):
+            resource, metric, _ = rng.choice(resources)
+            query_resource_metrics(db_path, resource, metric, interval="hour")
+        return call
+    bench("query_resource_metrics.hour", {"query_resource_metrics": query_resource_metrics}, read_rollup)
+
+    def update_state(rng):
+        def call(i):
+            update_resource_state(
+                db_path, RESOURCE_IDS[next(written) % len(RESOURCE_IDS)],
+                status=rng.choice(["available", "busy", "degraded"]), capacity=round(rng.uniform(0, 100), 1),
+                team=rng.choice(info["teams"]), metadata={"queue": rng.randint(0, 500)},
+            )
+        return call
+    bench("update_resource_state", {"update_resource_state": update_resource_state}, update_state)
+
+    # The reads look up resources that exist, whatever the update benchmark
+    # got round to, and "cached" starts with every one of them in the cache.
+    if update_resource_state is not None:
+        for id in RESOURCE_IDS:
+            update_resource_state(db_path, id, status="available", capacity=50.0)
+
+    def read_state(rng, clear=None):
+        if clear is None:
+            for id in RESOURCE_IDS:
+                get_resource_state(db_path, id)
+
+        def call(i):
+            if clear is not None:
+                clear()
+            get_resource_state(db_path, rng.choice(RESOURCE_IDS))
+        return call
+    state_needs = {"update_resource_state": update_resource_state, "get_resource_state": get_resource_state}
+    bench("get_resource_state.cached", state_needs, read_state)
+    bench("get_resource_state.cold", state_needs, lambda rng: read_state(rng, clear_resource_cache or (lambda: None)))
+
+    def read_states(rng, clear=None):
+        if clear is None:
+            get_resource_states(db_path, RESOURCE_IDS)
+
+        def call(i):
+            if clear is not None:
+                clear()
+            get_resource_states(db_path, rng.sample(RESOURCE_IDS, 50))
+        return call
+    states_needs = {"update_resource_state": update_resource_state, "get_resource_states": get_resource_states}
+    bench("get_resource_states.cached", states_needs, read_states)
+    bench("get_resource_states.cold", states_needs, lambda rng: read_states(rng, clear_resource_cache or (lambda: None)))
+    return results, skipped
+
+
+def git_commit(path="."):
+    try:
+        commit = subprocess.run(["git", "-C", path, "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "-C", path, "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def prepare_template(path, counts, seed, days):
+    """Generate path unless it exists with the same parameters (recorded in
+    path + ".json"); returns the generator's info."""
+    meta_path = path + ".json"
+    wanted = {"counts": counts, "seed": seed, "days": days}
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            info = json.load(f)
+        if {k: info[k] for k in wanted} == wanted:
+            return info
+    for suffix in ("", "-wal", "-shm", ".json"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    info = generate(path, seed=seed, days=days, **counts)
+    with open(meta_path, "w") as f:
+        json.dump(info, f)
+    return info
+
+
+def compare(results, baseline, threshold):
+    """Print p50 against the baseline run; returns the regressed benchmark names."""
+    regressions = []
+    print(f"{'benchmark':44} {'base p50':>10} {'p50':>10} {'ratio':>7}", file=sys.stderr)
+    for name, now in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            print(f"{name:44} {'-':>10} {now['p50_us']:>10} {'new':>7}", file=sys.stderr)
+            continue
+        ratio = now["p50_us"] / before["p50_us"] if before["p50_us"] else float("inf")
+        flag = ""
+        if ratio > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:44} {before['p50_us']:>10} {now['p50_us']:>10} {ratio:>7.2f}{flag}", file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    parser.add_argument("--ops", type=int, default=500, help="timed calls per benchmark")
+    parser.add_argument("--rounds", type=int, default=3, help="timed passes per benchmark; the best is kept")
+    parser.add_argument("--template", help="generated database to reuse between runs")
+    parser.add_argument("--out", help="write the JSON results here as well as to stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.5, help="p50 ratio counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--app", help="checkout whose app to time instead of the one next to this suite")
+    args = parser.parse_args()
+    counts = counts_from(args)
+    if args.app:
+        # Ahead of the current directory, which `python -m` puts first.
+        sys.path.insert(0, os.path.abspath(args.app))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = args.template or os.path.join(tmp, "template.db")
+        start = time.perf_counter()
+        info = prepare_template(template, counts, args.seed, args.days)
+        prepare_seconds = time.perf_counter() - start
+        db_path = os.path.join(tmp, "bench.db")
+        shutil.copyfile(template, db_path)
+        try:
+            results, skipped = run(db_path, info, args.ops, args.rounds, args.seed)
+        finally:
+            close_all = app_function("app.db", "close_all")
+            if close_all is not None:
+                close_all()
+
+    report = {
+        "meta": {
+            "commit": git_commit(args.app or "."),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "counts": counts,
+            "seed": args.seed,
+            "days": args.days,
+            "ops": args.ops,
+            "rounds": args.rounds,
+            "generate_seconds": info["seconds"],
+            "prepare_seconds": round(prepare_seconds, 2),
+            "skipped": skipped,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("counts") != counts:
+            print("warning: the baseline was run on different data sizes", file=sys.stderr)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Reproducible synthetic workload data at realistic sizes.
+
+    python -m benchmarks.synthetic --db bench.db --scale medium
+    python -m benchmarks.synthetic --db bench.db --events 1000000 --users 5000
+
+Fills a database through app.storage.bulk_load with projects, users,
+milestones, task history and events, or through the per-row storage
+functions on commits that predate bulk_load. The same seed and counts always produce the same
+rows (ids and timestamps included), so numbers measured on them can be
+compared between commits. Activity is skewed the way real teams are: a few
+users log most of the history, a few teams and event types dominate the
+event stream, P3 far outnumbers P0, and recent days are busier than old ones.
+"""
+
+import argparse
+import importlib
+import itertools
+import json
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+SCALES = {
+    "small": {"projects": 20, "users": 200, "milestones": 1_000, "history": 20_000, "events": 50_000},
+    "medium": {"projects": 100, "users": 1_000, "milestones": 10_000, "history": 200_000, "events": 500_000},
+    "large": {"projects": 500, "users": 5_000, "milestones": 50_000, "history": 1_000_000, "events": 2_000_000},
+}
+
+TEAMS = [
+    "Payments", "Platform", "Growth", "Risk", "Support", "Data", "Mobile", "Search",
+    "Identity", "Billing", "Infra", "Security",
+]
+EVENT_TYPES = [
+    "jira_issue_updated", "pr_merged", "deploy", "build_failed", "pr_opened", "alert_fired",
+    "incident_opened", "customer_escalation", "incident_resolved", "rollback",
+]
+SEVERITIES = ["P3", "P2", "P1", "P0"]
+SEVERITY_WEIGHTS = [0.815, 0.15, 0.03, 0.005]
+TASK_TYPES = [
+    "coding", "code_review", "writing", "analytics", "design", "testing",
+    "devops", "research", "support", "planning",
+]
+SERVICES = ["api", "web", "worker", "db", "auth", "search", "billing", "gateway"]
+REGIONS = ["us-east-1", "us-west-2", "eu-west-1", "ap-southeast-2"]
+
+# Fixed "now" of the generated data, so timestamps do not depend on the day
+# the generator runs.
+ANCHOR = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def zipf_weights(n, s=1.1):
+    """Cumulative weights of ranks 1..n under a Zipf law with exponent s."""
+    total, cumulative = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** s
+        cumulative.append(total)
+    return cumulative
+
+
+def app_function(module, name):
+    """module.name from the app under test, or None when that commit lacks it.
+    The app is imported on first use rather than with this module, so a
+    caller can first put another checkout on sys.path."""
+    try:
+        return getattr(importlib.import_module(module), name)
+    except (ImportError, AttributeError):
+        return None
+
+
+def loader(db_path):
+    """load(tables) for generate: storage.bulk_load where the app has it,
+    otherwise the storage functions older commits write with."""
+    bulk_load = app_function("app.storage", "bulk_load")
+    if bulk_load is not None:
+        # One transaction per table group, and no change log: nothing syncs
+        # from a database being generated.
+        return lambda tables: bulk_load(db_path, tables, log_changes=False)
+
+    from app import schemas, storage
+
+    def one_by_one(insert, model):
+        return lambda rows: [insert(db_path, model(**row)) for row in rows]
+
+    def chunked(insert_bulk, model, fallback):
+        if insert_bulk is None:
+            return fallback
+
+        def insert(rows):
+            rows = iter(rows)
+            while True:
+                chunk = [model(**row) for row in itertools.islice(rows, 10_000)]
+                if not chunk:
+                    return
+                insert_bulk(db_path, chunk, len(chunk))
+        return insert
+
+    writers = {
+        "users": one_by_one(storage.add_user, schemas.User),
+        "projects": one_by_one(storage.create_project, schemas.Project),
+        "milestones": one_by_one(storage.create_milestone, schemas.Milestone),
+        "task_history": chunked(
+            getattr(storage, "log_task_history_bulk", None), schemas.TaskHistory,
+            one_by_one(storage.log_task_history, schemas.TaskHistory),
+        ),
+        "events": chunked(
+            getattr(storage, "insert_events_bulk", None), schemas.Event,
+            one_by_one(storage.insert_event, schemas.Event),
+        ),
+    }
+
+    def load(tables):
+        for table, rows in tables.items():
+            writers[table](rows)
+    return load
+
+
+def recent_timestamp(rng, days):
+    # Squaring the uniform draw puts more rows near ANCHOR than days ago.
+    seconds = days * 86400 * rng.random() ** 2
+    return (ANCHOR - timedelta(seconds=seconds)).isoformat()
+
+
+def generate(db_path, projects, users, milestones, history, events, seed=42, days=180):
+    """Fill db_path (created if needed) and return what was generated, for
+    benchmarks that need ids and value distributions to query with."""
+    rng = random.Random(seed)
+    app_function("app.storage", "init_db")(db_path)
+    write = loader(db_path)
+    timings = {}
+
+    def load(name, tables):
+        start = time.perf_counter()
+        write(tables)
+        timings[name] = time.perf_counter() - start
+
+    user_ids = [f"u{u:05d}" for u in range(users)]
+    user_rank = zipf_weights(users)
+    user_rows = []
+    for user_id in user_ids:
+        # Two to four skills each, mostly strong (beta(4, 2) averages 0.67).
+        skills = {t: round(rng.betavariate(4, 2), 3) for t in rng.sample(TASK_TYPES, rng.randint(2, 4))}
+        user_rows.append({"id": user_id, "name": f"User {user_id}", "role": rng.choice(["member"] * 9 + ["lead"]), "skills": skills})
+    load("users", {"users": user_rows})
+
+    project_ids = [f"p{p:04d}" for p in range(projects)]
+    project_rows = []
+    for project_id in project_ids:
+        created = ANCHOR - timedelta(days=rng.uniform(0, days))
+        project_rows.append({
+            "id": project_id, "name": f"Project {project_id}",
+            "deadline": (created + timedelta(days=rng.randint(30, 365))).date().isoformat(),
+            "status": rng.choices(["active", "completed", "on_hold"], [0.7, 0.25, 0.05])[0],
+            "created_at": created.isoformat(),
+        })
+    # A few large projects and a long tail of small ones.
+    project_rank = zipf_weights(projects, 0.9)
+    milestone_rows = []
+    for m in range(milestones):
+        status = rng.choices(["completed", "in_progress", "pending"], [0.5, 0.2, 0.3])[0]
+        milestone_rows.append({
+            "id": f"m{m:06d}",
+            "project_id": rng.choices(project_ids, cum_weights=project_rank)[0],
+            "title": f"Milestone {m}",
+            "status": status,
+            "assigned_to": rng.choices(user_ids, cum_weights=user_rank)[0] if status != "pending" or rng.random() < 0.3 else None,
+            "due_date": (ANCHOR + timedelta(days=rng.randint(-60, 120))).date().isoformat(),
+            "completed_at": recent_timestamp(rng, days) if status == "completed" else None,
+        })
+    load("projects_and_milestones", {"projects": project_rows, "milestones": milestone_rows})
+
+    type_rank = zipf_weights(len(TASK_TYPES), 0.8)
+
+    def history_rows():
+        for h in range(history):
+            task_type = rng.choices(TASK_TYPES, cum_weights=type_rank)[0]
+            yield {
+                "id": f"h{h:07d}",
+                "user_id": rng.choices(user_ids, cum_weights=user_rank)[0],
+                "task_type": task_type,
+                # Log-normal: mostly an hour or two, occasionally a day.
+                "duration_minutes": max(5, min(2880, int(rng.lognormvariate(math.log(90), 0.8)))),
+                "success_rating": rng.choices([1, 2, 3, 4, 5], [0.03, 0.07, 0.2, 0.4, 0.3])[0],
+                "timestamp": recent_timestamp(rng, days),
+            }
+    load("history", {"task_history": history_rows()})
+
+    team_rank = zipf_weights(len(TEAMS), 1.0)
+    event_type_rank = zipf_weights(len(EVENT_TYPES), 1.2)
+
+    def event_rows():
+        for e in range(events):
+            payload = {
+                "service": rng.choice(SERVICES),
+                "region": rng.choices(REGIONS, [0.5, 0.2, 0.2, 0.1])[0],
+                "latency_ms": round(rng.lognormvariate(math.log(120), 0.6), 1),
+            }
+            if rng.random() < 0.2:
+                payload["ticket"] = f"JIRA-{rng.randint(1, 99999)}"
+            yield {
+                "id": f"evt{e:08d}",
+                "type": rng.choices(EVENT_TYPES, cum_weights=event_type_rank)[0],
+                "team": rng.choices(TEAMS, cum_weights=team_rank)[0],
+                "severity": rng.choices(SEVERITIES, SEVERITY_WEIGHTS)[0],
+                "timestamp": recent_timestamp(rng, days),
+                "payload": payload,
+            }
+    load("events", {"events": event_rows()})
+    close_all = app_function("app.db", "close_all")
+    if close_all is not None:
+        close_all()
+
+    return {
+        "counts": {"projects": projects, "users": users, "milestones": milestones, "history": history, "events": events},
+        "seed": seed,
+        "days": days,
+        "anchor": ANCHOR.isoformat(),
+        "project_ids": project_ids,
+        "user_ids": user_ids,
+        "teams": TEAMS,
+        "event_types": EVENT_TYPES,
+        "severities": SEVERITIES,
+        "task_types": TASK_TYPES,
+        "seconds": {k: round(v, 2) for k, v in timings.items()},
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    for name in SCALES["small"]:
+        parser.add_argument(f"--{name}", type=int, help=f"override the scale's {name} count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=180, help="time span of history and events")
+
+
+def counts_from(args):
+    return {name: getattr(args, name) if getattr(args, name) is not None else n for name, n in SCALES[args.scale].items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True)
+    add_arguments(parser)
+    args = parser.parse_args()
+    if os.path.exists(args.db):
+        parser.error(f"{args.db} already exists")
+    info = generate(args.db, seed=args.seed, days=args.days, **counts_from(args))
+    print(json.dumps({k: info[k] for k in ("counts", "seed", "days", "anchor", "seconds")}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
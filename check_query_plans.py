@@ -0,0 +1,76 @@
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+
+# Ensure app module can be found
+sys.path.append(os.getcwd())
+
+from app.config import EVENT_INDEXED_PAYLOAD_KEYS
+from app.storage import init_db, explain_query_events, encode_event_cursor
+from app.utils import timestamp_to_epoch_us
+
+
+# Every filter combination list_events can send to query_events.
+EQUALITY_FILTERS = {"team": "Payments", "event_type": "pr_merged", "severity": "P1"}
+RANGE_FILTERS = {
+    "start_ts": "2025-01-01T00:00:00+00:00",
+    "end_ts": "2025-02-01T00:00:00+00:00",
+    "cursor": encode_event_cursor(timestamp_to_epoch_us("2025-01-15T00:00:00+00:00"), "evt_0"),
+}
+
+
+def filter_combinations():
+    names = list(EQUALITY_FILTERS) + list(RANGE_FILTERS)
+    values = {**EQUALITY_FILTERS, **RANGE_FILTERS}
+    for n in range(len(names) + 1):
+        for combo in itertools.combinations(names, n):
+            yield {name: values[name] for name in combo}
+    # Indexed payload keys must seek on their own generated-column index.
+    for key in EVENT_INDEXED_PAYLOAD_KEYS:
+        yield {"payload_filter": {key: "x"}}
+        yield {"payload_filter": {key: "x"}, **RANGE_FILTERS}
+
+
+def plan_problems(plan):
+    problems = []
+    for detail in plan:
+        if detail.startswith("SCAN") and "USING" not in detail:
+            problems.append(f"full table scan: {detail}")
+        if "TEMP B-TREE" in detail:
+            problems.append(f"sort not served by an index: {detail}")
+    return problems
+
+
+def check(db_path):
+    failures = 0
+    for filters in filter_combinations():
+        plan = explain_query_events(db_path, limit=50, **filters)
+        problems = plan_problems(plan)
+        label = ", ".join(
+            f"payload.{next(iter(value))}" if name == "payload_filter" else name for name, value in filters.items()
+        ) or "(no filters)"
+        if problems:
+            failures += 1
+            print(f"FAIL {label}: " + "; ".join(problems))
+        else:
+            print(f"ok   {label}: " + " | ".join(plan))
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assert query_events uses an index for every filter combination.")
+    parser.add_argument("--db", help="database to check (default: a fresh temporary one)")
+    args = parser.parse_args()
+
+    if args.db:
+        init_db(args.db)
+        failures = check(args.db)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "plans.db")
+            init_db(db_path)
+            failures = check(db_path)
+
+    sys.exit(1 if failures else 0)
@@ -18,10 +18,19 @@ export default function Dashboard() {
     const [selectedTaskType, setSelectedTaskType] = useState('analytics');
 
     useEffect(() => {
-        fetch(`${API_URL}/dashboard`)
+        // Only the newest project (with its milestones and summary) is shown
+        const load = () => fetch(`${API_URL}/dashboard?limit=1`)
             .then(res => res.json())
             .then(setData)
             .catch(console.error);
+        load();
+
+        // The server pushes a message whenever anything is written (by the
+        // agent or this UI); refetch then instead of polling.
+        const stream = new EventSource(`${API_URL}/stream`);
+        stream.addEventListener('changes', load);
+        stream.addEventListener('reset', load);
+        return () => stream.close();
     }, []);
 
     const getRecommendation = (projectId, taskType) => {
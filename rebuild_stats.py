@@ -0,0 +1,32 @@
+import argparse
+import os
+import sys
+
+# Ensure app module can be found
+sys.path.append(os.getcwd())
+
+from app.storage import init_db, rebuild_user_task_stats, check_user_task_stats
+from app.config import DB_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify the user_task_stats rollup.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--check", action="store_true", help="only compare the rollup against task_history")
+    args = parser.parse_args()
+
+    init_db(args.db)
+
+    if args.check:
+        mismatches = check_user_task_stats(args.db)
+        for m in mismatches:
+            print(m)
+        print(f"{len(mismatches)} mismatches")
+        sys.exit(1 if mismatches else 0)
+
+    count = rebuild_user_task_stats(args.db)
+    print(f"Rebuilt user_task_stats: {count} (task_type, user) rows.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,57 @@
 
+import argparse
 import sys
 import os
-import sqlite3
 
 # Ensure app module can be found
 sys.path.append(os.getcwd())
 
-from app.storage import init_db, add_user, log_task_history
-from app.schemas import User, TaskHistory
-from app.config import DB_PATH
-import datetime
+from app.db import close_all
+from app.storage import init_db, bulk_load, restore_database
+from app.fixtures import load_fixture, fixture_mtime
+from app.config import DB_PATH, DEMO_FIXTURE, DEMO_TEMPLATE_PATH
+
+def build_template():
+    """Load DEMO_FIXTURE into a fresh DEMO_TEMPLATE_PATH, unless the template
+    is already newer than the fixture."""
+    if os.path.exists(DEMO_TEMPLATE_PATH) and os.path.getmtime(DEMO_TEMPLATE_PATH) >= fixture_mtime(DEMO_FIXTURE):
+        # Still run migrations, so the template matches this code's schema.
+        init_db(DEMO_TEMPLATE_PATH)
+        return
+    staging = DEMO_TEMPLATE_PATH + ".building"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(staging + suffix):
+            os.remove(staging + suffix)
+    init_db(staging)
+    inserted = bulk_load(staging, load_fixture(DEMO_FIXTURE))
+    # Fold the WAL back in so the template is one self-contained file.
+    close_all()
+    os.replace(staging, DEMO_TEMPLATE_PATH)
+    print(f"Built template {DEMO_TEMPLATE_PATH} from {DEMO_FIXTURE}: " + ", ".join(f"{n} {t}" for t, n in inserted.items()))
 
 def reset():
+    parser = argparse.ArgumentParser(description="Reset the database to the demo data, or to any prebuilt database.")
+    parser.add_argument(
+        "--from", dest="source",
+        help="database to restore instead of the demo template, e.g. one from `python -m benchmarks.synthetic`",
+    )
+    args = parser.parse_args()
     print(f"Resetting database at {DB_PATH}")
-    
-    # 1. Remove existing DB file to clear all projects/milestones
-    if os.path.exists(DB_PATH):
-        os.remove(DB_PATH)
-        print("Existing database removed.")
 
-    # 2. Re-initialize tables
+    source = args.source
+    if source is None:
+        # Users and history only, no projects: the recommendation engine is
+        # ready but the "stage" is empty for the demo.
+        build_template()
+        source = DEMO_TEMPLATE_PATH
+    else:
+        init_db(source)
+
+    # Swapped in place with SQLite's backup API: running servers keep their
+    # connections and see the reset as one write.
     init_db(DB_PATH)
-    print("Database Schema initialized.")
-
-    # 3. Seed ONLY Users and History (No Projects)
-    # This prepares the Recommendation Engine but leaves the "Stage" empty for the demo
-    
-    users = [
-        User(id="u1", name="Lamar", skills={"coding": 0.9, "writing": 0.6}),
-        User(id="u2", name="Serena", skills={"writing": 0.9, "analytics": 0.4}),
-        User(id="u3", name="Vishaka", skills={"analytics": 0.9, "coding": 0.5}),
-    ]
-    for u in users:
-        add_user(DB_PATH, u)
-    
-    print("Users seeded.")
-
-    # History for Recommendations
-    history_items = [
-        # Vishaka - Analytics
-        TaskHistory(id="h1", user_id="u3", task_type="analytics", duration_minutes=30, success_rating=5, timestamp=datetime.datetime.utcnow().isoformat()),
-        TaskHistory(id="h2", user_id="u3", task_type="analytics", duration_minutes=25, success_rating=5, timestamp=datetime.datetime.utcnow().isoformat()),
-        # Serena - Writing
-        TaskHistory(id="h3", user_id="u2", task_type="writing", duration_minutes=45, success_rating=5, timestamp=datetime.datetime.utcnow().isoformat()),
-        # Lamar - Coding
-        TaskHistory(id="h4", user_id="u1", task_type="coding", duration_minutes=60, success_rating=5, timestamp=datetime.datetime.utcnow().isoformat()),
-    ]
-    
-    for h in history_items:
-        log_task_history(DB_PATH, h)
-
-    print("History seeded. Ready for Demo!")
+    version = restore_database(DB_PATH, source)
+    print(f"Database restored from {source} (change version {version}). Ready for Demo!")
 
 if __name__ == "__main__":
     reset()
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# Same as the scripts: make the app package importable from the repo root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import close_all
+from app.storage import init_db
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A fresh, migrated database; pooled connections are closed afterwards."""
+    path = str(tmp_path / "test.db")
+    init_db(path)
+    yield path
+    close_all()
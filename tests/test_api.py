@@ -0,0 +1,32 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import api_server
+
+
+@pytest.fixture
+def client(db_path, monkeypatch):
+    monkeypatch.setattr(api_server, "DB_PATH", db_path)
+    return TestClient(api_server.app)
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_recommend_rejects_k_below_one(client, k):
+    client.post("/users", json={"id": "u1", "name": "Ada"})
+    assert client.get(f"/recommend/p1/coding?k={k}").status_code == 422
+    assert client.get("/recommend/p1/coding?k=1").json()["recommended_user_id"] == "u1"
+
+
+def test_dashboard_pages_are_capped_and_validated(client):
+    for i in range(3):
+        client.post("/projects", json={"id": f"p{i}", "name": f"P{i}", "deadline": "2025-12-31", "created_at": f"2025-01-0{i + 1}T00:00:00Z"})
+    page = client.get("/dashboard?limit=2&offset=1").json()
+    assert [p["id"] for p in page["projects"]] == ["p1", "p0"]
+    for query in ("limit=0", "limit=-1", "offset=-1"):
+        assert client.get(f"/dashboard?{query}").status_code == 422
+
+
+@pytest.mark.parametrize("limit", [0, -3, 5001])
+def test_changes_rejects_out_of_range_limit(client, limit):
+    assert client.get(f"/changes?limit={limit}").status_code == 422
+    assert client.get("/changes?limit=1").status_code == 200
@@ -0,0 +1,91 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from app.assignment import _linear_sum_assignment, default_capacity, plan, solve_assignment
+from app.schemas import Milestone, Project, TaskHistory, User
+from app.storage import add_user, create_milestone, create_project, log_task_history
+from app.tools.workflow import plan_milestone_assignments
+
+
+def _best_total(fit, capacity):
+    """Brute force: the best total fit over every way to give each row a user or nobody."""
+    n_rows, n_users = fit.shape
+    best = 0.0
+    for choice in itertools.product(range(-1, n_users), repeat=n_rows):
+        used = np.bincount([c for c in choice if c >= 0], minlength=n_users)
+        if (used <= capacity).all():
+            best = max(best, sum(fit[r, c] for r, c in enumerate(choice) if c >= 0))
+    return best
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_linear_sum_assignment_is_optimal(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 6))
+    cost = rng.random((n, n + int(rng.integers(0, 3))))
+    # Ties are common in real fits (users with no history score alike).
+    if seed % 2:
+        cost = np.round(cost, 1)
+    cols = _linear_sum_assignment(cost)
+    assert len(set(cols.tolist())) == n
+    best = min(sum(cost[r, c] for r, c in enumerate(p)) for p in itertools.permutations(range(cost.shape[1]), n))
+    assert cost[np.arange(n), cols].sum() == pytest.approx(best)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_solve_assignment_respects_capacity_and_is_optimal(seed):
+    rng = np.random.default_rng(seed)
+    fit = rng.random((int(rng.integers(1, 6)), int(rng.integers(1, 4))))
+    capacity = rng.integers(0, 3, fit.shape[1])
+    chosen = solve_assignment(fit, capacity)
+    used = np.bincount(chosen[chosen >= 0], minlength=fit.shape[1])
+    assert (used <= capacity).all()
+    # Rows are only left over when every slot is taken.
+    assert (chosen >= 0).sum() == min(fit.shape[0], capacity.sum())
+    total = sum(fit[r, c] for r, c in enumerate(chosen) if c >= 0)
+    assert total == pytest.approx(_best_total(fit, capacity))
+
+
+def test_matches_scipy_on_larger_problems():
+    optimize = pytest.importorskip("scipy.optimize")
+    rng = np.random.default_rng(7)
+    for n, m in [(40, 40), (30, 60), (100, 100)]:
+        cost = rng.random((n, m))
+        rows, cols = optimize.linear_sum_assignment(cost)
+        ours = _linear_sum_assignment(cost)
+        assert cost[np.arange(n), ours].sum() == pytest.approx(cost[rows, cols].sum())
+
+
+def test_equal_fits_are_spread_across_users():
+    chosen = solve_assignment(np.ones((4, 2)), [4, 4])
+    assert sorted(np.bincount(chosen).tolist()) == [2, 2]
+
+
+def test_plan_counts_existing_load():
+    assert default_capacity(4, [2, 0]) == 3
+    # User 0 fits best but already holds 2 of the 3 allowed.
+    chosen = plan(np.array([[0.9, 0.1], [0.9, 0.2], [0.9, 0.3]]), [2, 0], capacity=3)
+    assert np.bincount(chosen, minlength=2).tolist() == [1, 2]
+
+
+def test_plan_milestone_assignments_applies_the_plan(db_path):
+    create_project(db_path, Project(id="p", name="P", deadline="2025-12-31", created_at="2025-01-01T00:00:00Z"))
+    add_user(db_path, User(id="coder", name="C", skills={"coding": 0.9}))
+    add_user(db_path, User(id="writer", name="W", skills={"writing": 0.9}))
+    log_task_history(db_path, TaskHistory(id="h", user_id="coder", task_type="coding", duration_minutes=30, success_rating=5, timestamp="2025-01-01T00:00:00Z"))
+    for i in range(4):
+        create_milestone(db_path, Milestone(id=f"m{i}", project_id="p", title=f"M{i}"))
+    types = {"m0": "coding", "m1": "coding", "m2": "writing", "m3": "writing"}
+
+    result = plan_milestone_assignments(db_path, "p", task_types=types, capacity=2, apply=True)
+    got = {a["milestone_id"]: a["user_id"] for a in result["assignments"]}
+    assert got == {"m0": "coder", "m1": "coder", "m2": "writer", "m3": "writer"}
+    assert result["applied"] == 4 and result["unassigned"] == []
+    # Nothing is left unassigned, so a second plan has nothing to do.
+    assert plan_milestone_assignments(db_path, "p", task_types=types)["assignments"] == []
+
+    create_milestone(db_path, Milestone(id="m9", project_id="p", title="M9"))
+    with pytest.raises(ValueError):
+        plan_milestone_assignments(db_path, "p")  # no task type for m9
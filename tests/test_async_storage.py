@@ -0,0 +1,17 @@
+import asyncio
+import time
+
+from app import async_storage
+
+
+def test_backpressure_works_across_event_loops(monkeypatch):
+    # One slot, so every second call waits on the semaphore.
+    monkeypatch.setattr(async_storage, "DB_MAX_PENDING", 1)
+    monkeypatch.setattr(async_storage, "_pending", type(async_storage._pending)())
+
+    async def burst():
+        return await asyncio.gather(*(async_storage.run_read(time.sleep, 0.01) for _ in range(3)))
+
+    # A second loop (a new TestClient, a reload) must get its own semaphore.
+    assert asyncio.run(burst()) == [None] * 3
+    assert asyncio.run(burst()) == [None] * 3
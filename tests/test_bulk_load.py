@@ -0,0 +1,59 @@
+import pytest
+
+from app.db import connection
+from app.storage import bulk_load
+
+PROJECT = {"id": "p1", "name": "Ledger", "deadline": "2025-12-31", "created_at": "2025-01-01T00:00:00Z"}
+MILESTONE = {"id": "m1", "project_id": "p1", "title": "Schema", "status": "pending"}
+EVENT = {"id": "e1", "type": "deploy", "team": "Risk", "severity": "P2", "timestamp": "2025-01-01T10:30:00Z"}
+HISTORY = {"id": "h1", "user_id": "u1", "task_type": "coding", "duration_minutes": 60, "success_rating": 4,
+           "timestamp": "2025-01-01T00:00:00Z"}
+
+
+def _rollups(db_path):
+    with connection(db_path) as conn:
+        milestones = {
+            (r["project_id"], r["status"]): r["count"]
+            for r in conn.execute("SELECT * FROM project_milestone_counts WHERE count != 0")
+        }
+        events = {
+            (r["granularity"], r["team"], r["severity"]): r["count"]
+            for r in conn.execute("SELECT * FROM event_counts WHERE count != 0")
+        }
+        stats = [tuple(r) for r in conn.execute("SELECT task_type, user_id, tasks, rating_sum FROM user_task_stats")]
+    return milestones, events, stats
+
+
+@pytest.mark.parametrize("on_conflict", ["replace", "skip"])
+def test_reloading_the_same_rows_counts_them_once(db_path, on_conflict):
+    tables = {
+        "projects": [PROJECT], "users": [{"id": "u1", "name": "Ada"}],
+        "milestones": [MILESTONE], "task_history": [HISTORY], "events": [EVENT],
+    }
+    for _ in range(3):
+        bulk_load(db_path, tables, on_conflict=on_conflict)
+    milestones, events, stats = _rollups(db_path)
+    assert milestones == {("p1", "pending"): 1}
+    assert events == {("hour", "Risk", "P2"): 1, ("day", "Risk", "P2"): 1}
+    assert stats == [("coding", "u1", 1, 4)]
+
+
+def test_replace_moves_counts_to_the_new_values(db_path):
+    bulk_load(db_path, {"projects": [PROJECT], "milestones": [MILESTONE], "events": [EVENT]})
+    bulk_load(db_path, {
+        "milestones": [dict(MILESTONE, status="completed")],
+        "events": [dict(EVENT, severity="P0")],
+    }, on_conflict="replace")
+    milestones, events, _ = _rollups(db_path)
+    assert milestones == {("p1", "completed"): 1}
+    assert events == {("hour", "Risk", "P0"): 1, ("day", "Risk", "P0"): 1}
+    with connection(db_path) as conn:
+        assert conn.execute("SELECT severity FROM events WHERE id = 'e1'").fetchone()[0] == "P0"
+
+
+def test_error_mode_rejects_an_existing_id_and_writes_nothing(db_path):
+    bulk_load(db_path, {"projects": [PROJECT]})
+    with pytest.raises(ValueError, match="projects record 1"):
+        bulk_load(db_path, {"projects": [dict(PROJECT, id="p2"), PROJECT]})
+    with connection(db_path) as conn:
+        assert [r[0] for r in conn.execute("SELECT id FROM projects")] == ["p1"]
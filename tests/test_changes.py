@@ -0,0 +1,78 @@
+import pytest
+
+from app.db import transaction
+from app.schemas import Project, User
+from app.storage import add_user, change_version, create_project, get_changes, prune_changes
+
+
+def _project(id, name="Ledger"):
+    return Project(id=id, name=name, deadline="2025-12-31", created_at="2025-01-01T00:00:00Z")
+
+
+def test_insert_update_delete_show_latest_state(db_path):
+    start = change_version(db_path)
+    create_project(db_path, _project("p1"))
+    create_project(db_path, _project("p2"))
+    add_user(db_path, User(id="u1", name="Ada"))
+
+    changes = get_changes(db_path, start)
+    assert not changes["reset"] and not changes["has_more"]
+    assert changes["version"] == change_version(db_path)
+    assert [r["id"] for r in changes["changes"]["projects"]["upserted"]] == ["p1", "p2"]
+    assert changes["changes"]["users"]["upserted"][0]["name"] == "Ada"
+
+    since = changes["version"]
+    with transaction(db_path) as conn:
+        conn.execute("UPDATE projects SET name = 'Renamed' WHERE id = 'p1'")
+        conn.execute("DELETE FROM projects WHERE id = 'p2'")
+    changes = get_changes(db_path, since)
+    assert list(changes["changes"]) == ["projects"]
+    projects = changes["changes"]["projects"]
+    assert [(r["id"], r["name"]) for r in projects["upserted"]] == [("p1", "Renamed")]
+    assert projects["deleted"] == ["p2"]
+
+    # Nothing new: same version back, no changes.
+    assert get_changes(db_path, changes["version"]) == {
+        "version": changes["version"], "reset": False, "has_more": False, "changes": {},
+    }
+
+
+def test_a_row_changed_twice_is_listed_once(db_path):
+    start = change_version(db_path)
+    create_project(db_path, _project("p1"))
+    with transaction(db_path) as conn:
+        conn.execute("UPDATE projects SET name = 'Second' WHERE id = 'p1'")
+    changes = get_changes(db_path, start)
+    assert [r["name"] for r in changes["changes"]["projects"]["upserted"]] == ["Second"]
+
+
+def test_limit_pages_through_with_the_returned_version(db_path):
+    start = change_version(db_path)
+    for i in range(7):
+        create_project(db_path, _project(f"p{i}"))
+
+    seen, since = [], start
+    while True:
+        changes = get_changes(db_path, since, limit=3)
+        seen += [r["id"] for r in changes["changes"].get("projects", {}).get("upserted", [])]
+        since = changes["version"]
+        if not changes["has_more"]:
+            break
+    assert seen == [f"p{i}" for i in range(7)]
+    assert since == change_version(db_path)
+
+
+def test_pruned_or_foreign_versions_reset(db_path):
+    start = change_version(db_path)
+    for i in range(5):
+        create_project(db_path, _project(f"p{i}"))
+    prune_changes(db_path, keep_last=2)
+    assert get_changes(db_path, start)["reset"] is True
+    assert get_changes(db_path, change_version(db_path) + 10)["reset"] is True
+
+
+@pytest.mark.parametrize("limit", [0, -3])
+def test_limit_below_one_is_a_value_error(db_path, limit):
+    create_project(db_path, _project("p1"))
+    with pytest.raises(ValueError, match="limit"):
+        get_changes(db_path, 0, limit=limit)
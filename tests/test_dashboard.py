@@ -0,0 +1,9 @@
+import pytest
+
+from app.storage import get_dashboard
+
+
+@pytest.mark.parametrize("kwargs", [{"limit": 0}, {"limit": -1}, {"offset": -1}])
+def test_rejects_negative_paging(db_path, kwargs):
+    with pytest.raises(ValueError):
+        get_dashboard(db_path, **kwargs)
@@ -0,0 +1,60 @@
+import sqlite3
+import threading
+
+import pytest
+
+from app import db
+
+
+def test_exited_threads_close_their_connections(db_path):
+    opened = []
+
+    def work():
+        conn = db.get_connection(db_path)
+        conn.execute("SELECT 1").fetchone()
+        opened.append(conn)
+
+    with db.connection(db_path):
+        pass
+    before = len(db._registry)
+    for _ in range(50):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+    assert len(db._registry) == before
+    assert len(opened) == 50
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+def test_live_threads_keep_their_connections(db_path):
+    ready, done = threading.Barrier(6), threading.Event()
+
+    def work():
+        db.get_connection(db_path)
+        ready.wait()
+        done.wait()
+
+    with db.connection(db_path):
+        pass
+    threads = [threading.Thread(target=work) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    assert len(db._registry) == 6
+    done.set()
+    for thread in threads:
+        thread.join()
+    assert len(db._registry) == 1
+
+
+def test_close_all_then_reuse(db_path):
+    conn = db.get_connection(db_path)
+    db.close_all()
+    assert db._registry == []
+    fresh = db.get_connection(db_path)
+    assert fresh is not conn
+    assert fresh.execute("SELECT 1").fetchone()[0] == 1
+    assert len(db._registry) == 1
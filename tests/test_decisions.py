@@ -0,0 +1,46 @@
+from app.db import transaction
+from app.schemas import Decision
+from app.storage import search_decisions, upsert_decision
+
+
+def _decision(id, title, rationale="", owners=("ada",), tags=()):
+    return Decision(id=id, title=title, rationale=rationale, owners=list(owners), tags=list(tags),
+                    timestamp="2025-01-01T00:00:00Z")
+
+
+def _ids(db_path, query=None, owners=None):
+    return [d["id"] for d in search_decisions(db_path, query, owners=owners)]
+
+
+def test_index_follows_insert_update_and_delete(db_path):
+    upsert_decision(db_path, _decision("d1", "Migrate billing to Postgres", owners=["ada"], tags=["storage"]))
+    upsert_decision(db_path, _decision("d2", "Adopt feature flags", rationale="safer billing rollouts"))
+    assert _ids(db_path, "billing") == ["d1", "d2"]
+    assert _ids(db_path, "storage") == ["d1"]
+    assert _ids(db_path, "migrating") == ["d1"]  # stemmed
+
+    # Updating replaces the indexed text and owners, not adds to them.
+    upsert_decision(db_path, _decision("d1", "Keep MySQL", owners=["grace"], tags=["ops"]))
+    assert _ids(db_path, "billing") == ["d2"]
+    assert _ids(db_path, "storage") == []
+    assert _ids(db_path, "mysql ops") == ["d1"]
+    assert _ids(db_path, owners=["ada"]) == ["d2"]
+    assert _ids(db_path, owners=["grace"]) == ["d1"]
+
+    with transaction(db_path) as conn:
+        conn.execute("DELETE FROM decisions WHERE id = 'd1'")
+    assert _ids(db_path, "mysql") == []
+    assert _ids(db_path, owners=["grace"]) == []
+    with transaction(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM decision_owners").fetchone()[0] == 1
+        conn.execute("INSERT INTO decisions_fts (decisions_fts) VALUES ('integrity-check')")
+
+
+def test_scores_are_not_rounded(db_path):
+    # Many documents make BM25's idf, and so every score, very small.
+    for i in range(200):
+        upsert_decision(db_path, _decision(f"d{i:03d}", f"Review incident {i}", rationale="incident " * (1 + i % 3)))
+    scores = [d["score"] for d in search_decisions(db_path, "incident", limit=200)]
+    assert all(score > 0 for score in scores)
+    assert scores == sorted(scores, reverse=True)
+    assert len(set(scores)) == 3
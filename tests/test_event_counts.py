@@ -0,0 +1,73 @@
+from app.db import connection, transaction
+from app.schemas import Event
+from app.storage import _EVENT_BUCKET_SQL, aggregate_event_counts, bulk_load, insert_event, insert_events, insert_events_bulk
+
+TEAMS = ["Risk", "Payments", "Growth"]
+
+
+def _event(i, **overrides):
+    fields = dict(
+        id=f"e{i:03d}", type=["deploy", "pr_merged"][i % 2], team=TEAMS[i % 3], severity=f"P{i % 4}",
+        # Spread over a few hours and days.
+        timestamp=f"2025-01-{1 + i % 3:02d}T{i % 5:02d}:{i % 60:02d}:00Z",
+    )
+    fields.update(overrides)
+    return Event(**fields)
+
+
+def _assert_matches_events(db_path):
+    with connection(db_path) as conn:
+        for granularity, expr in _EVENT_BUCKET_SQL.items():
+            bucket = expr.format(ts="timestamp")
+            expected = {
+                tuple(r) for r in conn.execute(
+                    f"""SELECT {bucket}, team, type, severity, COUNT(*) FROM events
+                        WHERE {bucket} IS NOT NULL GROUP BY 1, 2, 3, 4"""
+                )
+            }
+            actual = {
+                tuple(r) for r in conn.execute(
+                    "SELECT bucket, team, type, severity, count FROM event_counts WHERE granularity = ? AND count != 0",
+                    (granularity,),
+                )
+            }
+            assert actual == expected, granularity
+
+
+def test_inserts(db_path):
+    insert_event(db_path, _event(0))
+    # An offset: bucketed by its UTC time, on the next day.
+    insert_event(db_path, _event(1, timestamp="2025-01-01T23:30:00-05:00"))
+    insert_events(db_path, [_event(i) for i in range(2, 20)])
+    errors = insert_events_bulk(db_path, [_event(i) for i in range(20, 30)] + [_event(0)], chunk_size=4)
+    assert list(errors) == [10]
+    _assert_matches_events(db_path)
+
+
+def test_updates_and_deletes(db_path):
+    insert_events(db_path, [_event(i) for i in range(30)])
+    with transaction(db_path) as conn:
+        conn.execute("UPDATE events SET severity = 'P0' WHERE id IN ('e001', 'e002')")
+        conn.execute("UPDATE events SET team = 'Search', type = 'rollback' WHERE id = 'e003'")
+        conn.execute("UPDATE events SET timestamp = '2025-02-01T12:00:00Z' WHERE id = 'e004'")
+        conn.execute("DELETE FROM events WHERE id IN ('e005', 'e006', 'e007')")
+    _assert_matches_events(db_path)
+
+
+def test_bulk_load(db_path):
+    bulk_load(db_path, {"events": [_event(i).model_dump() for i in range(20)]})
+    changed = [_event(i, severity="P0", team="Search").model_dump() for i in range(10)]
+    bulk_load(db_path, {"events": changed + [_event(40).model_dump()]}, on_conflict="replace")
+    bulk_load(db_path, {"events": [_event(i).model_dump() for i in range(15, 25)]}, on_conflict="skip")
+    _assert_matches_events(db_path)
+
+
+def test_aggregates_read_the_rollup(db_path):
+    insert_events(db_path, [_event(i) for i in range(30)])
+    days = aggregate_event_counts(db_path, bucket="day", group_by=["team"], team="Risk")
+    assert sum(r["count"] for r in days) == 10
+    with connection(db_path) as conn:
+        per_day = dict(conn.execute(
+            "SELECT substr(timestamp, 1, 10), COUNT(*) FROM events WHERE team = 'Risk' GROUP BY 1"
+        ).fetchall())
+    assert {r["bucket"][:10]: r["count"] for r in days} == per_day
@@ -0,0 +1,72 @@
+import base64
+import json
+
+import pytest
+
+from app.schemas import Event
+from app.storage import insert_events, insert_event, query_events, query_events_page
+
+
+def _events():
+    # Ties on timestamp, so page boundaries have to break them by id.
+    out = []
+    for i in range(23):
+        out.append(Event(
+            id=f"evt{i:02d}", type="deploy" if i % 2 else "pr_merged", team="Payments" if i % 3 else "Risk",
+            severity="P3", timestamp=f"2025-01-{1 + i // 4:02d}T12:00:00Z", payload={"n": i},
+        ))
+    return out
+
+
+def _walk(db_path, limit, cursor=None, **filters):
+    ids = []
+    while True:
+        page = query_events_page(db_path, limit=limit, cursor=cursor, **filters)
+        assert len(page["events"]) <= limit
+        ids.extend(e["id"] for e in page["events"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 22, 23, 50])
+@pytest.mark.parametrize("filters", [{}, {"team": "Payments"}, {"event_type": "deploy", "start_ts": "2025-01-02T00:00:00Z"}])
+def test_walk_returns_every_row_once_in_order(db_path, limit, filters):
+    insert_events(db_path, _events())
+    everything = query_events(db_path, limit=1000, **filters)
+    assert _walk(db_path, limit, **filters) == [e["id"] for e in everything]
+    timestamps = [(e["timestamp"], e["id"]) for e in everything]
+    assert timestamps == sorted(timestamps, reverse=True)
+
+
+def test_new_rows_do_not_shift_later_pages(db_path):
+    insert_events(db_path, _events())
+    first = query_events_page(db_path, limit=5)
+    # Newer than everything: belongs before the first page, not in the next one.
+    insert_event(db_path, Event(id="late", type="deploy", team="Risk", severity="P1", timestamp="2025-02-01T00:00:00Z"))
+    rest = _walk(db_path, 5, first["next_cursor"])
+    ids = [e["id"] for e in first["events"]] + rest
+    assert "late" not in ids
+    assert len(ids) == len(set(ids)) == 23
+
+
+def test_cursor_with_iso_timestamp_still_works(db_path):
+    insert_events(db_path, _events())
+    raw = json.dumps(["2025-01-03T12:00:00+00:00", "evt10"]).encode()
+    legacy = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    ids = [e["id"] for e in query_events(db_path, limit=100, cursor=legacy)]
+    assert ids[0] == "evt09"
+    assert "evt10" not in ids
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", base64.urlsafe_b64encode(b"[1]").decode()])
+def test_malformed_cursor_is_a_value_error(db_path, cursor):
+    with pytest.raises(ValueError):
+        query_events(db_path, cursor=cursor)
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_limit_below_one_is_a_value_error(db_path, limit):
+    insert_events(db_path, _events())
+    with pytest.raises(ValueError, match="limit"):
+        query_events_page(db_path, limit=limit)
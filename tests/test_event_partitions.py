@@ -0,0 +1,141 @@
+import gzip
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from app import storage
+from app.db import connection
+from app.schemas import Event
+from app.storage import (
+    apply_event_retention,
+    change_version,
+    get_changes,
+    insert_event,
+    insert_events,
+    list_event_partitions,
+    query_events,
+    seal_event_month,
+)
+
+
+@pytest.fixture
+def partitioned(db_path, monkeypatch):
+    monkeypatch.setattr(storage, "EVENT_PARTITIONING", "month")
+    monkeypatch.setattr(storage, "EVENT_HOT_MONTHS", 3)
+    monkeypatch.setattr(storage, "EVENT_RETENTION_MONTHS", 5)
+    monkeypatch.setattr(storage, "EVENT_PARTITION_DIR", "")
+    insert_events(db_path, [
+        Event(id=f"evt-{month}-{day}", type="deploy", team="Payments", severity="P3",
+              timestamp=f"2025-{month:02d}-{day:02d}T12:00:00Z")
+        for month in range(1, 8) for day in (5, 20)
+    ])
+    return db_path
+
+
+def _archive_rows(path):
+    with gzip.open(path) as src, open(path + ".check", "wb") as dst:
+        dst.write(src.read())
+    try:
+        conn = sqlite3.connect(path + ".check")
+        return sorted(r[0] for r in conn.execute("SELECT id FROM events"))
+    finally:
+        conn.close()
+        os.remove(path + ".check")
+
+
+def _partition_files(db_path):
+    return sorted(os.listdir(db_path + ".partitions"))
+
+
+def test_retention_seals_and_archives(partitioned):
+    result = apply_event_retention(partitioned, "2025-07-20")
+    assert result["sealed"] == {"2025-01": 2, "2025-02": 2, "2025-03": 2, "2025-04": 2}
+    assert result["archived"] == ["2025-01", "2025-02"]
+    states = {p["month"]: (p["state"], p["rows"]) for p in list_event_partitions(partitioned)}
+    assert states == {
+        "2025-01": ("archived", 2), "2025-02": ("archived", 2),
+        "2025-03": ("sealed", 2), "2025-04": ("sealed", 2),
+    }
+    # Self-contained files: no -wal/-shm left next to sealed or archived months.
+    assert _partition_files(partitioned) == [
+        "events_2025_01.db.gz", "events_2025_02.db.gz", "events_2025_03.db", "events_2025_04.db",
+    ]
+    # Sealed months stay queryable, archived ones leave the query path.
+    ids = {e["id"] for e in query_events(partitioned, limit=100)}
+    assert {"evt-3-5", "evt-4-20", "evt-7-20"} <= ids
+    assert not {"evt-1-5", "evt-2-20"} & ids
+
+
+def test_late_event_for_archived_month_goes_into_the_archive(partitioned):
+    apply_event_retention(partitioned, "2025-07-20")
+    insert_event(partitioned, Event(id="late", type="deploy", team="Payments", severity="P3", timestamp="2025-02-25T00:00:00Z"))
+    result = apply_event_retention(partitioned, "2025-07-20")
+    assert result["late_archived"] == {"2025-02": 1}
+    assert result["sealed"] == {}
+    feb = next(p for p in list_event_partitions(partitioned) if p["month"] == "2025-02")
+    assert (feb["state"], feb["rows"], feb["path"]) == ("archived", 3, "events_2025_02.db.gz")
+    assert _archive_rows(os.path.join(partitioned + ".partitions", feb["path"])) == ["evt-2-20", "evt-2-5", "late"]
+    assert "events_2025_02.db" not in _partition_files(partitioned)
+    with connection(partitioned) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM events WHERE id = 'late'").fetchone()[0] == 0
+
+
+def test_sealing_an_archived_month_is_refused(partitioned):
+    apply_event_retention(partitioned, "2025-07-20")
+    with pytest.raises(ValueError):
+        seal_event_month(partitioned, "2025-01")
+
+
+def test_late_event_for_sealed_month_joins_its_partition(partitioned):
+    apply_event_retention(partitioned, "2025-07-20")
+    insert_event(partitioned, Event(id="late", type="deploy", team="Payments", severity="P3", timestamp="2025-03-25T00:00:00Z"))
+    assert apply_event_retention(partitioned, "2025-07-20")["sealed"] == {"2025-03": 1}
+    ids = [e["id"] for e in query_events(partitioned, start_ts="2025-03-01T00:00:00Z", end_ts="2025-03-31T23:59:59Z")]
+    assert ids == ["late", "evt-3-20", "evt-3-5"]
+
+
+def test_sealed_events_are_not_reported_deleted(partitioned):
+    since = change_version(partitioned)
+    insert_event(partitioned, Event(id="new", type="deploy", team="Payments", severity="P3", timestamp="2025-03-10T00:00:00Z"))
+    apply_event_retention(partitioned, "2025-07-20")
+    changes = get_changes(partitioned, since)["changes"]["events"]
+    assert [e["id"] for e in changes["upserted"]] == ["new"]
+    assert changes["deleted"] == []
+
+
+def test_archived_events_are_not_reported_deleted(partitioned):
+    since = change_version(partitioned)
+    insert_event(partitioned, Event(id="new", type="deploy", team="Payments", severity="P3", timestamp="2025-01-10T00:00:00Z"))
+    apply_event_retention(partitioned, "2025-07-20")
+    assert get_changes(partitioned, since)["changes"]["events"] == {"upserted": [], "deleted": []}
+
+
+def test_real_deletes_are_still_reported(partitioned):
+    since = change_version(partitioned)
+    with connection(partitioned) as conn:
+        conn.execute("DELETE FROM events WHERE id = 'evt-7-5'")
+        conn.commit()
+    assert get_changes(partitioned, since)["changes"]["events"]["deleted"] == ["evt-7-5"]
+
+
+def test_archiving_leaves_other_threads_connections_open(partitioned):
+    apply_event_retention(partitioned, "2025-04-20")  # seals January only
+    borrowed, release, done = threading.Event(), threading.Event(), []
+
+    def reader():
+        with connection(partitioned) as conn:
+            borrowed.set()
+            release.wait(5)
+            # Still usable after another thread archived a partition.
+            done.append(conn.execute("SELECT COUNT(*) FROM events").fetchone()[0])
+        query_events(partitioned, limit=100)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    borrowed.wait(5)
+    assert apply_event_retention(partitioned, "2025-07-20")["archived"] == ["2025-01", "2025-02"]
+    release.set()
+    thread.join(5)
+    assert done == [6]
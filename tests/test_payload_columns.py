@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+
+from app import storage
+from app.db import close_all, transaction
+from app.schemas import Event
+from app.storage import init_db, insert_event, query_events
+
+
+@pytest.fixture
+def indexed(monkeypatch):
+    monkeypatch.setattr(storage, "EVENT_INDEXED_PAYLOAD_KEYS", ["service", "details.region"])
+
+
+def _event(id, service, region="eu"):
+    return Event(id=id, type="deploy", team="Risk", severity="P2", timestamp=f"2025-01-01T00:00:0{id[-1]}Z",
+                 payload={"service": service, "details": {"region": region}})
+
+
+def test_indexed_keys_filter_through_their_columns(db_path, indexed):
+    init_db(db_path)
+    insert_event(db_path, _event("e1", "ledger"))
+    insert_event(db_path, _event("e2", "api", "us"))
+    assert [e["id"] for e in query_events(db_path, payload_filter={"service": "ledger"})] == ["e1"]
+    assert [e["id"] for e in query_events(db_path, payload_filter={"details.region": "us"})] == ["e2"]
+
+
+def test_outside_connections_can_read_write_and_vacuum(db_path, indexed):
+    init_db(db_path)
+    insert_event(db_path, _event("e1", "ledger"))
+    close_all()
+
+    # No payload_text() registered, as in the sqlite3 shell.
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute("SELECT * FROM events").fetchone()
+        assert "ledger" in row
+        conn.execute(
+            "INSERT INTO events (id, type, team, severity, timestamp, ts_us, payload_json) "
+            """VALUES ('e2', 'deploy', 'Risk', 'P2', '2025-01-01T00:00:02Z', 1, '{"service": "api"}')"""
+        )
+        conn.commit()
+        conn.execute("VACUUM")
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    finally:
+        conn.close()
+
+
+def test_zlib_encoding_cannot_combine_with_indexed_keys(db_path, indexed, monkeypatch):
+    monkeypatch.setattr(storage, "EVENT_PAYLOAD_ENCODING", "zlib")
+    with pytest.raises(ValueError, match="EVENT_PAYLOAD_ENCODING=json"):
+        init_db(db_path)
+
+
+@pytest.fixture
+def unindexed_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "EVENT_INDEXED_PAYLOAD_KEYS", [])
+    path = str(tmp_path / "unindexed.db")
+    init_db(path)
+    yield path
+    close_all()
+
+
+def test_compressed_payloads_are_rewritten_when_a_column_is_added(unindexed_db, monkeypatch):
+    db_path = unindexed_db
+    monkeypatch.setattr(storage, "EVENT_PAYLOAD_ENCODING", "zlib")
+    monkeypatch.setattr(storage, "EVENT_PAYLOAD_COMPRESS_MIN_BYTES", 0)
+    insert_event(db_path, _event("e1", "ledger"))
+    monkeypatch.setattr(storage, "EVENT_PAYLOAD_ENCODING", "json")
+    monkeypatch.setattr(storage, "EVENT_INDEXED_PAYLOAD_KEYS", ["service"])
+    init_db(db_path)
+    with transaction(db_path) as conn:
+        assert tuple(conn.execute("SELECT typeof(payload_json), payload__service FROM events").fetchone()) == ("text", "ledger")
+
+
+def test_columns_calling_payload_text_are_recreated(unindexed_db, monkeypatch):
+    db_path = unindexed_db
+    with transaction(db_path) as conn:
+        conn.execute(
+            "ALTER TABLE events ADD COLUMN payload__service GENERATED ALWAYS AS "
+            f"(json_extract({storage._PAYLOAD_TEXT_SQL}, '$.service')) VIRTUAL"
+        )
+        conn.execute("CREATE INDEX idx_events_payload__service_ts ON events(payload__service, ts_us, id)")
+    insert_event(db_path, _event("e1", "ledger"))
+    monkeypatch.setattr(storage, "EVENT_INDEXED_PAYLOAD_KEYS", ["service"])
+    init_db(db_path)
+    with transaction(db_path) as conn:
+        table_sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'events'").fetchone()[0]
+    assert "payload_text(" not in table_sql
+    assert [e["id"] for e in query_events(db_path, payload_filter={"service": "ledger"})] == ["e1"]
@@ -0,0 +1,25 @@
+"""Every query_events filter combination must seek an index and read rows in
+index order (see check_query_plans.py for the same check on a real database)."""
+
+import pytest
+
+from app.storage import explain_query_events
+from check_query_plans import filter_combinations, plan_problems
+
+
+def _label(filters):
+    return ",".join(
+        f"payload.{next(iter(value))}" if name == "payload_filter" else name for name, value in filters.items()
+    ) or "none"
+
+
+@pytest.mark.parametrize("filters", list(filter_combinations()), ids=_label)
+def test_query_events_uses_an_index(db_path, filters):
+    plan = explain_query_events(db_path, limit=50, **filters)
+    assert plan_problems(plan) == [], plan
+
+
+def test_plan_problems_flags_scans_and_sorts():
+    assert plan_problems(["SCAN events"])
+    assert plan_problems(["SEARCH events USING INDEX idx_events_team_ts (team=?)", "USE TEMP B-TREE FOR ORDER BY"])
+    assert not plan_problems(["SCAN events USING INDEX idx_events_timestamp"])
@@ -0,0 +1,24 @@
+from app.storage import init_db, restore_database
+from tools import resources
+
+
+def test_state_round_trip_and_cache(db_path):
+    resources.clear_cache()
+    assert resources.get_resource_state(db_path, "queue")["found"] is False
+    resources.update_resource_state(db_path, "queue", status="busy", capacity=3, metadata={"tickets": 12})
+    state = resources.get_resource_state(db_path, "queue")
+    assert (state["found"], state["status"], state["capacity"], state["metadata"]) == (True, "busy", 3, {"tickets": 12})
+    states = resources.get_resource_states(db_path, ["queue", "missing", "queue"])
+    assert [s["found"] for s in states] == [True, False, True]
+
+
+def test_reads_work_after_restoring_a_template(db_path, tmp_path):
+    resources.clear_cache()
+    resources.update_resource_state(db_path, "queue", status="busy")
+    template = str(tmp_path / "template.db")
+    init_db(template)
+    restore_database(db_path, template)
+    resources.clear_cache()
+    assert resources.get_resource_state(db_path, "queue")["found"] is False
+    resources.update_resource_state(db_path, "queue", status="idle")
+    assert resources.get_resource_state(db_path, "queue")["status"] == "idle"
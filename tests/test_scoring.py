@@ -0,0 +1,29 @@
+import pytest
+
+from app.schemas import TaskHistory, User
+from app.scoring import rank_candidates
+from app.storage import add_user, log_task_history
+
+
+def _history(db_path):
+    for user_id, rating, minutes in [("fast", 5, 30), ("slow", 5, 300), ("none", None, None)]:
+        add_user(db_path, User(id=user_id, name=user_id))
+        if rating is not None:
+            log_task_history(db_path, TaskHistory(
+                id=f"h-{user_id}", user_id=user_id, task_type="coding", duration_minutes=minutes,
+                success_rating=rating, timestamp="2025-01-01T00:00:00Z",
+            ))
+
+
+def test_ranks_best_first_and_truncates_to_k(db_path):
+    _history(db_path)
+    ranked = rank_candidates(db_path, "coding", ["none", "slow", "fast"], k=2)
+    assert [c["user_id"] for c in ranked] == ["fast", "slow"]
+    assert ranked[0]["tasks"] == 1
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_k_below_one_is_a_value_error(db_path, k):
+    _history(db_path)
+    with pytest.raises(ValueError, match="k must be at least 1"):
+        rank_candidates(db_path, "coding", ["fast", "slow"], k=k)
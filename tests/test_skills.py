@@ -0,0 +1,19 @@
+import pytest
+
+from app.schemas import User
+from app.skills import match_users
+from app.storage import add_user
+
+
+def test_match_users_ranks_and_limits(db_path):
+    for i, level in enumerate([0.2, 0.9, 0.5]):
+        add_user(db_path, User(id=f"u{i}", name=f"U{i}", skills={"coding": level}))
+    assert [c["user_id"] for c in match_users(db_path, "coding", k=2)] == ["u1", "u2"]
+    assert len(match_users(db_path, "coding", k=100)) == 3
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_match_users_rejects_k_below_one(db_path, k):
+    add_user(db_path, User(id="u", name="U", skills={"coding": 0.5}))
+    with pytest.raises(ValueError):
+        match_users(db_path, "coding", k=k)
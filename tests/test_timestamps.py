@@ -0,0 +1,66 @@
+from app.db import transaction
+from app.schemas import Event, Milestone, Project
+from app.storage import (
+    check_user_task_stats,
+    create_milestone,
+    create_project,
+    init_db,
+    insert_events,
+    query_events,
+    update_milestone_status,
+)
+
+# The same instants in the formats legacy rows were written with, in time
+# order: naive (UTC), "Z", an offset east and an offset west of UTC.
+LEGACY = [
+    "2025-01-01T08:00:00",
+    "2025-01-01T08:30:00Z",
+    "2025-01-01T11:00:00+02:00",  # 09:00 UTC
+    "2025-01-01T04:30:00-05:00",  # 09:30 UTC
+    "2025-01-01T10:00:00.5+00:00",
+]
+
+
+def test_query_events_orders_by_instant_not_text(db_path):
+    insert_events(db_path, [
+        Event(id=f"e{i}", type="deploy", team="Risk", severity="P3", timestamp=ts) for i, ts in enumerate(LEGACY)
+    ])
+    events = query_events(db_path, limit=10)
+    assert [e["id"] for e in events] == ["e4", "e3", "e2", "e1", "e0"]
+    assert all(e["timestamp"].endswith("+00:00") and len(e["timestamp"]) == 32 for e in events)
+    ids = [e["id"] for e in query_events(db_path, start_ts="2025-01-01T10:45:00+02:00", end_ts="2025-01-01T09:30:00Z")]
+    assert ids == ["e3", "e2"]
+
+
+def test_migration_normalizes_legacy_rows(db_path):
+    # Rows as an older version wrote them, then the migration run again.
+    with transaction(db_path) as conn:
+        for i, ts in enumerate(reversed(LEGACY)):
+            conn.execute("INSERT INTO projects VALUES (?, 'P', '2025-12-31', 'active', ?)", (f"p{i}", ts))
+            conn.execute("INSERT INTO milestones (id, project_id, title, status, completed_at) VALUES (?, 'p0', 'M', 'completed', ?)", (f"m{i}", ts))
+            conn.execute("INSERT INTO task_history VALUES (?, 'u1', 'coding', 30, 4, ?)", (f"h{i}", ts))
+        conn.execute("INSERT INTO milestones (id, project_id, title, status) VALUES ('open', 'p0', 'M', 'pending')")
+        conn.execute("INSERT INTO projects VALUES ('bad', 'P', '2025-12-31', 'active', 'last tuesday')")
+        conn.execute("PRAGMA user_version = 11")
+    init_db(db_path)
+
+    with transaction(db_path) as conn:
+        projects = [r[0] for r in conn.execute("SELECT id FROM projects WHERE id != 'bad' ORDER BY created_at")]
+        milestones = [r[0] for r in conn.execute("SELECT id FROM milestones WHERE completed_at IS NOT NULL ORDER BY completed_at")]
+        history = [r[0] for r in conn.execute("SELECT id FROM task_history ORDER BY timestamp")]
+        assert conn.execute("SELECT created_at FROM projects WHERE id = 'bad'").fetchone()[0] == "last tuesday"
+        assert conn.execute("SELECT completed_at FROM milestones WHERE id = 'open'").fetchone()[0] is None
+        last = conn.execute("SELECT last_timestamp FROM user_task_stats").fetchone()[0]
+    assert projects == ["p4", "p3", "p2", "p1", "p0"]
+    assert milestones == ["m4", "m3", "m2", "m1", "m0"]
+    assert history == ["h4", "h3", "h2", "h1", "h0"]
+    assert last == "2025-01-01T10:00:00.500000+00:00"
+    assert check_user_task_stats(db_path) == []
+
+
+def test_milestone_completion_time_is_normalized(db_path):
+    create_project(db_path, Project(id="p", name="P", deadline="2025-12-31", created_at="2025-01-01T00:00:00Z"))
+    create_milestone(db_path, Milestone(id="m", project_id="p", title="M"))
+    update_milestone_status(db_path, "m", "completed", completed_at="2025-01-02T01:00:00+01:00")
+    with transaction(db_path) as conn:
+        assert conn.execute("SELECT completed_at FROM milestones").fetchone()[0] == "2025-01-02T00:00:00.000000+00:00"
@@ -0,0 +1,75 @@
+import pytest
+
+from app.db import connection, transaction
+from app.schemas import TaskHistory
+from app.storage import (
+    bulk_load,
+    check_user_task_stats,
+    log_task_history,
+    log_task_history_bulk,
+    rebuild_user_task_stats,
+)
+
+
+def _history(id, user_id="u1", task_type="coding", minutes=60, rating=4, day=1):
+    return TaskHistory(id=id, user_id=user_id, task_type=task_type, duration_minutes=minutes,
+                       success_rating=rating, timestamp=f"2025-01-{day:02d}T09:00:00Z")
+
+
+def _assert_matches_history(db_path):
+    with connection(db_path) as conn:
+        expected = {
+            tuple(r) for r in conn.execute(
+                """SELECT task_type, user_id, COUNT(*), SUM(success_rating), SUM(duration_minutes), MAX(timestamp)
+                   FROM task_history GROUP BY task_type, user_id"""
+            )
+        }
+        actual = {
+            tuple(r) for r in conn.execute(
+                "SELECT task_type, user_id, tasks, rating_sum, duration_sum, last_timestamp FROM user_task_stats"
+            )
+        }
+    assert actual == expected
+    # The decayed sums too, within float tolerance.
+    assert check_user_task_stats(db_path) == []
+
+
+def test_single_inserts(db_path):
+    log_task_history(db_path, _history("h1"))
+    log_task_history(db_path, _history("h2", rating=2, minutes=30, day=5))
+    log_task_history(db_path, _history("h3", user_id="u2", task_type="review"))
+    _assert_matches_history(db_path)
+
+
+def test_chunked_bulk_counts_only_accepted_rows(db_path):
+    log_task_history(db_path, _history("h1"))
+    rows = [_history(f"b{i}", user_id=f"u{i % 3}", rating=1 + i % 5, day=1 + i % 20) for i in range(25)]
+    # A duplicate id is rejected and must not be counted.
+    errors = log_task_history_bulk(db_path, rows[:10] + [_history("h1")] + rows[10:], chunk_size=4)
+    assert list(errors) == [10]
+    _assert_matches_history(db_path)
+
+
+@pytest.mark.parametrize("on_conflict", ["error", "skip", "replace"])
+def test_bulk_load(db_path, on_conflict):
+    first = [_history(f"h{i}", rating=1 + i % 5, day=1 + i).model_dump() for i in range(5)]
+    bulk_load(db_path, {"task_history": first})
+    if on_conflict != "error":
+        # Existing ids with new values: kept (skip) or updated (replace).
+        again = [dict(h, success_rating=5, duration_minutes=10) for h in first[:3]]
+        again.append(_history("new", user_id="u2").model_dump())
+        bulk_load(db_path, {"task_history": again}, on_conflict=on_conflict)
+    _assert_matches_history(db_path)
+
+
+def test_rebuild_repairs_rows_changed_outside_the_app(db_path):
+    # The app only appends history; deletes and edits made directly in the
+    # database are picked up by rebuild_user_task_stats.
+    for i in range(4):
+        log_task_history(db_path, _history(f"h{i}", rating=1 + i, day=1 + i))
+    with transaction(db_path) as conn:
+        conn.execute("DELETE FROM task_history WHERE id = 'h3'")
+        conn.execute("UPDATE task_history SET success_rating = 5 WHERE id = 'h0'")
+    assert check_user_task_stats(db_path) != []
+    rebuild_user_task_stats(db_path)
+    _assert_matches_history(db_path)
@@ -1,26 +1,80 @@
 # tools/resources.py
 
-import sqlite3
-from datetime import datetime
 import json
+import threading
+import time
+from collections import OrderedDict
 
+from app.config import RESOURCE_CACHE_SIZE, RESOURCE_CACHE_TTL_S
+from app.db import connection, transaction
+from app.utils import utc_now_iso
+
+# resource_state itself is created by storage.init_db (_m013_resource_state).
+_COLUMNS = "id, updated_at, status, capacity, owner, team, notes, metadata"
+
+# (db_path, id) -> (loaded_at, row or None); LRU order, oldest first. A miss
+# is cached too. _generation counts invalidations so a read that raced an
+# update does not store the row it read before the update.
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_generation = 0
+
+
+def clear_cache():
+    global _generation
+    with _cache_lock:
+        _cache.clear()
+        _generation += 1
+
+
+def _invalidate(db_path: str, id: str):
+    global _generation
+    with _cache_lock:
+        _cache.pop((db_path, id), None)
+        _generation += 1
 
-def ensure_resource_table(conn):
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS resource_state (
-            id TEXT PRIMARY KEY,
-            updated_at TEXT NOT NULL,
-            status TEXT NOT NULL,
-            capacity REAL,
-            owner TEXT,
-            team TEXT,
-            notes TEXT,
-            metadata TEXT
-        )
-        """
-    )
-    conn.commit()
+
+def _cached(db_path: str, id: str, now: float):
+    """(hit, row) for a fresh cache entry."""
+    with _cache_lock:
+        hit = _cache.get((db_path, id))
+        if hit is None or now - hit[0] >= RESOURCE_CACHE_TTL_S:
+            return False, None
+        _cache.move_to_end((db_path, id))
+        return True, hit[1]
+
+
+def _store(db_path: str, rows: dict, generation: int, now: float):
+    with _cache_lock:
+        if generation != _generation:
+            return
+        for id, row in rows.items():
+            _cache[(db_path, id)] = (now, row)
+            _cache.move_to_end((db_path, id))
+        while len(_cache) > RESOURCE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _state(id: str, row):
+    if not row:
+        return {
+            "found": False,
+            "id": id,
+            "status": "unknown",
+            "message": "No resource state found.",
+        }
+
+    return {
+        "found": True,
+        "id": row[0],
+        "updated_at": row[1],
+        "status": row[2],
+        "capacity": row[3],
+        "owner": row[4],
+        "team": row[5],
+        "notes": row[6],
+        "metadata": json.loads(row[7] or "{}"),
+    }
 
 
 def update_resource_state(
@@ -33,29 +87,26 @@ def update_resource_state(
     notes: str | None = None,
     metadata: dict | None = None,
 ):
-    conn = sqlite3.connect(db_path)
-    ensure_resource_table(conn)
-
-    now = datetime.utcnow().isoformat()
+    now = utc_now_iso()
     metadata_json = json.dumps(metadata or {})
 
-    conn.execute(
-        """
-        INSERT INTO resource_state (id, updated_at, status, capacity, owner, team, notes, metadata)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(id) DO UPDATE SET
-            updated_at=excluded.updated_at,
-            status=excluded.status,
-            capacity=excluded.capacity,
-            owner=excluded.owner,
-            team=excluded.team,
-            notes=excluded.notes,
-            metadata=excluded.metadata
-        """,
-        (id, now, status, capacity, owner, team, notes, metadata_json),
-    )
-    conn.commit()
-    conn.close()
+    with transaction(db_path) as conn:
+        conn.execute(
+            """
+            INSERT INTO resource_state (id, updated_at, status, capacity, owner, team, notes, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                updated_at=excluded.updated_at,
+                status=excluded.status,
+                capacity=excluded.capacity,
+                owner=excluded.owner,
+                team=excluded.team,
+                notes=excluded.notes,
+                metadata=excluded.metadata
+            """,
+            (id, now, status, capacity, owner, team, notes, metadata_json),
+        )
+    _invalidate(db_path, id)
 
     return {
         "id": id,
@@ -69,32 +120,32 @@ def update_resource_state(
 
 
 def get_resource_state(db_path: str, id: str):
-    conn = sqlite3.connect(db_path)
-    ensure_resource_table(conn)
+    return get_resource_states(db_path, [id])[0]
 
-    row = conn.execute(
-        "SELECT id, updated_at, status, capacity, owner, team, notes, metadata FROM resource_state WHERE id = ?",
-        (id,),
-    ).fetchone()
-    conn.close()
 
-    if not row:
-        return {
-            "found": False,
-            "id": id,
-            "status": "unknown",
-            "message": "No resource state found.",
-        }
+def get_resource_states(db_path: str, ids: list):
+    """States for many resources, in the order of `ids`; cache misses are
+    fetched together in one query."""
+    now = time.monotonic()
+    rows = {}
+    missing = []
+    for id in dict.fromkeys(ids):
+        hit, row = _cached(db_path, id, now)
+        if hit:
+            rows[id] = row
+        else:
+            missing.append(id)
 
-    return {
-        "found": True,
-        "id": row[0],
-        "updated_at": row[1],
-        "status": row[2],
-        "capacity": row[3],
-        "owner": row[4],
-        "team": row[5],
-        "notes": row[6],
-        "metadata": json.loads(row[7] or "{}"),
-    }
+    if missing:
+        generation = _generation
+        fetched = dict.fromkeys(missing)
+        with connection(db_path) as conn:
+            for start in range(0, len(missing), 500):
+                batch = missing[start:start + 500]
+                marks = ", ".join("?" * len(batch))
+                for row in conn.execute(f"SELECT {_COLUMNS} FROM resource_state WHERE id IN ({marks})", batch):
+                    fetched[row[0]] = tuple(row)
+        _store(db_path, fetched, generation, now)
+        rows.update(fetched)
 
+    return [_state(id, rows[id]) for id in ids]